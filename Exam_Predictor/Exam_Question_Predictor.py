@@ -1,8 +1,8 @@
 """
 EXAM QUESTION PREDICTOR - Machine Learning Model
-Subject: Basic Data Science
+Subjects: every syllabus in syllabi/ (Basic Data Science, DBMS, Operating
+System, Machine Learning, ...), routed from the query by the subject index
 University: MAKAUT (Maulana Abul Kalam Azad University of Technology)
-Course Code: MCAH-E404
 
 
 This model predicts probable exam questions by analyzing:
@@ -12,87 +12,140 @@ This model predicts probable exam questions by analyzing:
 4. Difficulty Levels
 """
 
-import pandas as pd
 import numpy as np
 import re
 import json
-import ast
-import pickle
 import sys
 import os
 import random
-from collections import Counter
-from sklearn.feature_extraction.text import TfidfVectorizer, CountVectorizer
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
+import time
+from artifact import is_artifact, load_artifact, save_artifact
+from corpus import load_blocks
+from duplicates import DuplicateIndex
+from keyword_matcher import FEATURE_INDICATORS
+from metrics import NULL_METRICS, Metrics
+from question_generator import get_generator
+from result_cache import ResultCache, make_key, text_hash
+from segmentation import segment_questions
+from subject_index import SubjectIndex, get_subject_index, normalize
+from syllabus_registry import get_syllabus
+from topic_model import load_or_build, saved_version
+# Heavy modules (pandas, pickle) are imported only by the code paths that need them
 import warnings
 warnings.filterwarnings('ignore')
 
 
+DEFAULT_CSV_FILE = 'Bsic Data Science (1) (1).csv'
+
+
+# ==================== FEATURE PATTERNS ====================
+FEATURE_NAMES = (
+    'topic_frequency', 'is_definition', 'is_calculation', 'is_conceptual',
+    'is_algorithm', 'question_length', 'complexity_score', 'stats_keywords',
+    'ml_keywords', 'has_numbers', 'has_formulas'
+)
+
+COMPLEXITY_PATTERN = re.compile(r'[,;:]')
+NUMBER_PATTERN = re.compile(r'\d+')
+FORMULA_PATTERN = re.compile(r'[=+\-*/()]')
+
+
+def count_character_classes(lines):
+    """Vectorized per-line character-class features
+    
+    Works on the code points of all lines joined by newlines and returns a
+    dict of int arrays: question_length (words, as len(str.split())),
+    complexity_score ([,;:]), has_numbers (\\d+ runs), has_formulas ([=+-*/()]).
+    """
+    lengths = np.fromiter((len(line) for line in lines), dtype=np.int64, count=len(lines))
+    joined = '\n'.join(lines)
+    codes = np.frombuffer(joined.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    # Row index of every code point; the joining newline belongs to the row before it
+    rows = np.repeat(np.arange(len(lines)), lengths + 1)[:len(codes)]
+    
+    ascii_codes = np.minimum(codes, 128)
+    space = _ASCII_SPACE[ascii_codes]
+    digit = _ASCII_DIGIT[ascii_codes]
+    wide = np.flatnonzero(codes > 127)
+    if wide.size:
+        # Unicode whitespace / decimal digits, looked up once per distinct code point
+        uniq, inverse = np.unique(codes[wide], return_inverse=True)
+        chars = [chr(c) for c in uniq]
+        space[wide] = np.array([c.isspace() for c in chars])[inverse]
+        digit[wide] = np.array([c.isdecimal() for c in chars])[inverse]
+    
+    def run_starts(mask):
+        starts = mask.copy()
+        starts[1:] &= ~mask[:-1]
+        return starts
+    
+    def per_row(mask):
+        return np.bincount(rows[mask], minlength=len(lines))
+    
+    return {
+        'question_length': per_row(run_starts(~space)),
+        'complexity_score': per_row(_ASCII_COMPLEXITY[ascii_codes]),
+        'has_numbers': per_row(run_starts(digit)),
+        'has_formulas': per_row(_ASCII_FORMULA[ascii_codes]),
+    }
+
+
+def _ascii_table(predicate):
+    """Boolean lookup table for code points 0-127 (index 128 = non-ASCII)"""
+    return np.array([predicate(chr(c)) for c in range(128)] + [False])
+
+
+_ASCII_SPACE = _ascii_table(str.isspace)
+_ASCII_DIGIT = _ascii_table(str.isdecimal)
+_ASCII_COMPLEXITY = _ascii_table(lambda c: COMPLEXITY_PATTERN.match(c) is not None)
+_ASCII_FORMULA = _ascii_table(lambda c: FORMULA_PATTERN.match(c) is not None)
+
+
 # ==================== SYLLABUS DEFINITION ====================
 class SyllabusAnalyzer:
     """Analyzes syllabus and extracts key topics"""
     
-    def __init__(self):
-        self.topics = {
-            'Machine Learning Basics': [
-                'regression', 'classification', 'supervised', 'unsupervised', 'learning'
-            ],
-            'Data Preprocessing': [
-                'outlier', 'missing data', 'normalization', 'standardization', 'cleaning'
-            ],
-            'Clustering': [
-                'clustering', 'k-means', 'hierarchical', 'centroid', 'cluster'
-            ],
-            'Distance Metrics': [
-                'euclidean', 'minkowski', 'manhattan', 'distance metric', 'proximity'
-            ],
-            'Decision Trees': [
-                'decision tree', 'entropy', 'information gain', 'split', 'pruning'
-            ],
-            'k-NN Algorithm': [
-                'k-NN', 'knn', 'nearest neighbor', 'lazy learner', 'instance-based'
-            ],
-            'Probability & Statistics': [
-                'probability', 'distribution', 'gaussian', 'poisson', 'binomial',
-                'mean', 'median', 'mode', 'variance', 'standard deviation'
-            ],
-            'Hypothesis Testing': [
-                'hypothesis', 'null hypothesis', 'p-value', 'significance', 'test'
-            ],
-            'Sampling Methods': [
-                'sampling', 'stratified', 'random sampling', 'sample', 'population'
-            ],
-            'Correlation Analysis': [
-                'correlation', 'pearson', 'covariance', 'dependency', 'relationship'
-            ],
-            'Model Evaluation': [
-                'precision', 'recall', 'f1-score', 'accuracy', 'sensitivity', 'specificity'
-            ]
-        }
+    def __init__(self, subject=None):
+        # Topic definitions are shared, precompiled and read-only per subject
+        self.definition = get_syllabus(subject)
+        self.subject = self.definition.key
+        self.topics = self.definition.topics
+    
+    def __getstate__(self):
+        # Pickle only the subject; the definition is rebuilt from the registry
+        return {'subject': self.subject}
+    
+    def __setstate__(self, state):
+        self.__init__(state.get('subject'))
     
     def get_all_topics(self):
         """Get all topics as flat list"""
-        all_topics = []
-        for category, keywords in self.topics.items():
-            all_topics.extend(keywords)
-        return all_topics
+        return self.definition.all_topics
     
     def get_topic_categories(self):
         """Return topic categories"""
         return self.topics
+    
+    def get_category(self, keyword):
+        """Return the topic category a keyword belongs to"""
+        return self.definition.keyword_categories.get(keyword)
+    
+    def get_matcher(self):
+        """Compiled single-pass matcher for syllabus keywords and indicators"""
+        return self.definition.matcher
 
 
 # ==================== QUESTION PREDICTOR ====================
 class QuestionPredictor:
     """Main predictive model for exam questions"""
     
-    def __init__(self):
-        self.syllabus = SyllabusAnalyzer()
+    def __init__(self, subject=None):
+        self.syllabus = SyllabusAnalyzer(subject)
         self.model = None
-        self.scaler = StandardScaler()
+        # Optional topic_model.TopicImportanceModel; replaces the corpus rescan when set
+        self.importance_model = None
         self.topic_importance = {}
+        self.feature_matrix = None
         self.question_patterns = {
             'definition': {'keywords': ['what is', 'define', 'explain'], 'difficulty': 'Easy'},
             'calculation': {'keywords': ['calculate', 'compute', 'find'], 'difficulty': 'Medium'},
@@ -105,50 +158,65 @@ class QuestionPredictor:
     def extract_features(self, text):
         """Extract numerical features from text"""
         features = {}
+        keyword_counts, indicator_counts = self.syllabus.get_matcher().count(text)
         
         # Feature 1: Topic frequency
-        all_topics = self.syllabus.get_all_topics()
-        topic_count = 0
-        for topic in all_topics:
-            count = len(re.findall(f'\\b{topic}\\b', text, re.IGNORECASE))
-            topic_count += count
-        features['topic_frequency'] = topic_count
+        features['topic_frequency'] = sum(
+            keyword_counts.get(topic, 0) for topic in self.syllabus.get_all_topics()
+        )
         
         # Feature 2: Question type indicators
-        features['is_definition'] = len(re.findall(r'what is|define', text, re.IGNORECASE))
-        features['is_calculation'] = len(re.findall(r'calculate|compute', text, re.IGNORECASE))
-        features['is_conceptual'] = len(re.findall(r'explain|discuss', text, re.IGNORECASE))
-        features['is_algorithm'] = len(re.findall(r'algorithm|steps|procedure', text, re.IGNORECASE))
+        features['is_definition'] = indicator_counts['is_definition']
+        features['is_calculation'] = indicator_counts['is_calculation']
+        features['is_conceptual'] = indicator_counts['is_conceptual']
+        features['is_algorithm'] = indicator_counts['is_algorithm']
         
         # Feature 3: Text characteristics
         features['question_length'] = len(text.split())
-        features['complexity_score'] = len(re.findall(r'[,;:]', text))
+        features['complexity_score'] = len(COMPLEXITY_PATTERN.findall(text))
         
         # Feature 4: Keywords from syllabus
-        features['stats_keywords'] = len(re.findall(
-            r'mean|median|variance|standard deviation|distribution|probability',
-            text, re.IGNORECASE
-        ))
-        features['ml_keywords'] = len(re.findall(
-            r'regression|classification|clustering|decision tree|algorithm',
-            text, re.IGNORECASE
-        ))
+        features['stats_keywords'] = indicator_counts['stats_keywords']
+        features['ml_keywords'] = indicator_counts['ml_keywords']
         
         # Feature 5: Numerical content
-        features['has_numbers'] = len(re.findall(r'\d+', text))
-        features['has_formulas'] = len(re.findall(r'[=+\-*/()]', text))
+        features['has_numbers'] = len(NUMBER_PATTERN.findall(text))
+        features['has_formulas'] = len(FORMULA_PATTERN.findall(text))
         
         return features
     
+    def extract_features_batch(self, lines):
+        """Extract features for many questions at once
+        
+        Returns a dense float32 matrix with one row per line and the list of
+        column names (same features and order as extract_features).
+        """
+        lines = list(lines)
+        features = np.zeros((len(lines), len(FEATURE_NAMES)), dtype=np.float32)
+        if not lines:
+            return features, list(FEATURE_NAMES)
+        
+        column = {name: i for i, name in enumerate(FEATURE_NAMES)}
+        keyword_counts, indicator_counts = self.syllabus.get_matcher().count_rows(lines)
+        
+        features[:, column['topic_frequency']] = keyword_counts.sum(axis=1)
+        for i, name in enumerate(FEATURE_INDICATORS):
+            features[:, column[name]] = indicator_counts[:, i]
+        
+        char_counts = count_character_classes(lines)
+        for name in ('question_length', 'complexity_score', 'has_numbers', 'has_formulas'):
+            features[:, column[name]] = char_counts[name]
+        
+        return features, list(FEATURE_NAMES)
+    
     def estimate_topic_importance(self, questions_text):
         """Estimate importance of each topic based on frequency"""
-        topics = self.syllabus.get_all_topics()
+        keyword_counts, _ = self.syllabus.get_matcher().count(questions_text)
         importance = {}
         
-        for topic in topics:
-            count = len(re.findall(f'\\b{topic}\\b', questions_text, re.IGNORECASE))
-            if count > 0:
-                importance[topic] = count
+        for topic in self.syllabus.get_all_topics():
+            if keyword_counts.get(topic):
+                importance[topic] = keyword_counts[topic]
         
         # Normalize
         if importance:
@@ -157,19 +225,47 @@ class QuestionPredictor:
         
         return importance
     
+    def find_repeated_questions(self, previous_questions, top=10):
+        """Questions asked more than once, near-duplicate wordings grouped together"""
+        index = DuplicateIndex()
+        index.add_many([q for q in previous_questions.split('\n') if q.strip()])
+        return [{'question': cluster['question'],
+                 'count': cluster['count'],
+                 'variants': cluster['variants']}
+                for cluster in index.most_repeated(top=top)]
+    
     def predict_questions(self, previous_questions, syllabus_text):
         """Predict probable questions for upcoming exam"""
+        predictions = self.analyze_topics(previous_questions, syllabus_text)
         
-        # Analyze given data
-        self.topic_importance = self.estimate_topic_importance(
-            previous_questions + ' ' + syllabus_text
+        # Generate recommendations
+        predictions['recommendations'] = self._generate_recommendations(
+            predictions, syllabus_text
         )
         
+        return predictions
+    
+    def analyze_topics(self, previous_questions, syllabus_text, metrics=NULL_METRICS):
+        """Score and bucket topics; recommendations are left empty"""
+        
+        # Analyze given data
+        if self.importance_model is not None:
+            # Year-weighted counts kept by the model, no rescan of the corpus
+            with metrics.stage('importance_estimation'):
+                self.topic_importance = self.importance_model.importance()
+        else:
+            scored_text = previous_questions + ' ' + syllabus_text
+            with metrics.stage('importance_estimation'):
+                self.topic_importance = self.estimate_topic_importance(scored_text)
+            metrics.count('chars_scored', len(scored_text))
+            metrics.count('regex_scans')
+        
         # Extract features from previous questions
-        feature_list = []
-        for q in previous_questions.split('\n'):
-            if q.strip():
-                feature_list.append(self.extract_features(q))
+        with metrics.stage('feature_extraction'):
+            questions = [q for q in previous_questions.split('\n') if q.strip()]
+            self.feature_matrix, self.feature_names = self.extract_features_batch(questions)
+        metrics.count('lines_scored', len(questions))
+        metrics.count('regex_scans')
         
         predictions = {
             'high_probability': [],
@@ -211,11 +307,6 @@ class QuestionPredictor:
                     'recommended_questions': 0
                 })
         
-        # Generate recommendations
-        predictions['recommendations'] = self._generate_recommendations(
-            predictions, syllabus_text
-        )
-        
         return predictions
     
     def _generate_recommendations(self, predictions, syllabus_text):
@@ -241,12 +332,15 @@ class QuestionPredictor:
                 'reason': 'Moderately important topics - may be combined questions'
             })
         
-        # Practice problem-solving questions
-        if 'calculate' in syllabus_text.lower() or 'compute' in syllabus_text.lower():
+        # Practice problem-solving questions on the subject's own calculation-type topics
+        generator = get_generator(self.syllabus.definition)
+        numerical = [p['topic'] for bucket in ('high_probability', 'medium_probability', 'low_probability')
+                     for p in predictions[bucket] if generator.question_type(p['topic']) == 'calculation']
+        if numerical:
             recommendations.append({
                 'priority': 'HIGH',
                 'action': 'Practice Numerical Problems',
-                'topics': ['mean', 'standard deviation', 'probability'],
+                'topics': numerical[:3],
                 'reason': 'Calculations commonly asked in Group B & C'
             })
         
@@ -260,102 +354,128 @@ class QuestionPredictor:
         
         return recommendations
     
-    def generate_sample_questions(self, high_prob_topics, difficulty='Mixed'):
-        """Generate sample questions for study"""
-        sample_questions = []
-        
-        # Define question templates
-        templates = {
-            'definition': [
-                "Define {topic}.",
-                "What do you understand by {topic}?",
-                "Explain the concept of {topic}."
-            ],
-            'difference': [
-                "Distinguish between X and Y in context of {topic}.",
-                "Compare the approaches of X and Y for {topic}."
-            ],
-            'calculation': [
-                "Calculate the {topic} for the given dataset.",
-                "Compute {topic} with appropriate formulas."
-            ],
-            'algorithm': [
-                "Describe the {topic} algorithm with example.",
-                "Explain step-by-step procedure for {topic}."
-            ]
-        }
-        
-        for i, topic_data in enumerate(high_prob_topics[:10], 1):
-            topic = topic_data['topic']
-            
-            # Select question type based on topic
-            if any(keyword in topic.lower() for keyword in ['algorithm', 'knn', 'decision']):
-                q_type = 'algorithm'
-            elif any(keyword in topic.lower() for keyword in ['mean', 'calculate', 'standard']):
-                q_type = 'calculation'
-            else:
-                q_type = 'definition'
-            
-            # Randomize template choice
-            template_list = templates.get(q_type, templates['definition'])
-            template = random.choice(template_list)
-            formatted_question = template.format(topic=topic)
-            
-            sample_questions.append({
-                'question_number': i,
-                'topic': topic,
-                'difficulty': difficulty,
-                'question': formatted_question,
-                'points': 3 if difficulty == 'Short' else 5
-            })
-        
-        return sample_questions
+    def generate_sample_questions(self, high_prob_topics, difficulty='Mixed', rng=None):
+        """Generate sample questions for study (pass a seeded random.Random to reproduce)"""
+        # Templates and topic types are precompiled once per syllabus
+        generator = get_generator(self.syllabus.definition)
+        return generator.sample(high_prob_topics[:10], difficulty, rng)
 
 
 # ==================== MAIN EXECUTION ====================
-def load_and_predict(csv_file_path):
-    """Main function to load data and make predictions"""
-    
-    sys.stderr.write("\n" + "=" * 70 + "\n")
-    sys.stderr.write("EXAM QUESTION PREDICTION SYSTEM - INITIALIZING\n")
-    sys.stderr.write("=" * 70 + "\n")
-    
-    # Load data
+def load_question_text(csv_file_path, metrics=NULL_METRICS):
+    """Load a question paper CSV and return its questions, one per line"""
     try:
-        df = pd.read_csv(csv_file_path)
-        sys.stderr.write("\n[OK] Data loaded successfully\n")
+        # Parsed blocks come from the corpus cache unless the CSV changed
+        with metrics.stage('corpus_load'):
+            blocks = load_blocks(csv_file_path, metrics=metrics)
     except Exception as e:
         sys.stderr.write(f"\n[ERROR] Error loading data: {e}\n")
         return None
     
-    # Extract text from CSV
-    if 'pages' in df.columns:
-        pages_data = df.iloc[0]['pages']
-        if isinstance(pages_data, str):
-            pages = ast.literal_eval(pages_data)
-        else:
-            pages = pages_data
-        
-        all_text = []
-        for page in pages:
-            if 'blocks' in page:
-                for block in page['blocks']:
-                    if 'text' in block:
-                        all_text.append(block['text'])
-        
-        full_text = '\n'.join(all_text)
-    else:
-        full_text = df.to_string()
+    texts = [text for _, text in blocks]
+    with metrics.stage('segmentation'):
+        questions = segment_questions(texts)
+    metrics.count('pages_segmented', len(texts))
+    metrics.count('regex_scans', len(texts))
+    if not questions:
+        # Not a Group-A/B/C paper: fall back to the raw OCR text
+        return '\n'.join(texts)
+    return '\n'.join(questions)
+
+
+def iter_prediction_stages(predictor, full_text, seed=None, metrics=NULL_METRICS):
+    """Run the predictor stage by stage, yielding (stage, partial result) as each finishes
     
-    # Initialize predictor
-    predictor = QuestionPredictor()
-    sys.stderr.write("[OK] Question Predictor initialized\n")
+    Merging the partial results in order gives the predictions dict followed
+    by 'sample_questions', i.e. the shape build_response expects.
+    """
+    rng = random.Random(seed) if seed is not None else None
+    predictions = predictor.analyze_topics(full_text, full_text, metrics)
+    yield 'topic_analysis', {k: v for k, v in predictions.items() if k != 'recommendations'}
     
-    # Make predictions
-    predictions = predictor.predict_questions(full_text, full_text)
-    sys.stderr.write("[OK] Predictions completed\n")
+    with metrics.stage('recommendations'):
+        predictions['recommendations'] = predictor._generate_recommendations(predictions, full_text)
+    yield 'recommendations', {'recommendations': predictions['recommendations']}
+    
+    with metrics.stage('repeated_questions'):
+        repeated = predictor.find_repeated_questions(full_text)
+    yield 'repeated_questions', {'most_repeated_questions': repeated}
+    
+    with metrics.stage('sample_generation'):
+        sample_qs = predictor.generate_sample_questions(predictions['high_probability'], rng=rng)
+    metrics.count('sample_questions', len(sample_qs))
+    yield 'sample_questions', {'sample_questions': sample_qs}
+
+
+def split_stages(result):
+    """The (stage, partial result) records of an already computed result"""
+    predictions = result['predictions']
+    later_stages = ('recommendations', 'most_repeated_questions')
+    yield 'topic_analysis', {k: v for k, v in predictions.items() if k not in later_stages}
+    yield 'recommendations', {'recommendations': predictions['recommendations']}
+    yield 'repeated_questions', {'most_repeated_questions': predictions['most_repeated_questions']}
+    yield 'sample_questions', {'sample_questions': result['sample_questions']}
+
+
+def merge_stages(stages):
+    """Collect (stage, partial result) records back into a {'predictions', 'sample_questions'} result"""
+    merged = {}
+    for _, data in stages:
+        merged.update(data)
+    sample_qs = merged.pop('sample_questions')
+    return {'predictions': merged, 'sample_questions': sample_qs}
+
+
+def run_prediction(predictor, full_text, seed=None, metrics=NULL_METRICS):
+    """Run the predictor over an already loaded question text"""
+    result = merge_stages(iter_prediction_stages(predictor, full_text, seed, metrics))
+    result['predictor'] = predictor
+    return result
+
+
+def corpus_seed(corpus_hash):
+    """Default sample-question seed of a corpus, shared by live and batch predictions"""
+    return int(corpus_hash[:8], 16)
+
+
+def iter_predict_cached(predictor, full_text, cache, seed=None, corpus_hash=None,
+                        metrics=NULL_METRICS):
+    """iter_prediction_stages memoized by (corpus hash, syllabus version, options)
+    
+    Without an explicit seed the sample questions are seeded from the corpus
+    hash, so a given corpus always yields the same (cacheable) result.
+    """
+    corpus_hash = corpus_hash or text_hash(full_text)
+    if seed is None:
+        seed = corpus_seed(corpus_hash)
+    options = {'subject': predictor.syllabus.subject, 'seed': seed}
+    if predictor.importance_model is not None:
+        options['importance'] = predictor.importance_model.signature()
+    key = make_key(corpus_hash, predictor.syllabus.definition.version, options)
+    
+    result = cache.get(key)
+    if result is not None:
+        metrics.count('result_cache_hits')
+        yield from split_stages(result)
+        return
+    
+    metrics.count('result_cache_misses')
+    stages = []
+    for stage, data in iter_prediction_stages(predictor, full_text, seed, metrics):
+        stages.append((stage, data))
+        yield stage, data
+    cache.put(key, merge_stages(stages))
+
+
+def predict_cached(predictor, full_text, cache, seed=None, corpus_hash=None, metrics=NULL_METRICS):
+    """run_prediction memoized by (corpus hash, syllabus version, options)"""
+    return merge_stages(iter_predict_cached(predictor, full_text, cache, seed, corpus_hash, metrics))
+
+
+def print_report(result):
+    """Write the human-readable prediction report to stderr"""
+    predictions = result['predictions']
     
-    # Display results
     sys.stderr.write("\n" + "=" * 70 + "\n")
     sys.stderr.write("PREDICTION RESULTS\n")
     sys.stderr.write("=" * 70 + "\n")
@@ -377,33 +497,432 @@ def load_and_predict(csv_file_path):
         sys.stderr.write(f"   Topics: {', '.join(rec['topics'][:3])}\n")
         sys.stderr.write(f"   Reason: {rec['reason']}\n")
     
-    # Generate sample questions
-    sample_qs = predictor.generate_sample_questions(predictions['high_probability'])
+    if predictions.get('most_repeated_questions'):
+        sys.stderr.write("\nMOST REPEATED QUESTIONS:\n")
+        sys.stderr.write("-" * 70 + "\n")
+        for i, item in enumerate(predictions['most_repeated_questions'], 1):
+            sys.stderr.write(f"{i:2d}. ({item['count']}x) {item['question']}\n")
+    
     sys.stderr.write("\nSAMPLE PRACTICE QUESTIONS:\n")
     sys.stderr.write("-" * 70 + "\n")
-    for sq in sample_qs:
+    for sq in result['sample_questions']:
         sys.stderr.write(f"\nQ{sq['question_number']}. {sq['question']}\n")
         sys.stderr.write(f"   Topic: {sq['topic']} | Difficulty: {sq['difficulty']} | Points: {sq['points']}\n")
+
+
+def make_predictor(subject, csv_file_path, half_life=None):
+    """QuestionPredictor for a subject, using its time-decayed topic model when `half_life` is set"""
+    predictor = QuestionPredictor(subject)
+    if half_life:
+        predictor.importance_model = load_or_build(predictor.syllabus.subject, csv_file_path, half_life)
+    return predictor
+
+
+def load_and_predict(csv_file_path, subject=None, seed=None, quiet=False, metrics=None,
+                     half_life=None):
+    """Main function to load data and make predictions
     
-    return {
-        'predictor': predictor,
-        'predictions': predictions,
-        'sample_questions': sample_qs
-    }
+    The result carries a 'metrics' dict of stage timings and counters;
+    `quiet` skips the banners and the report. With `half_life` (years) topic
+    importance comes from the subject's year-aware topic model instead.
+    """
+    metrics = metrics or Metrics()
+    log = (lambda message: None) if quiet else sys.stderr.write
+    
+    log("\n" + "=" * 70 + "\n")
+    log("EXAM QUESTION PREDICTION SYSTEM - INITIALIZING\n")
+    log("=" * 70 + "\n")
+    
+    # Load data
+    full_text = load_question_text(csv_file_path, metrics)
+    if full_text is None:
+        return None
+    log("\n[OK] Data loaded successfully\n")
+    
+    # Initialize predictor
+    with metrics.stage('predictor_init'):
+        predictor = make_predictor(subject, csv_file_path, half_life)
+    log("[OK] Question Predictor initialized\n")
+    
+    # Make predictions
+    result = run_prediction(predictor, full_text, seed, metrics)
+    log("[OK] Predictions completed\n")
+    
+    if not quiet:
+        print_report(result)
+    result['metrics'] = metrics.as_dict()
+    return result
+
+
+def build_response(result, query):
+    """Combine predictions and sample questions for the frontend"""
+    final_output = dict(result['predictions'])
+    final_output['sample_questions'] = result['sample_questions']
+    final_output['subject'] = query if query else "General"
+    return final_output
+
+
+def response_stages(stages, query):
+    """Stage records of a frontend response, ending with a 'done' record
+    
+    Merging every record's data in order gives build_response's output.
+    """
+    yield from stages
+    yield 'done', {'subject': query if query else "General"}
+
+
+def write_record(stage, data, stream=None):
+    """Write one NDJSON stage record and flush it so readers see it immediately"""
+    stream = stream or sys.stdout
+    stream.write(json.dumps({'stage': stage, 'data': data}) + '\n')
+    stream.flush()
+
+
+def resolve_subject(query):
+    """Map a user query to (subject key, question paper CSV) that serve it"""
+    subject, _ = get_subject_index().route(query)
+    if subject is not None:
+        return subject.key, subject.csv_path
+    
+    # Unrecognized queries keep the original Basic Data Science paper
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return None, os.path.join(script_dir, DEFAULT_CSV_FILE)
+
+
+# ==================== WORKER MODE ====================
+class PredictionWorker:
+    """Long-lived worker that keeps the predictor and parsed corpora warm
+    
+    Requests and responses are line-delimited JSON objects, one per line:
+        -> {"id": 1, "query": "Basic Data Science"}
+        <- {"id": 1, "ok": true, "result": {...}}
+    A request may carry a "seed" for its sample questions. Identical requests
+    are answered from a ResultCache; {"op": "stats"} reports its counters and
+    {"op": "ping"} answers with {"ok": true, "result": "pong"}.
+    {"op": "metrics"} returns the stage timings and counters summed over all
+    requests, as a dict or, with "format": "prometheus", as exposition text.
+    A predict request with "metrics": true gets its own in result['metrics'],
+    and one with "half_life" (years) scores topics with the subject's
+    time-decayed topic model.
+    {"op": "similar", "query": "What is entropy?", "k": 5, "subject": "bds"}
+    returns the most similar past questions of all (or one) subjects; "queries"
+    takes a list of texts and returns one result list per text.
+    
+    With "stream": true, every stage is also sent as soon as it is ready,
+    before the final response:
+        <- {"id": 1, "event": "partial", "stage": "topic_analysis", "data": {...}}
+    """
+    
+    def __init__(self, cache=None):
+        self.predictors = {}
+        self.corpora = {}
+        self.importance_models = {}
+        self.retrieval_index = None
+        self.cache = cache or ResultCache()
+        self.metrics = Metrics()
+    
+    def get_predictor(self, subject):
+        """Return the warm predictor for a subject"""
+        if subject not in self.predictors:
+            self.predictors[subject] = QuestionPredictor(subject)
+        return self.predictors[subject]
+    
+    def get_text(self, csv_path, metrics=NULL_METRICS):
+        """Return (OCR text, text hash) for a CSV, re-reading it only when the file changes"""
+        try:
+            stat = os.stat(csv_path)
+        except OSError as e:
+            sys.stderr.write(f"\n[ERROR] Error loading data: {e}\n")
+            return None, None
+        signature = (stat.st_size, stat.st_mtime_ns)
+        
+        cached = self.corpora.get(csv_path)
+        if cached is None or cached[0] != signature:
+            full_text = load_question_text(csv_path, metrics)
+            if full_text is None:
+                return None, None
+            cached = self.corpora[csv_path] = (signature, full_text, text_hash(full_text))
+        return cached[1], cached[2]
+    
+    def get_importance_model(self, subject, csv_path, half_life):
+        """Return the subject's topic model scoring with `half_life`
+        
+        The loaded model is reloaded only when its CSV changes or a new version
+        of it is saved (e.g. by topic_model.py --add); each request gets a view
+        with its own half-life, so the cached model itself is never modified.
+        """
+        stat = os.stat(csv_path)
+        signature = (csv_path, stat.st_size, stat.st_mtime_ns, saved_version(subject))
+        cached = self.importance_models.get(subject)
+        if cached is None or cached[0] != signature:
+            cached = self.importance_models[subject] = (signature, load_or_build(subject, csv_path))
+        return cached[1].with_half_life(half_life)
+    
+    def get_retrieval_index(self):
+        """Return the similar-question index, re-indexing only papers whose CSV changed"""
+        from retrieval import open_index, save_index
+        
+        subjects = {subject.key: subject.csv_path for subject in get_subject_index().subjects.values()}
+        if self.retrieval_index is None:
+            self.retrieval_index = open_index(subjects)
+        elif self.retrieval_index.refresh(subjects):
+            # Only one worker writes the artifact; the others keep their refreshed copy in memory
+            save_index(self.retrieval_index)
+        return self.retrieval_index
+    
+    def similar_questions(self, request):
+        """Top-k past questions similar to request['query'] (or each of request['queries'])"""
+        subject_key = None
+        if request.get('subject'):
+            subject, _ = get_subject_index().route(request['subject'])
+            if subject is None:
+                raise ValueError(f"Unknown subject: {request['subject']}")
+            subject_key = subject.key
+        queries = request['queries'] if 'queries' in request else request.get('query') or ''
+        return self.get_retrieval_index().search(queries, int(request.get('k') or 10), subject_key)
+    
+    def handle(self, request, emit=None):
+        """Serve a single decoded request and return the response dict
+        
+        `emit(stage, data)` is called with each partial result of a prediction.
+        """
+        op = request.get('op', 'predict')
+        if op == 'ping':
+            return 'pong'
+        if op == 'stats':
+            return {'cache': self.cache.stats(), 'subjects': sorted(map(str, self.predictors)),
+                    'metrics': self.metrics.as_dict()}
+        if op == 'metrics':
+            if request.get('format') == 'prometheus':
+                return self.metrics.to_prometheus({'pid': os.getpid()})
+            return self.metrics.as_dict()
+        if op == 'similar':
+            return self.similar_questions(request)
+        if op != 'predict':
+            raise ValueError(f"Unknown op: {op}")
+        
+        metrics = Metrics()
+        try:
+            query = request.get('query') or ''
+            subject, csv_path = resolve_subject(query)
+            full_text, corpus_hash = self.get_text(csv_path, metrics)
+            if full_text is None:
+                return []
+            predictor = self.get_predictor(subject)
+            half_life = request.get('half_life')
+            predictor.importance_model = None
+            if half_life:
+                predictor.importance_model = self.get_importance_model(predictor.syllabus.subject,
+                                                                       csv_path, half_life)
+            stages = iter_predict_cached(predictor, full_text, self.cache,
+                                         seed=request.get('seed'), corpus_hash=corpus_hash,
+                                         metrics=metrics)
+            response = {}
+            for stage, data in response_stages(stages, query):
+                if emit:
+                    emit(stage, data)
+                response.update(data)
+            if request.get('metrics'):
+                response['metrics'] = metrics.as_dict()
+            return response
+        finally:
+            metrics.count('requests')
+            self.metrics.merge(metrics)
+    
+    def preload(self):
+        """Parse every indexed subject corpus before accepting requests"""
+        for subject in get_subject_index().subjects.values():
+            self.get_predictor(subject.key)
+            self.get_text(subject.csv_path)
+    
+    @staticmethod
+    def _make_emitter(stdout, request_id):
+        """emit(stage, data) writing 'partial' events of one request to stdout"""
+        def emit(stage, data):
+            stdout.write(json.dumps({'id': request_id, 'event': 'partial',
+                                     'stage': stage, 'data': data}) + '\n')
+            stdout.flush()
+        return emit
+    
+    def serve(self, stdin=None, stdout=None):
+        """Answer requests from stdin until it is closed"""
+        stdin = stdin or sys.stdin
+        stdout = stdout or sys.stdout
+        
+        self.preload()
+        stdout.write(json.dumps({'event': 'ready', 'pid': os.getpid()}) + '\n')
+        stdout.flush()
+        
+        for line in stdin:
+            line = line.strip()
+            if not line:
+                continue
+            request_id = None
+            try:
+                request = json.loads(line)
+                request_id = request.get('id')
+                emit = self._make_emitter(stdout, request_id) if request.get('stream') else None
+                response = {'id': request_id, 'ok': True, 'result': self.handle(request, emit)}
+            except Exception as e:
+                sys.stderr.write(f"[ERROR] Worker request failed: {e}\n")
+                response = {'id': request_id, 'ok': False, 'error': str(e)}
+            stdout.write(json.dumps(response) + '\n')
+            stdout.flush()
+
+
+# ==================== BATCH MODE ====================
+BATCH_FORMAT_VERSION = 1
+
+
+def batch_subjects(queries=None, corpus_dir=None):
+    """Subjects to precompute: those matching `queries`, or every subject of the corpus"""
+    index = SubjectIndex.build(corpus_dir) if corpus_dir else get_subject_index()
+    if not queries:
+        return list(index.subjects.values())
+    
+    subjects = {}
+    for query in queries:
+        subject, _ = index.route(query)
+        if subject is None:
+            sys.stderr.write(f"[WARN] No subject matches '{query}', skipping\n")
+            continue
+        subjects[subject.key] = subject
+    return list(subjects.values())
+
+
+def warm_syllabi(subject_keys):
+    """Load and compile the syllabus of every subject once per process"""
+    for key in subject_keys:
+        get_syllabus(key)
+
+
+def predict_subject(key, csv_path, seed=None):
+    """(frontend response or None, seconds) of one subject; runs in a pool process"""
+    started = time.perf_counter()
+    full_text = load_question_text(csv_path)
+    if full_text is None:
+        return None, time.perf_counter() - started
+    if seed is None:
+        # Seeded like the worker, so precomputed and live answers have the same sample questions
+        seed = corpus_seed(text_hash(full_text))
+    result = run_prediction(QuestionPredictor(key), full_text, seed)
+    return build_response(result, key), time.perf_counter() - started
+
+
+def run_batch(subjects, max_workers=None, seed=None):
+    """Predict many subjects across CPU cores, yielding batch records as they finish
+    
+    Syllabi and their compiled matchers are loaded before the pool starts, so
+    forked workers inherit them instead of compiling their own; where fork is
+    unavailable the pool initializer loads them once per worker.
+    """
+    # Only batch runs need a process pool; keep these off the request path
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    
+    keys = [subject.key for subject in subjects]
+    warm_syllabi(keys)
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+    else:
+        context = multiprocessing.get_context()
+    max_workers = min(max_workers or os.cpu_count() or 1, max(len(subjects), 1))
+    
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                             initializer=warm_syllabi, initargs=(keys,)) as executor:
+        futures = {executor.submit(predict_subject, subject.key, subject.csv_path, seed): subject
+                   for subject in subjects}
+        for future in as_completed(futures):
+            subject = futures[future]
+            record = {
+                'subject': subject.key,
+                'title': subject.title,
+                'aliases': [subject.key, *dict.fromkeys(map(normalize, subject.aliases))],
+                'prediction': None,
+            }
+            try:
+                record['prediction'], seconds = future.result()
+            except Exception as e:
+                sys.stderr.write(f"[ERROR] Batch prediction failed for '{subject.title}': {e}\n")
+                record['error'] = str(e)
+            else:
+                if record['prediction'] is None:
+                    record['error'] = f"Could not load questions from {subject.csv_path}"
+                else:
+                    sys.stderr.write(f"[OK] {subject.title}: {seconds:.2f}s\n")
+            yield record
+
+
+def write_batch(records, filename, output_format=None, seed=None):
+    """Write batch records as one JSON document or as JSON lines (one subject per line)
+    
+    The file is written next to its destination and renamed into place, so a
+    server reading it never sees a partial file.
+    """
+    output_format = output_format or ('jsonl' if filename.endswith(('.jsonl', '.ndjson')) else 'json')
+    records = sorted(records, key=lambda record: record['subject'])
+    tmp_name = f"{filename}.{os.getpid()}.tmp"
+    with open(tmp_name, 'w', encoding='utf-8') as f:
+        if output_format == 'jsonl':
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        else:
+            json.dump({
+                'version': BATCH_FORMAT_VERSION,
+                'generated_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                'seed': seed,
+                'subjects': records,
+            }, f, ensure_ascii=False)
+    os.replace(tmp_name, filename)
+    sys.stderr.write(f"[OK] {len(records)} subject predictions written to {filename}\n")
 
 
 # ==================== EXPORT FUNCTIONS ====================
-def save_model(predictor, filename='question_predictor_model.pkl'):
-    """Save trained model to file"""
-    with open(filename, 'wb') as f:
-        pickle.dump(predictor, f)
+PREDICTOR_ARTIFACT_KIND = 'question-predictor'
+
+
+def save_model(predictor, filename='question_predictor_model'):
+    """Save a trained predictor as a memory-mappable artifact directory"""
+    topics = predictor.syllabus.get_all_topics()
+    arrays = {
+        'topic_importance': np.array([predictor.topic_importance.get(topic, 0.0) for topic in topics],
+                                     dtype=np.float64),
+    }
+    if predictor.feature_matrix is not None:
+        arrays['feature_matrix'] = np.asarray(predictor.feature_matrix, dtype=np.float32)
+    meta = {
+        'subject': predictor.syllabus.subject,
+        'syllabus_version': predictor.syllabus.definition.version,
+        'topics': list(topics),
+        'feature_names': list(FEATURE_NAMES),
+    }
+    save_artifact(filename, PREDICTOR_ARTIFACT_KIND, meta, arrays)
     sys.stderr.write(f"[OK] Model saved to {filename}\n")
 
 
-def load_model(filename='question_predictor_model.pkl'):
-    """Load trained model from file"""
-    with open(filename, 'rb') as f:
-        predictor = pickle.load(f)
+def load_model(filename='question_predictor_model'):
+    """Load a predictor artifact (or a legacy .pkl file)"""
+    if not is_artifact(filename) and filename.endswith('.pkl'):
+        sys.stderr.write(f"[WARN] Loading legacy pickle {filename}; re-save it with save_model\n")
+        import pickle
+        with open(filename, 'rb') as f:
+            predictor = pickle.load(f)
+        sys.stderr.write(f"[OK] Model loaded from {filename}\n")
+        return predictor
+    
+    meta, arrays = load_artifact(filename, PREDICTOR_ARTIFACT_KIND)
+    predictor = QuestionPredictor(meta['subject'])
+    if meta['syllabus_version'] != predictor.syllabus.definition.version:
+        sys.stderr.write(f"[WARN] {filename} was saved with syllabus version "
+                         f"{meta['syllabus_version']}, current is {predictor.syllabus.definition.version}\n")
+    
+    # Topics absent from the corpus are stored as 0 and, as in estimate_topic_importance, left out
+    importance = arrays['topic_importance']
+    predictor.topic_importance = {topic: float(importance[i])
+                                  for i, topic in enumerate(meta['topics']) if importance[i] > 0}
+    if 'feature_matrix' in arrays:
+        predictor.feature_matrix = arrays['feature_matrix']
+        predictor.feature_names = list(meta['feature_names'])
     sys.stderr.write(f"[OK] Model loaded from {filename}\n")
     return predictor
 
@@ -431,26 +950,180 @@ def export_predictions_to_json(predictions, filename='exam_predictions.json'):
     sys.stderr.write(f"[OK] Predictions exported to {filename}\n")
 
 
+# ==================== STARTUP PROFILE ====================
+IMPORTTIME_LINE = re.compile(r'^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|( *)(\S+)')
+PROFILE_OPTIONS = ('--profile-startup', '--startup-budget-ms')
+
+
+def parse_importtime(stderr_text):
+    """Parse `-X importtime` output into (module, self_ms, cumulative_ms, depth) rows"""
+    modules = []
+    for line in stderr_text.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us) / 1000, int(cumulative_us) / 1000, len(indent) // 2))
+    return modules
+
+
+def profile_startup(argv, budget_ms=None, top=20):
+    """Re-run this CLI with `argv` under -X importtime and report import cost per module"""
+    import subprocess
+    
+    command = [sys.executable, '-X', 'importtime', os.path.abspath(__file__), *argv]
+    began = time.perf_counter()
+    completed = subprocess.run(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.PIPE, text=True)
+    wall_ms = (time.perf_counter() - began) * 1000
+    
+    modules = parse_importtime(completed.stderr)
+    # Top-level rows already include the cost of everything they import
+    imports_ms = sum(cumulative for _, _, cumulative, depth in modules if depth == 0)
+    slowest = sorted((m for m in modules if m[3] == 0), key=lambda m: m[2], reverse=True)[:top]
+    
+    sys.stderr.write("\n" + "=" * 70 + "\n")
+    sys.stderr.write("STARTUP IMPORT PROFILE\n")
+    sys.stderr.write("=" * 70 + "\n")
+    sys.stderr.write(f"{'cumulative':>12} {'self':>10}  module\n")
+    for name, self_ms, cumulative_ms, _ in slowest:
+        sys.stderr.write(f"{cumulative_ms:9.1f} ms {self_ms:7.1f} ms  {name}\n")
+    sys.stderr.write(f"\n[OK] {len(modules)} modules imported in {imports_ms:.1f} ms "
+                     f"(whole run {wall_ms:.0f} ms)\n")
+    
+    within_budget = budget_ms is None or imports_ms <= budget_ms
+    if budget_ms is not None:
+        status = "[OK]" if within_budget else "[ERROR]"
+        sys.stderr.write(f"{status} Import budget {budget_ms:.0f} ms: "
+                         f"{'within' if within_budget else 'exceeded by'} "
+                         f"{abs(budget_ms - imports_ms):.1f} ms\n")
+    
+    return {
+        'command': argv,
+        'exit_code': completed.returncode,
+        'imports_ms': round(imports_ms, 3),
+        'wall_ms': round(wall_ms, 3),
+        'budget_ms': budget_ms,
+        'within_budget': within_budget,
+        'modules': [{'module': name, 'self_ms': self_ms, 'cumulative_ms': cumulative_ms}
+                    for name, self_ms, cumulative_ms, _ in slowest],
+    }
+
+
+def strip_profile_options(argv):
+    """Command line of the profiled run: argv without the profiling options"""
+    stripped = []
+    skip_value = False
+    for arg in argv:
+        if skip_value:
+            skip_value = False
+        elif arg == '--startup-budget-ms':
+            skip_value = True
+        elif not arg.startswith(PROFILE_OPTIONS):
+            stripped.append(arg)
+    return stripped
+
+
 # ==================== USAGE EXAMPLE ====================
 if __name__ == "__main__":
-    # Get query from command line (passed by Node.js)
-    query = sys.argv[1] if len(sys.argv) > 1 else ""
+    import argparse
     
-    # Default file logic (simplified for now to match the user's specific case)
-    # In a real app, you'd map query to a filename or search a DB.
-    # We will assume "Basic Data Science" maps to the provided CSV.
+    parser = argparse.ArgumentParser(description="Predict probable exam questions")
+    parser.add_argument('query', nargs='?', default="",
+                        help="Subject query passed by the Node.js controller")
+    parser.add_argument('--worker', action='store_true',
+                        help="Serve line-delimited JSON requests on stdin/stdout")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="Seed for reproducible sample questions")
+    parser.add_argument('--result-cache', default=None, metavar='PATH',
+                        help="Persist memoized prediction results to this JSON file")
+    parser.add_argument('--cache-size', type=int, default=128,
+                        help="Maximum number of memoized prediction results")
+    parser.add_argument('--cache-ttl', type=float, default=3600,
+                        help="Seconds a memoized prediction result stays valid")
+    parser.add_argument('--ndjson', action='store_true',
+                        help="Stream one JSON record per prediction stage instead of one final JSON")
+    parser.add_argument('--quiet', action='store_true',
+                        help="Skip the banners and the report on stderr")
+    parser.add_argument('--metrics', choices=('json', 'prometheus'), default=None,
+                        help="Write stage timings and counters to stderr as a JSON log line or Prometheus text")
+    parser.add_argument('--half-life', type=float, default=None, metavar='YEARS',
+                        help="Weight topics by paper year, halving the weight of papers this many years older")
+    parser.add_argument('--batch', nargs='*', default=None, metavar='SUBJECT',
+                        help="Precompute predictions for these subjects (all subjects if none are given)")
+    parser.add_argument('--corpus-dir', default=None,
+                        help="With --batch, predict the subjects of this Question_CSV_files directory")
+    parser.add_argument('--output', default='precomputed_predictions.json', metavar='PATH',
+                        help="With --batch, file to write; .jsonl/.ndjson writes one subject per line")
+    parser.add_argument('--format', choices=('json', 'jsonl'), default=None,
+                        help="With --batch, output format (default: from the --output extension)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="With --batch, number of worker processes (default: CPU count)")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="Run the same command under -X importtime and report import cost per module")
+    parser.add_argument('--startup-budget-ms', type=float, default=None,
+                        help="With --profile-startup, exit with status 1 if imports take longer")
+    args = parser.parse_args()
     
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    target_file = 'Bsic Data Science (1) (1).csv' # Default
+    if args.profile_startup:
+        report = profile_startup(strip_profile_options(sys.argv[1:]), args.startup_budget_ms)
+        json.dump(report, sys.stdout)
+        sys.exit(0 if report['within_budget'] else 1)
+    
+    if args.worker:
+        cache = ResultCache(args.cache_size, args.cache_ttl, args.result_cache)
+        PredictionWorker(cache).serve()
+        sys.exit(0)
     
-    # Basic rudimentary matching
-    if "basic" in query.lower() and "science" in query.lower():
-        target_file = 'Bsic Data Science (1) (1).csv'
+    if args.batch is not None:
+        subjects = batch_subjects(args.batch, args.corpus_dir)
+        if not subjects:
+            sys.stderr.write("[ERROR] No subjects to predict\n")
+            sys.exit(1)
+        records = list(run_batch(subjects, args.workers, args.seed))
+        write_batch(records, args.output, args.format, args.seed)
+        sys.exit(0 if all(record['prediction'] is not None for record in records) else 1)
     
-    csv_path = os.path.join(script_dir, target_file)
+    # Get query from command line (passed by Node.js)
+    query = args.query
+    subject, csv_path = resolve_subject(query)
+    metrics = Metrics()
+    
+    def report_metrics():
+        """Write the collected metrics to stderr; stdout stays reserved for JSON"""
+        if args.metrics == 'prometheus':
+            sys.stderr.write(metrics.to_prometheus({'subject': subject or ''}))
+        elif args.metrics == 'json':
+            sys.stderr.write(metrics.to_json_log(query=query) + "\n")
+    
+    if args.ndjson:
+        # topic_analysis, recommendations, sample_questions, done - each as soon as it is ready
+        full_text = load_question_text(csv_path, metrics)
+        if full_text is None:
+            write_record('error', {'message': f"Could not load questions for '{query}'"})
+            sys.exit(1)
+        cache = ResultCache(args.cache_size, args.cache_ttl, args.result_cache)
+        stages = iter_predict_cached(make_predictor(subject, csv_path, args.half_life), full_text,
+                                     cache, args.seed,
+                                     metrics=metrics)
+        for stage, data in response_stages(stages, query):
+            write_record(stage, data)
+        report_metrics()
+        sys.exit(0)
 
     # Run prediction
-    result = load_and_predict(csv_path)
+    if args.result_cache:
+        full_text = load_question_text(csv_path, metrics)
+        result = None
+        if full_text is not None:
+            cache = ResultCache(args.cache_size, args.cache_ttl, args.result_cache)
+            result = predict_cached(make_predictor(subject, csv_path, args.half_life), full_text,
+                                    cache, args.seed,
+                                    metrics=metrics)
+            if not args.quiet:
+                print_report(result)
+    else:
+        result = load_and_predict(csv_path, subject, args.seed, args.quiet, metrics, args.half_life)
+    report_metrics()
     
     if result:
         # Save model (optional, maybe skip in production API to save time/space)
@@ -459,16 +1132,13 @@ if __name__ == "__main__":
         # Export predictions to file (optional)
         # export_predictions_to_json(result['predictions'])
         
-        sys.stderr.write("\n" + "=" * 70 + "\n")
-        sys.stderr.write("[OK] ANALYSIS COMPLETE\n")
-        sys.stderr.write("=" * 70 + "\n")
+        if not args.quiet:
+            sys.stderr.write("\n" + "=" * 70 + "\n")
+            sys.stderr.write("[OK] ANALYSIS COMPLETE\n")
+            sys.stderr.write("=" * 70 + "\n")
 
         # Combine predictions and sample questions for the frontend
-        final_output = result['predictions']
-        final_output['sample_questions'] = result['sample_questions']
-        
-        # Add subject/query info if needed
-        final_output['subject'] = query if query else "General"
+        final_output = build_response(result, query)
 
         # CRITICAL: Print ONLY the JSON to stdout for the Node.js controller
         json.dump(final_output, sys.stdout)
@@ -0,0 +1,269 @@
+"""
+ARTIFACT - versioned, memory-mappable model files
+
+An artifact is a directory of immutable versions and a pointer to the live
+one. Each version holds a small JSON header and one plain NumPy array per
+table:
+
+    <artifact>/CURRENT                 name of the live version, e.g. "v1700000000000000000-123-9f2c1a"
+    <artifact>/<version>/header.json   {"format": "smart-study-artifact", "version": 1,
+                                        "kind": "question-predictor", "meta": {...},
+                                        "arrays": {"topic_importance": {"file": "topic_importance.npy",
+                                                                        "dtype": "<f8", "shape": [120]}}}
+    <artifact>/<version>/<name>.npy    arrays, written and read with allow_pickle=False
+
+A save writes a new version directory and then os.replace()s CURRENT, so
+publishing is a single atomic step: readers see either the old or the new
+artifact, never a missing or half-written one, and concurrent writers all
+succeed (the last one wins). When CURRENT moves, the version it pointed to
+is touched, so its mtime records when it was superseded, and it is pruned
+VERSION_GRACE_SECONDS after that, however long it was live. A reader that
+loses a version to pruning mid-load simply re-reads the pointer. Directories written by older releases
+(header.json directly in <artifact>) are still read and are converted on the
+next save.
+
+Arrays are opened with mmap_mode='r', so loading takes milliseconds and every
+worker process shares the same read-only pages. Nothing in an artifact is
+unpickled, so loading one never executes code.
+
+Writers that only need one process to rebuild an artifact (e.g. request
+handlers in every pool worker) take artifact_lock() and skip the save when
+another process holds it.
+"""
+
+import json
+import os
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+
+
+ARTIFACT_FORMAT = 'smart-study-artifact'
+# Bump when the header layout changes; readers refuse newer versions
+ARTIFACT_VERSION = 1
+HEADER_FILE = 'header.json'
+CURRENT_FILE = 'CURRENT'
+TMP_SUFFIX = '.tmp'
+
+# Versions superseded less than this long ago, and younger abandoned temporaries, are kept for in-flight readers
+VERSION_GRACE_SECONDS = 60
+# A writer lock older than this is assumed to belong to a crashed process
+LOCK_STALE_SECONDS = 600
+LOAD_ATTEMPTS = 3
+
+
+class ArtifactError(ValueError):
+    """An artifact is missing, of another kind, or inconsistent with its header"""
+
+
+def _read_pointer(path):
+    try:
+        with open(os.path.join(path, CURRENT_FILE), 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _live_dir(path):
+    """Directory of the live version of the artifact at `path`, or None"""
+    version = _read_pointer(path)
+    if version is not None:
+        return os.path.join(path, os.path.basename(version))
+    if os.path.isfile(os.path.join(path, HEADER_FILE)):
+        return path
+    return None
+
+
+def is_artifact(path):
+    """True if `path` is an artifact directory"""
+    live_dir = _live_dir(path)
+    return live_dir is not None and os.path.isfile(os.path.join(live_dir, HEADER_FILE))
+
+
+def artifact_version(path):
+    """Identifier of the live version of the artifact at `path`, or None
+
+    It changes on every save, so callers can cache a loaded artifact by it.
+    """
+    version = _read_pointer(path)
+    if version is not None:
+        return version
+    try:
+        return f"legacy-{os.stat(os.path.join(path, HEADER_FILE)).st_mtime_ns}"
+    except OSError:
+        return None
+
+
+def save_artifact(path, kind, meta, arrays):
+    """Write `arrays` ({name: ndarray}) and `meta` as a new version of the artifact at `path`
+
+    The version is assembled under a unique temporary name and published by
+    atomically replacing the CURRENT pointer, so readers never see a missing
+    or half-written artifact and concurrent saves never fail each other.
+    """
+    os.makedirs(path, exist_ok=True)
+    version = f"v{time.time_ns()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    version_dir = os.path.join(path, version)
+    tmp_dir = version_dir + TMP_SUFFIX
+    pointer_tmp = os.path.join(path, f"{CURRENT_FILE}.{version}{TMP_SUFFIX}")
+
+    try:
+        os.makedirs(tmp_dir)
+        entries = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            if array.dtype.hasobject:
+                raise ArtifactError(f"Array '{name}' has dtype object and cannot be stored without pickle")
+            file_name = name + '.npy'
+            np.save(os.path.join(tmp_dir, file_name), array, allow_pickle=False)
+            entries[name] = {'file': file_name, 'dtype': array.dtype.str, 'shape': list(array.shape)}
+
+        header = {
+            'format': ARTIFACT_FORMAT,
+            'version': ARTIFACT_VERSION,
+            'kind': kind,
+            'meta': meta,
+            'arrays': entries,
+        }
+        with open(os.path.join(tmp_dir, HEADER_FILE), 'w', encoding='utf-8') as f:
+            json.dump(header, f, indent=2, ensure_ascii=False)
+
+        # The version name is unique, so this rename never collides with another writer
+        os.rename(tmp_dir, version_dir)
+        with open(pointer_tmp, 'w', encoding='utf-8') as f:
+            f.write(version)
+        # Touched while still live, so no concurrent prune can see it superseded with an old mtime
+        _mark_superseded(path, _read_pointer(path))
+        os.replace(pointer_tmp, os.path.join(path, CURRENT_FILE))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if os.path.exists(pointer_tmp):
+            try:
+                os.remove(pointer_tmp)
+            except OSError:
+                pass
+    _prune(path)
+
+
+def _mark_superseded(path, version):
+    """Start the grace period of a version that CURRENT is about to move off"""
+    if version is None:
+        return
+    try:
+        os.utime(os.path.join(path, os.path.basename(version)))
+    except OSError:
+        pass
+
+
+def _prune(path):
+    """Remove superseded versions, abandoned temporaries and files of the pre-versioned layout"""
+    current = _read_pointer(path)
+    if current is None:
+        return
+    now = time.time()
+    try:
+        names = os.listdir(path)
+    except OSError:
+        return
+
+    for name in names:
+        entry = os.path.join(path, name)
+        try:
+            if name in (current, CURRENT_FILE):
+                continue
+            if name == HEADER_FILE or name.endswith('.npy'):
+                os.remove(entry)
+            elif now - os.path.getmtime(entry) > VERSION_GRACE_SECONDS:
+                if os.path.isdir(entry):
+                    shutil.rmtree(entry, ignore_errors=True)
+                else:
+                    os.remove(entry)
+        except OSError:
+            pass
+
+
+@contextmanager
+def artifact_lock(path, stale_after=LOCK_STALE_SECONDS):
+    """Non-blocking writer lock of an artifact; yields True if this process holds it
+
+    Callers that find the lock taken should skip their save: another process
+    is already writing the same artifact.
+    """
+    lock_path = os.path.abspath(path).rstrip(os.sep) + '.lock'
+    acquired = _acquire_lock(lock_path, stale_after)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            try:
+                os.remove(lock_path)
+            except OSError:
+                pass
+
+
+def _acquire_lock(lock_path, stale_after):
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    for _ in range(2):
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) <= stale_after:
+                    return False
+                os.remove(lock_path)
+            except OSError:
+                pass
+            continue
+        with os.fdopen(fd, 'w') as f:
+            f.write(str(os.getpid()))
+        return True
+    return False
+
+
+def load_artifact(path, kind, mmap=True):
+    """Return (meta, {name: array}) of the artifact at `path`"""
+    for attempt in range(LOAD_ATTEMPTS):
+        live_dir = _live_dir(path)
+        if live_dir is None:
+            raise ArtifactError(f"No artifact in {path}")
+        try:
+            return _load_version(live_dir, kind, mmap)
+        except FileNotFoundError as e:
+            # The version was pruned after we read the pointer; the pointer now names a newer one
+            if attempt == LOAD_ATTEMPTS - 1:
+                raise ArtifactError(f"Artifact in {path} changed while it was being read: {e}") from e
+
+
+def _load_version(path, kind, mmap):
+    try:
+        with open(os.path.join(path, HEADER_FILE), 'r', encoding='utf-8') as f:
+            header = json.load(f)
+    except FileNotFoundError:
+        raise
+    except (OSError, ValueError) as e:
+        raise ArtifactError(f"Cannot read artifact header in {path}: {e}") from e
+
+    if header.get('format') != ARTIFACT_FORMAT:
+        raise ArtifactError(f"{path} is not a {ARTIFACT_FORMAT}")
+    if header.get('version', 0) > ARTIFACT_VERSION:
+        raise ArtifactError(f"{path} has artifact version {header['version']}, "
+                            f"this code reads up to {ARTIFACT_VERSION}")
+    if header.get('kind') != kind:
+        raise ArtifactError(f"{path} holds a '{header.get('kind')}', expected a '{kind}'")
+
+    arrays = {}
+    for name, entry in header['arrays'].items():
+        file_path = os.path.join(path, os.path.basename(entry['file']))
+        try:
+            array = np.load(file_path, mmap_mode='r' if mmap else None, allow_pickle=False)
+        except FileNotFoundError:
+            raise
+        except (OSError, ValueError) as e:
+            raise ArtifactError(f"Cannot read array '{name}' in {path}: {e}") from e
+        if array.dtype.str != entry['dtype'] or list(array.shape) != entry['shape']:
+            raise ArtifactError(f"Array '{name}' in {path} does not match its header")
+        arrays[name] = array
+    return header.get('meta', {}), arrays
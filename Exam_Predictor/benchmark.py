@@ -0,0 +1,475 @@
+"""
+EXAM QUESTION PREDICTOR - Benchmarks
+
+Measures the main stages of the prediction and training pipeline on the
+subject corpora bundled in ML_model/Question_CSV_files and the PDFs in
+ML_model/downloaded_pdfs:
+
+    csv_parse                  pandas.read_csv of every subject CSV
+    pages_decode               streaming decode of the `pages` cell of every CSV
+    extract_features           per-question extract_features
+    extract_features_batch     extract_features_batch over all questions
+    estimate_topic_importance  topic scoring of every subject text
+    predict_questions          full prediction of every subject
+    pdf_extraction             pipline.py page extraction of every PDF
+
+Every stage reports its best wall-clock time, throughput (questions/sec and
+MB/sec of input) and peak Python heap allocation (tracemalloc, measured in a
+separate untimed run). --scale N multiplies the corpus N times to see how the
+stages behave on larger inputs. Results can be saved as JSON and compared
+against a previous run, e.g. one from another commit. With --legacy the
+optimized code paths are also checked and timed against the original
+implementations they replaced.
+
+Usage:
+    python benchmark.py [--repeat N] [--scale N] [--output results.json]
+                        [--compare baseline.json] [--legacy]
+"""
+
+import argparse
+import ast
+import datetime
+import glob
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from Exam_Question_Predictor import QuestionPredictor, load_question_text
+from pages_decoder import iter_page_blocks
+from subject_index import SubjectIndex
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ML_MODEL_DIR = os.path.join(SCRIPT_DIR, '..', 'ML_model')
+DEFAULT_CORPUS_DIR = os.path.join(ML_MODEL_DIR, 'Question_CSV_files')
+DEFAULT_PDF_DIR = os.path.join(ML_MODEL_DIR, 'downloaded_pdfs')
+
+# Version of the JSON results layout
+RESULTS_VERSION = 1
+
+
+# ==================== REFERENCE IMPLEMENTATIONS ====================
+def legacy_extract_features(predictor, text):
+    """Per-keyword regex feature extraction (pre-KeywordMatcher)"""
+    features = {}
+
+    topic_count = 0
+    for topic in predictor.syllabus.get_all_topics():
+        topic_count += len(re.findall(f'\\b{topic}\\b', text, re.IGNORECASE))
+    features['topic_frequency'] = topic_count
+
+    features['is_definition'] = len(re.findall(r'what is|define', text, re.IGNORECASE))
+    features['is_calculation'] = len(re.findall(r'calculate|compute', text, re.IGNORECASE))
+    features['is_conceptual'] = len(re.findall(r'explain|discuss', text, re.IGNORECASE))
+    features['is_algorithm'] = len(re.findall(r'algorithm|steps|procedure', text, re.IGNORECASE))
+
+    features['question_length'] = len(text.split())
+    features['complexity_score'] = len(re.findall(r'[,;:]', text))
+
+    features['stats_keywords'] = len(re.findall(
+        r'mean|median|variance|standard deviation|distribution|probability',
+        text, re.IGNORECASE
+    ))
+    features['ml_keywords'] = len(re.findall(
+        r'regression|classification|clustering|decision tree|algorithm',
+        text, re.IGNORECASE
+    ))
+
+    features['has_numbers'] = len(re.findall(r'\d+', text))
+    features['has_formulas'] = len(re.findall(r'[=+\-*/()]', text))
+
+    return features
+
+
+def legacy_topic_importance(predictor, questions_text):
+    """Per-keyword regex topic importance (pre-KeywordMatcher)"""
+    importance = {}
+    for topic in predictor.syllabus.get_all_topics():
+        count = len(re.findall(f'\\b{topic}\\b', questions_text, re.IGNORECASE))
+        if count > 0:
+            importance[topic] = count
+
+    if importance:
+        max_count = max(importance.values())
+        importance = {t: (c / max_count) for t, c in importance.items()}
+
+    return importance
+
+
+def legacy_pages_blocks(cell):
+    """ast.literal_eval decoding of a `pages` cell (pre-pages_decoder)"""
+    blocks = []
+    for page in ast.literal_eval(cell):
+        for block in page.get('blocks', []):
+            if 'text' in block:
+                blocks.append((page.get('page_num'), block['text']))
+    return blocks
+
+
+# ==================== BENCHMARKS ====================
+def time_call(func, repeat):
+    """Best wall-clock time of `repeat` calls, in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_keyword_matching(texts, repeat=5):
+    """Compare per-keyword regex scans with the single-pass KeywordMatcher"""
+    predictor = QuestionPredictor()
+    lines = [q for text in texts.values() for q in text.split('\n') if q.strip()]
+
+    # Counts must be identical before timings mean anything
+    for line in lines:
+        if predictor.extract_features(line) != legacy_extract_features(predictor, line):
+            raise AssertionError(f"extract_features mismatch on: {line[:60]!r}")
+    for text in texts.values():
+        if predictor.estimate_topic_importance(text) != legacy_topic_importance(predictor, text):
+            raise AssertionError("estimate_topic_importance mismatch")
+
+    results = {}
+    results['extract_features'] = (
+        time_call(lambda: [legacy_extract_features(predictor, q) for q in lines], repeat),
+        time_call(lambda: [predictor.extract_features(q) for q in lines], repeat),
+    )
+    results['estimate_topic_importance'] = (
+        time_call(lambda: [legacy_topic_importance(predictor, t) for t in texts.values()], repeat),
+        time_call(lambda: [predictor.estimate_topic_importance(t) for t in texts.values()], repeat),
+    )
+    return results
+
+
+def bench_feature_batch(texts, repeat=5):
+    """Compare per-line extract_features dicts with extract_features_batch"""
+    predictor = QuestionPredictor()
+    lines = [q for text in texts.values() for q in text.split('\n') if q.strip()]
+
+    matrix, names = predictor.extract_features_batch(lines)
+    for row, line in zip(matrix, lines):
+        if list(row) != [predictor.extract_features(line)[name] for name in names]:
+            raise AssertionError(f"extract_features_batch mismatch on: {line[:60]!r}")
+
+    return {
+        'extract_features_batch': (
+            time_call(lambda: [predictor.extract_features(q) for q in lines], repeat),
+            time_call(lambda: predictor.extract_features_batch(lines), repeat),
+        )
+    }
+
+
+def bench_pages_decode(corpus_dir, repeat=5):
+    """Compare ast.literal_eval with the streaming decoder: (seconds, peak bytes) of each"""
+    import pandas as pd
+
+    cells = [cell for path in sorted(glob.glob(os.path.join(corpus_dir, '*.csv')))
+             for cell in pd.read_csv(path)['pages'] if isinstance(cell, str)]
+    for cell in cells:
+        if list(iter_page_blocks(cell)) != legacy_pages_blocks(cell):
+            raise AssertionError("pages decoder mismatch")
+
+    legacy_seconds, _, legacy_peak = measure(lambda: [legacy_pages_blocks(cell) for cell in cells], repeat)
+    seconds, _, peak = measure(lambda: [list(iter_page_blocks(cell)) for cell in cells], repeat)
+    return {'pages_decode': ((legacy_seconds, legacy_peak), (seconds, peak))}
+
+
+def load_corpus(corpus_dir):
+    """Load the OCR text of every subject CSV in `corpus_dir`"""
+    texts = {}
+    for csv_path in sorted(glob.glob(os.path.join(corpus_dir, '*.csv'))):
+        text = load_question_text(csv_path)
+        if text:
+            texts[os.path.basename(csv_path)] = text
+    return texts
+
+
+# ==================== STAGE SUITE ====================
+def measure(func, repeat):
+    """(best seconds, every run in seconds, peak traced bytes) of calling `func`
+
+    The peak comes from one extra run under tracemalloc, so tracing overhead
+    never ends up in the timings.
+    """
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(runs), runs, peak
+
+
+def stage_result(seconds, runs, peak, questions=None, size=None):
+    """JSON record of one measured stage"""
+    return {
+        'seconds': round(seconds, 6),
+        'runs': [round(run, 6) for run in runs],
+        'questions': questions,
+        'bytes': size,
+        'questions_per_sec': round(questions / seconds, 1) if questions and seconds else None,
+        'mb_per_sec': round(size / 1e6 / seconds, 3) if size and seconds else None,
+        'peak_mb': round(peak / 1e6, 3),
+    }
+
+
+def scaled_csv_files(csv_files, scale, tmp_dir):
+    """Copies of the subject CSVs with their data rows repeated `scale` times"""
+    if scale == 1:
+        return list(csv_files)
+    scaled = []
+    for csv_path in csv_files:
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            header = f.readline()
+            rows = f.read()
+        if rows and not rows.endswith('\n'):
+            rows += '\n'
+        scaled_path = os.path.join(tmp_dir, os.path.basename(csv_path))
+        with open(scaled_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(header)
+            for _ in range(scale):
+                f.write(rows)
+        scaled.append(scaled_path)
+    return scaled
+
+
+def load_pdf_extractor():
+    """pipline.py's (count_pages, extract_page_range), or None if its dependencies are missing"""
+    if ML_MODEL_DIR not in sys.path:
+        sys.path.insert(0, ML_MODEL_DIR)
+    try:
+        from pipline import count_pages, extract_page_range
+    except ImportError as e:
+        print(f"[WARN] Skipping pdf_extraction: {e}")
+        return None
+    return count_pages, extract_page_range
+
+
+def file_stages(csv_files, scale, n_questions, repeat):
+    """csv_parse and pages_decode over copies of the corpus scaled `scale` times"""
+    import pandas as pd
+
+    results = {}
+    tmp_dir = tempfile.mkdtemp(prefix='exam_predictor_bench_')
+    try:
+        paths = scaled_csv_files(csv_files, scale, tmp_dir)
+        csv_bytes = sum(os.path.getsize(path) for path in paths)
+        results['csv_parse'] = stage_result(
+            *measure(lambda: [pd.read_csv(path) for path in paths], repeat),
+            questions=n_questions, size=csv_bytes)
+
+        cells = [cell for path in paths for cell in pd.read_csv(path)['pages']
+                 if isinstance(cell, str)]
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    results['pages_decode'] = stage_result(
+        *measure(lambda: [list(iter_page_blocks(cell)) for cell in cells], repeat),
+        questions=n_questions, size=sum(len(cell.encode('utf-8')) for cell in cells))
+    return results
+
+
+def feature_stages(questions, scale, n_questions, repeat):
+    """extract_features and extract_features_batch over every question line"""
+    predictor = QuestionPredictor()
+    lines = questions * scale
+    line_bytes = sum(len(q.encode('utf-8')) for q in questions) * scale
+    return {
+        'extract_features': stage_result(
+            *measure(lambda: [predictor.extract_features(q) for q in lines], repeat),
+            questions=n_questions, size=line_bytes),
+        'extract_features_batch': stage_result(
+            *measure(lambda: predictor.extract_features_batch(lines), repeat),
+            questions=n_questions, size=line_bytes),
+    }
+
+
+def prediction_stages(corpus_dir, texts, scale, n_questions, repeat):
+    """Topic scoring and full prediction of every subject, each with its own syllabus"""
+    # Subject keys of the corpus files, as the predictor CLI routes them
+    keys = {os.path.basename(subject.csv_path): subject.key
+            for subject in SubjectIndex.build(corpus_dir).subjects.values()}
+    subjects = [(QuestionPredictor(keys.get(name, '')), '\n'.join([text] * scale))
+                for name, text in texts.items()]
+    text_bytes = sum(len(text.encode('utf-8')) for _, text in subjects)
+    return {
+        'estimate_topic_importance': stage_result(
+            *measure(lambda: [p.estimate_topic_importance(t) for p, t in subjects], repeat),
+            questions=n_questions, size=text_bytes),
+        'predict_questions': stage_result(
+            *measure(lambda: [p.predict_questions(t, t) for p, t in subjects], repeat),
+            questions=n_questions, size=text_bytes),
+    }
+
+
+def pdf_stage(pdf_dir, scale, repeat):
+    """pipline.py page extraction of every PDF, or None without PDFs or pipline.py's dependencies"""
+    pdf_files = sorted(glob.glob(os.path.join(pdf_dir, '*.pdf')))
+    extractor = load_pdf_extractor() if pdf_files else None
+    if not extractor:
+        return None
+    count_pages, extract_page_range = extractor
+    record = stage_result(
+        *measure(lambda: [extract_page_range(pdf_file, 0, None)
+                          for pdf_file in pdf_files * scale], repeat),
+        size=sum(os.path.getsize(pdf_file) for pdf_file in pdf_files) * scale)
+    record['pages'] = sum(count_pages(pdf_file) for pdf_file in pdf_files) * scale
+    return record
+
+
+def run_suite(corpus_dir=DEFAULT_CORPUS_DIR, pdf_dir=DEFAULT_PDF_DIR, scale=1, repeat=3):
+    """Measure every stage on the corpus multiplied `scale` times; returns {stage: record}
+
+    Each group of stages builds its inputs in its own function, so one
+    group's scaled copies are freed before the next group is measured.
+    """
+    csv_files = sorted(glob.glob(os.path.join(corpus_dir, '*.csv')))
+    texts = load_corpus(corpus_dir)
+    questions = [q for text in texts.values() for q in text.split('\n') if q.strip()]
+    n_questions = len(questions) * scale
+
+    results = {}
+    results.update(file_stages(csv_files, scale, n_questions, repeat))
+    results.update(feature_stages(questions, scale, n_questions, repeat))
+    results.update(prediction_stages(corpus_dir, texts, scale, n_questions, repeat))
+    record = pdf_stage(pdf_dir, scale, repeat)
+    if record:
+        results['pdf_extraction'] = record
+    return results
+
+
+def git_revision():
+    """Short commit hash of the working tree, or None outside a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_results(stages, scale, repeat):
+    """JSON document of a suite run with enough context to compare it later"""
+    return {
+        'version': RESULTS_VERSION,
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scale': scale,
+        'repeat': repeat,
+        'stages': stages,
+    }
+
+
+def compare_results(baseline, current, threshold):
+    """Print per-stage time ratios against a baseline; returns the stages slower than `threshold`"""
+    # Times are compared per unit of scale, so runs at different scales stay comparable
+    scale_ratio = current['scale'] / (baseline.get('scale') or 1)
+    if scale_ratio != 1:
+        print(f"[WARN] Baseline was run at scale {baseline.get('scale')}, "
+              f"this run at scale {current['scale']}; ratios are per unit of scale")
+
+    regressions = []
+    print(f"\nCOMPARISON (baseline {baseline.get('commit') or 'unknown'} -> "
+          f"current {current['commit'] or 'unknown'})")
+    print("-" * 70)
+    for stage, record in current['stages'].items():
+        old = baseline.get('stages', {}).get(stage)
+        if not old or not old.get('seconds'):
+            print(f"{stage:28s} (not in baseline)")
+            continue
+        ratio = record['seconds'] / (old['seconds'] * scale_ratio)
+        mark = ''
+        if ratio > threshold:
+            regressions.append(stage)
+            mark = '  REGRESSION'
+        print(f"{stage:28s} {old['seconds'] * 1000:10.2f} ms -> {record['seconds'] * 1000:10.2f} ms"
+              f"   x{ratio:5.2f}   peak {old['peak_mb']:8.2f} -> {record['peak_mb']:8.2f} MB{mark}")
+    return regressions
+
+
+def print_suite(stages):
+    """Human readable table of a suite run"""
+    print(f"{'stage':28s} {'best ms':>10s} {'questions/s':>12s} {'MB/s':>9s} {'peak MB':>9s}")
+    print("-" * 70)
+    for stage, record in stages.items():
+        qps = f"{record['questions_per_sec']:12.0f}" if record['questions_per_sec'] else f"{'-':>12s}"
+        mbps = f"{record['mb_per_sec']:9.2f}" if record['mb_per_sec'] else f"{'-':>9s}"
+        print(f"{stage:28s} {record['seconds'] * 1000:10.2f} {qps} {mbps} {record['peak_mb']:9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the exam predictor hot paths")
+    parser.add_argument('--corpus-dir', default=DEFAULT_CORPUS_DIR,
+                        help="Directory of subject question CSVs")
+    parser.add_argument('--pdf-dir', default=DEFAULT_PDF_DIR,
+                        help="Directory of PDFs for the pdf_extraction stage")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Timing repetitions per stage (best is reported)")
+    parser.add_argument('--scale', type=int, default=1,
+                        help="Multiply the corpus this many times (e.g. 10, 100, 1000)")
+    parser.add_argument('--output', default=None, metavar='PATH',
+                        help="Write the results as JSON to this file")
+    parser.add_argument('--compare', default=None, metavar='PATH',
+                        help="Compare against the JSON results of an earlier run")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="With --compare, exit with status 1 if a stage is this many times slower")
+    parser.add_argument('--legacy', action='store_true',
+                        help="Also check and time the optimized paths against the original implementations")
+    args = parser.parse_args()
+    if args.scale < 1 or args.repeat < 1:
+        parser.error("--scale and --repeat must be at least 1")
+
+    texts = load_corpus(args.corpus_dir)
+    total_mb = sum(len(t.encode('utf-8')) for t in texts.values()) / 1e6
+    print(f"Loaded {len(texts)} subject corpora ({total_mb:.2f} MB of OCR text), scale {args.scale}x")
+
+    print(f"\nSTAGES (best of {args.repeat})")
+    stages = run_suite(args.corpus_dir, args.pdf_dir, args.scale, args.repeat)
+    print_suite(stages)
+    results = build_results(stages, args.scale, args.repeat)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n[OK] Results written to {args.output}")
+
+    if args.legacy:
+        print("\nKEYWORD MATCHING (legacy per-keyword regex vs KeywordMatcher)")
+        print("-" * 70)
+        for stage, (legacy, matcher) in bench_keyword_matching(texts, args.repeat).items():
+            print(f"{stage:28s} legacy {legacy * 1000:8.2f} ms   "
+                  f"matcher {matcher * 1000:8.2f} ms   speedup {legacy / matcher:5.1f}x")
+
+        print("\nFEATURE EXTRACTION (per-line dicts vs batch matrix)")
+        print("-" * 70)
+        for stage, (per_line, batch) in bench_feature_batch(texts, args.repeat).items():
+            print(f"{stage:28s} per-line {per_line * 1000:6.2f} ms   "
+                  f"batch {batch * 1000:8.2f} ms   speedup {per_line / batch:5.1f}x")
+
+        print("\nPAGES DECODING (ast.literal_eval vs streaming decoder)")
+        print("-" * 70)
+        for stage, (legacy, decoder) in bench_pages_decode(args.corpus_dir, args.repeat).items():
+            print(f"{stage:28s} literal_eval {legacy[0] * 1000:7.2f} ms {legacy[1] / 1e6:6.1f} MB   "
+                  f"decoder {decoder[0] * 1000:6.2f} ms {decoder[1] / 1e6:5.2f} MB   "
+                  f"speedup {legacy[0] / decoder[0]:5.1f}x")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare_results(baseline, results, args.threshold):
+            sys.exit(1)
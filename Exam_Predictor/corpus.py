@@ -0,0 +1,158 @@
+"""
+CORPUS - OCR question paper loading with a parsed-corpus cache
+
+The subject CSVs store every page of a scanned paper in one `pages` cell as
+a Python-repr list of pages, blocks and bounding boxes. Only the block texts
+and page numbers are needed for prediction, so each source CSV is decoded once
+(see pages_decoder.py, all rows) and the extracted blocks are cached on disk:
+
+    <cache>/paths/<sha1 of source path>.json   size, mtime and sha256 of the source
+    <cache>/blobs/<sha256 of source>.json      extracted (page_num, text) blocks
+
+A source whose size and mtime are unchanged is served straight from its blob.
+When they change the file is re-hashed; identical content (e.g. a touched or
+copied file) reuses the existing blob, anything else is parsed again.
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+from metrics import NULL_METRICS
+from pages_decoder import MissingPagesColumn, iter_csv_blocks
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.environ.get('EXAM_PREDICTOR_CACHE_DIR',
+                                   os.path.join(SCRIPT_DIR, '.corpus_cache'))
+
+# Bump whenever the blob layout or the extraction rules change
+CACHE_VERSION = 2
+
+
+# ==================== PARSING ====================
+def parse_question_csv(csv_file_path, metrics=NULL_METRICS):
+    """Parse every row of a question paper CSV into a list of (page_num, text) blocks"""
+    metrics.count('bytes_parsed', os.path.getsize(csv_file_path))
+    try:
+        with metrics.stage('pages_decode'):
+            return [(page_num, text) for _, page_num, text in iter_csv_blocks(csv_file_path)]
+    except MissingPagesColumn:
+        # Not an OCR export; only this fallback needs pandas
+        import pandas as pd
+        return [(None, pd.read_csv(csv_file_path).to_string())]
+
+
+def file_sha256(path):
+    """Content hash of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ==================== CACHE ====================
+class CorpusCache:
+    """On-disk cache of parsed question paper CSVs"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    def _path_record(self, csv_file_path):
+        key = hashlib.sha1(os.path.abspath(csv_file_path).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, 'paths', key + '.json')
+
+    def _blob(self, sha256):
+        return os.path.join(self.cache_dir, 'blobs', sha256 + '.json')
+
+    @staticmethod
+    def _read_json(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != CACHE_VERSION:
+            return None
+        return data
+
+    @staticmethod
+    def _write_json(path, data):
+        """Write atomically so concurrent workers never see a partial file"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    def _load_blob(self, sha256):
+        blob = self._read_json(self._blob(sha256))
+        if blob is None:
+            return None
+        return list(zip(blob['page_nums'], blob['texts']))
+
+    def load(self, csv_file_path, metrics=NULL_METRICS):
+        """Return the (page_num, text) blocks of a CSV, parsing it only if needed"""
+        stat = os.stat(csv_file_path)
+        record_path = self._path_record(csv_file_path)
+        record = self._read_json(record_path)
+
+        if record and record['size'] == stat.st_size and record['mtime_ns'] == stat.st_mtime_ns:
+            blocks = self._load_blob(record['sha256'])
+            if blocks is not None:
+                self.hits += 1
+                metrics.count('corpus_cache_hits')
+                return blocks
+
+        sha256 = file_sha256(csv_file_path)
+        blocks = self._load_blob(sha256)
+        if blocks is None:
+            self.misses += 1
+            metrics.count('corpus_cache_misses')
+            blocks = parse_question_csv(csv_file_path, metrics)
+            self._store(self._blob(sha256), {
+                'version': CACHE_VERSION,
+                'source': os.path.basename(csv_file_path),
+                'page_nums': [page_num for page_num, _ in blocks],
+                'texts': [text for _, text in blocks],
+            })
+        else:
+            self.hits += 1
+            metrics.count('corpus_cache_hits')
+
+        self._store(record_path, {
+            'version': CACHE_VERSION,
+            'source': os.path.abspath(csv_file_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': sha256,
+        })
+        return blocks
+
+    def _store(self, path, data):
+        try:
+            self._write_json(path, data)
+        except OSError as e:
+            # A read-only or full disk only costs us the cache, never the prediction
+            sys.stderr.write(f"[WARN] Could not write corpus cache {path}: {e}\n")
+
+
+def load_blocks(csv_file_path, cache=None, metrics=NULL_METRICS):
+    """Load (page_num, text) blocks of a CSV, through the cache unless disabled"""
+    if os.environ.get('EXAM_PREDICTOR_NO_CACHE'):
+        return parse_question_csv(csv_file_path, metrics)
+    return (cache or _default_cache()).load(csv_file_path, metrics)
+
+
+_shared_cache = None
+
+
+def _default_cache():
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = CorpusCache()
+    return _shared_cache
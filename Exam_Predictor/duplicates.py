@@ -0,0 +1,242 @@
+"""
+DUPLICATES - near-duplicate question detection with MinHash and LSH
+
+Papers repeat questions with small OCR and wording changes ("Define entropy."
+/ "What is entropy?" / "What is the entropy ?"). Every question is reduced to
+its content words (question stems such as "what is", "define", "explain" and
+filler words are dropped) and shingled into its words and word bigrams.
+Word shingles keep short questions that differ in one content word apart
+("implement stack" / "implement queue"), which character n-grams would merge.
+Each shingle set is summarized by a MinHash signature, whose agreement rate
+estimates the Jaccard similarity of two sets.
+
+Signatures are split into bands; questions that agree on every row of at
+least one band share a bucket and become candidates. Only candidates are
+compared, so building the index is linear in the number of questions rather
+than all-pairs. A candidate cluster is joined only if the exact Jaccard
+similarity between the new question and the cluster's representative (its
+first member) reaches the threshold, so clusters cannot chain A ~ B ~ C into
+one group when A and C are different questions. Clusters span years and
+subjects.
+"""
+
+import re
+import zlib
+
+import numpy as np
+
+
+NUM_PERM = 64
+BANDS = 16
+# Jaccard similarity of word shingles above which two questions are the same question
+THRESHOLD = 0.75
+MERSENNE_PRIME = (1 << 31) - 1
+
+STEM_WORDS = frozenset("""
+    a about also an and any are as at be between briefly brief by can define definition
+    describe description detail details discuss do does each example examples explain
+    following for from give how illustrate in is it its justify know meant mention name note
+    notes of on or short state suitable the their them these this to understand what whatis
+    when where which why with write you your
+""".split())
+WORD_PATTERN = re.compile(r'[a-z0-9]+')
+# Multi-word stems whose words are content words elsewhere ("mean" of a dataset, "help" desk)
+STEM_PHRASE_PATTERN = re.compile(r"\bwhat\s+do\s+you\s+mean\b|\b(?:the\s+)?(?:need|help)\s+of\b")
+# Page footers, paper codes and group headers that OCR glues onto questions
+BOILERPLATE_PATTERN = re.compile(
+    r"(?:\*+\s*)?end\s+of\s+paper.*"
+    r"|\S*(?:https?:|www\.)\S*"
+    r"|\S*/\S*/\S*"
+    r"|whatsapp.*"
+    r"|\bans\w*\s+any\s+\w+\s+of\s+the\s+\w+"
+    r"|\bgroup\s*[-–—]*\s*\S{1,3}\s*[-–—]*\s*\(?[^)]{0,30}answer\s+type\s+questions?\)?",
+    re.IGNORECASE | re.DOTALL
+)
+
+
+def content_words(text):
+    """Lower-cased words of a question without boilerplate, stems and filler words"""
+    text = STEM_PHRASE_PATTERN.sub(' ', BOILERPLATE_PATTERN.sub(' ', text).lower())
+    return [word for word in WORD_PATTERN.findall(text) if word not in STEM_WORDS]
+
+
+def shingles(text):
+    """Words and word bigrams of a question's content words, hashed to 32 bits"""
+    words = content_words(text)
+    grams = set(words)
+    grams.update(f"{first} {second}" for first, second in zip(words, words[1:]))
+    return np.fromiter(sorted(zlib.crc32(gram.encode('utf-8')) for gram in grams),
+                       dtype=np.uint64, count=len(grams))
+
+
+def jaccard(first, second):
+    """Jaccard similarity of two sorted, unique shingle arrays"""
+    if first.size == 0 or second.size == 0:
+        return 0.0
+    shared = np.intersect1d(first, second, assume_unique=True).size
+    return shared / (first.size + second.size - shared)
+
+
+class MinHasher:
+    """Universal hash permutations (a * x + b) mod p for MinHash signatures"""
+
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self.b = rng.randint(0, MERSENNE_PRIME, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    def signature(self, hashes):
+        """MinHash signature of hashed shingles, or None for an empty set"""
+        if hashes.size == 0:
+            return None
+        # a < 2**31 and x < 2**32 after the reduction, so the product fits in 64 bits
+        x = hashes % MERSENNE_PRIME
+        permuted = (np.outer(self.a, x) + self.b[:, None]) % MERSENNE_PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+
+class DuplicateIndex:
+    """LSH index of question signatures with representative-checked clusters"""
+
+    def __init__(self, num_perm=NUM_PERM, bands=BANDS, threshold=THRESHOLD, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.hasher = MinHasher(num_perm, seed)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.buckets = [{} for _ in range(bands)]
+        self.texts = []
+        self.subjects = []
+        self.years = []
+        self.shingles = []
+        # First member of the cluster of every question (itself if it started one)
+        self.representative = []
+
+    def __len__(self):
+        return len(self.texts)
+
+    def add(self, text, subject=None, year=None):
+        """Index one question and add it to the closest matching cluster, if any"""
+        question_id = len(self.texts)
+        hashes = shingles(text)
+        signature = self.hasher.signature(hashes)
+        self.texts.append(text)
+        self.subjects.append(subject)
+        self.years.append(year)
+        self.shingles.append(hashes)
+        self.representative.append(question_id)
+        if signature is None:
+            return question_id
+
+        candidates = set()
+        for band, buckets in enumerate(self.buckets):
+            key = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            members = buckets.setdefault(key, [])
+            candidates.update(members)
+            members.append(question_id)
+
+        best_root, best_similarity = None, self.threshold
+        for root in sorted({self.representative[other] for other in candidates}):
+            similarity = jaccard(hashes, self.shingles[root])
+            if similarity >= best_similarity and (best_root is None or similarity > best_similarity):
+                best_root, best_similarity = root, similarity
+        if best_root is not None:
+            self.representative[question_id] = best_root
+        return question_id
+
+    def add_many(self, texts, subject=None, years=None):
+        years = years if years is not None else [None] * len(texts)
+        for text, year in zip(texts, years):
+            self.add(text, subject, year)
+
+    def clusters(self, subject=None, min_size=2):
+        """Clusters with at least `min_size` members (of `subject`, if given), most repeated first
+
+        Each cluster is a dict with the representative question, its count,
+        the distinct years and subjects it appeared in and its variants.
+        """
+        groups = {}
+        for i in range(len(self.texts)):
+            groups.setdefault(self.representative[i], []).append(i)
+
+        clusters = []
+        for members in groups.values():
+            own = [i for i in members if subject is None or self.subjects[i] == subject]
+            if len(own) < min_size:
+                continue
+            years = sorted({self.years[i] for i in own if self.years[i] is not None})
+            variants = list(dict.fromkeys(self.texts[i] for i in own))
+            clusters.append({
+                'question': representative(self.texts[i] for i in own),
+                'count': len(own),
+                'years': years,
+                'subjects': sorted({str(self.subjects[i]) for i in members
+                                    if self.subjects[i] is not None}),
+                'variants': variants,
+            })
+        clusters.sort(key=lambda c: (-len(c['years']), -c['count'], c['question']))
+        return clusters
+
+    def most_repeated(self, subject=None, top=10):
+        """The `top` most repeated questions, repeats across more years first"""
+        return self.clusters(subject)[:top]
+
+
+def representative(texts):
+    """The most frequent wording of a cluster
+
+    Ties prefer texts that start like a sentence (OCR fragments often do not),
+    then shorter texts, which carry less glued-on noise.
+    """
+    counts = {}
+    for text in texts:
+        counts[text] = counts.get(text, 0) + 1
+    return min(counts, key=lambda text: (-counts[text], not text[:1].isupper(), len(text), text))
+
+
+def build_corpus_index(subjects=None):
+    """Index the segmented questions of every subject ({key: csv path}, default: all indexed subjects)"""
+    from corpus import load_blocks
+    from segmentation import Segmenter
+
+    if subjects is None:
+        from subject_index import get_subject_index
+        subjects = {s.key: s.csv_path for s in get_subject_index().subjects.values()}
+
+    index = DuplicateIndex()
+    for key, csv_file_path in subjects.items():
+        segmenter = Segmenter(key)
+        for _, text in load_blocks(csv_file_path):
+            segmenter.feed(text)
+        index.add_many(segmenter.columns['text'], key, segmenter.columns['year'])
+    return index
+
+
+# ==================== CLI ====================
+if __name__ == "__main__":
+    import argparse
+    import json
+    import sys
+
+    from subject_index import get_subject_index
+
+    parser = argparse.ArgumentParser(description="Most repeated questions across the question paper corpus")
+    parser.add_argument('subject', nargs='?', default=None,
+                        help="Subject name or alias (default: clusters of all subjects)")
+    parser.add_argument('--top', type=int, default=10, help="Number of clusters to print")
+    args = parser.parse_args()
+
+    subject_key = None
+    if args.subject:
+        subject, _ = get_subject_index().route(args.subject)
+        if subject is None:
+            sys.stderr.write(f"[ERROR] No subject matches '{args.subject}'\n")
+            sys.exit(1)
+        subject_key = subject.key
+
+    index = build_corpus_index()
+    clusters = index.clusters(subject_key)
+    sys.stderr.write(f"[OK] {len(index)} questions, {len(clusters)} repeated\n")
+    json.dump(clusters[:args.top], sys.stdout, indent=2, ensure_ascii=False)
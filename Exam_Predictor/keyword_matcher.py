@@ -0,0 +1,218 @@
+"""
+KEYWORD MATCHER - single-pass phrase counting for the Exam Question Predictor
+
+Counting every syllabus keyword with its own `re.findall` scans the whole text
+once per keyword. The matcher compiles all phrases into one prefix-factored
+(trie) regex and walks the text once, reporting at each position the longest
+phrase that starts there. Shorter phrases starting at the same position are
+prefixes of that match, so they are resolved from a precomputed table instead
+of another scan.
+
+Two kinds of phrases are supported:
+1. Keywords - counted individually with `\\bkeyword\\b` semantics
+2. Indicator groups - counted like the alternation `a|b|c` (no word
+   boundaries, first alternative wins, non-overlapping matches)
+Both are case-insensitive and give exactly the counts `re.findall` would.
+"""
+
+import re
+from bisect import bisect_right
+
+import numpy as np
+
+
+# Characters that `re.IGNORECASE` matches to ASCII letters but str.lower()
+# does not map to them (U+212A KELVIN SIGN lowers to 'k' and is safe)
+_IGNORECASE_ONLY_FOLDS = ('\u0130', '\u0131', '\u017f')
+
+
+# Question-type and subject indicators counted by extract_features.
+# Each group behaves like the regex alternation of its phrases.
+FEATURE_INDICATORS = {
+    'is_definition': ('what is', 'define'),
+    'is_calculation': ('calculate', 'compute'),
+    'is_conceptual': ('explain', 'discuss'),
+    'is_algorithm': ('algorithm', 'steps', 'procedure'),
+    'stats_keywords': ('mean', 'median', 'variance', 'standard deviation',
+                       'distribution', 'probability'),
+    'ml_keywords': ('regression', 'classification', 'clustering',
+                    'decision tree', 'algorithm'),
+}
+
+
+def _is_word_char(ch):
+    """Mirror of the `\\w` test used by the `re` module"""
+    return ch.isalnum() or ch == '_'
+
+
+def _is_boundary(text, index):
+    """True when `\\b` would match at text[index]"""
+    before = index > 0 and _is_word_char(text[index - 1])
+    after = index < len(text) and _is_word_char(text[index])
+    return before != after
+
+
+def _build_trie_pattern(phrases):
+    """Build a regex body matching the longest of `phrases` at a position
+
+    Every phrase end carries an empty capture group, so `match.lastindex`
+    identifies the matched phrase. Returns (pattern, phrases by group index - 1).
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    terminals = []
+
+    def build(node, prefix):
+        marker = ''
+        if '' in node:
+            terminals.append(prefix)
+            marker = '()'
+        alternatives = [re.escape(ch) + build(child, prefix + ch)
+                        for ch, child in sorted(node.items()) if ch]
+        if not alternatives:
+            return marker
+        if len(alternatives) == 1:
+            body = alternatives[0]
+        else:
+            body = '(?:' + '|'.join(alternatives) + ')'
+        # A phrase ending here makes the rest optional (greedy = longest)
+        return f'{marker}(?:{body})?' if marker else body
+
+    return build(trie, ''), terminals
+
+
+class KeywordMatcher:
+    """Counts keywords and indicator groups in a single scan of the text"""
+
+    def __init__(self, keywords, indicator_groups=None):
+        self.keywords = tuple(keywords)
+        self.indicator_groups = {name: tuple(phrases)
+                                 for name, phrases in (indicator_groups or {}).items()}
+
+        # Lower-cased phrase -> original keywords / keyword slots / (group, alternative index)
+        self._keyword_names = {}
+        self._keyword_slots = {}
+        for slot, keyword in enumerate(self.keywords):
+            names = self._keyword_names.setdefault(keyword.lower(), [])
+            if keyword not in names:
+                names.append(keyword)
+            self._keyword_slots.setdefault(keyword.lower(), []).append(slot)
+        self._group_index = {name: i for i, name in enumerate(self.indicator_groups)}
+        self._group_members = {}
+        for name, phrases in self.indicator_groups.items():
+            for order, phrase in enumerate(phrases):
+                self._group_members.setdefault(phrase.lower(), []).append((name, order))
+
+        phrases = set(self._keyword_names) | set(self._group_members)
+        phrases.discard('')
+        # Every phrase that can also match where `longest` matched
+        self._prefixes = {
+            longest: tuple(sorted((p for p in phrases if longest.startswith(p)), key=len))
+            for longest in phrases
+        }
+
+        self._ascii_phrases = all(phrase.isascii() for phrase in phrases)
+        body, self._terminals = _build_trie_pattern(sorted(phrases))
+        if not phrases:
+            body = '(?!)'
+        self._pattern = re.compile(f'(?={body})')
+        self._pattern_ignorecase = re.compile(f'(?={body})', re.IGNORECASE)
+
+    def _scan(self, text):
+        """Yield (start, keyword_phrases, groups) for every position with a hit"""
+        keyword_end = {}
+        group_end = {}
+
+        # Matching lower-cased text case-sensitively is much faster and, for
+        # ASCII phrases, equivalent unless one of the special folds is present
+        if text.isascii() or (self._ascii_phrases and
+                              not any(ch in text for ch in _IGNORECASE_ONLY_FOLDS)):
+            matches = self._pattern.finditer(text.lower())
+        else:
+            matches = self._pattern_ignorecase.finditer(text)
+
+        for match in matches:
+            start = match.start()
+            leading = None
+            keyword_phrases = []
+            hits = {}
+
+            for phrase in self._prefixes[self._terminals[match.lastindex - 1]]:
+                end = start + len(phrase)
+
+                if phrase in self._keyword_names and start >= keyword_end.get(phrase, 0):
+                    if leading is None:
+                        leading = _is_boundary(text, start)
+                    if leading and _is_boundary(text, end):
+                        keyword_end[phrase] = end
+                        keyword_phrases.append(phrase)
+
+                for group, order in self._group_members.get(phrase, ()):
+                    if start < group_end.get(group, 0):
+                        continue
+                    if group not in hits or order < hits[group][0]:
+                        hits[group] = (order, end)
+
+            for group, (order, end) in hits.items():
+                group_end[group] = end
+
+            if keyword_phrases or hits:
+                yield start, keyword_phrases, hits
+
+    def count(self, text):
+        """Return (keyword_counts, group_counts) for `text`
+
+        keyword_counts only holds keywords that occur at least once;
+        group_counts holds every indicator group.
+        """
+        keyword_counts = {}
+        group_counts = dict.fromkeys(self.indicator_groups, 0)
+
+        for _, keyword_phrases, groups in self._scan(text):
+            for phrase in keyword_phrases:
+                for name in self._keyword_names[phrase]:
+                    keyword_counts[name] = keyword_counts.get(name, 0) + 1
+            for group in groups:
+                group_counts[group] += 1
+
+        return keyword_counts, group_counts
+
+    def count_rows(self, texts):
+        """Count many texts in one scan
+
+        Returns two int32 matrices: (len(texts), len(self.keywords)) keyword
+        counts in `self.keywords` order and (len(texts), len(indicator_groups))
+        group counts in `indicator_groups` order.
+        """
+        texts = list(texts)
+        # Newlines are never part of a phrase and act as word boundaries, so
+        # scanning the joined text gives the same counts as scanning each row
+        row_starts = []
+        offset = 0
+        for text in texts:
+            row_starts.append(offset)
+            offset += len(text) + 1
+        joined = '\n'.join(texts)
+
+        keyword_rows, keyword_cols = [], []
+        group_rows, group_cols = [], []
+        for start, keyword_phrases, groups in self._scan(joined):
+            row = bisect_right(row_starts, start) - 1
+            for phrase in keyword_phrases:
+                slots = self._keyword_slots[phrase]
+                keyword_rows.extend([row] * len(slots))
+                keyword_cols.extend(slots)
+            for group in groups:
+                group_rows.append(row)
+                group_cols.append(self._group_index[group])
+
+        keyword_counts = np.zeros((len(texts), len(self.keywords)), dtype=np.int32)
+        group_counts = np.zeros((len(texts), len(self.indicator_groups)), dtype=np.int32)
+        np.add.at(keyword_counts, (keyword_rows, keyword_cols), 1)
+        np.add.at(group_counts, (group_rows, group_cols), 1)
+        return keyword_counts, group_counts
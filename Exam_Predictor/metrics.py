@@ -0,0 +1,95 @@
+"""
+METRICS - per-stage timings and counters for the prediction hot path
+
+A Metrics object is threaded through loading and prediction. Stages are
+timed with `with metrics.stage('feature_extraction'):` and accumulate when a
+stage runs more than once; counters are plain integers (bytes parsed, lines
+scored, regex scans, cache hits). Code that is not being measured gets
+NULL_METRICS, whose methods do nothing.
+
+The collected values are available as a dict (returned with the result), as
+one JSON log line, or in the Prometheus text exposition format.
+"""
+
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+
+METRIC_PREFIX = 'exam_predictor'
+
+
+class Metrics:
+    """Accumulated stage timings (seconds) and counters"""
+
+    def __init__(self):
+        self.timings = {}
+        self.counters = {}
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - began
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def merge(self, other):
+        """Add the timings and counters of another Metrics (e.g. one request) to this one"""
+        for name, seconds in other.timings.items():
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+        for name, value in other.counters.items():
+            self.count(name, value)
+
+    def as_dict(self):
+        return {
+            'timings_ms': {name: round(seconds * 1000, 3) for name, seconds in self.timings.items()},
+            'counters': dict(self.counters),
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 3),
+        }
+
+    def to_json_log(self, **fields):
+        """One JSON log line with the metrics and any extra fields"""
+        record = {'event': 'metrics', 'ts': round(time.time(), 3), **fields, **self.as_dict()}
+        return json.dumps(record, sort_keys=True)
+
+    def to_prometheus(self, labels=None):
+        """Prometheus text exposition of the timings and counters"""
+        base_labels = dict(labels or {})
+        lines = [
+            f"# HELP {METRIC_PREFIX}_stage_seconds Time spent in each prediction stage.",
+            f"# TYPE {METRIC_PREFIX}_stage_seconds counter",
+        ]
+        for name, seconds in sorted(self.timings.items()):
+            lines.append(f"{METRIC_PREFIX}_stage_seconds{_labels(base_labels, stage=name)} {seconds:.6f}")
+        for name, value in sorted(self.counters.items()):
+            metric = f"{METRIC_PREFIX}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_labels(base_labels)} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+class NullMetrics:
+    """Metrics that record nothing"""
+
+    def stage(self, name):
+        return nullcontext()
+
+    def count(self, name, value=1):
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+def _labels(labels, **extra):
+    labels = {**labels, **extra}
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for value in labels.values())
+    return '{' + ','.join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + '}'
@@ -0,0 +1,147 @@
+"""
+PAGES DECODER - streaming decoder for the OCR `pages` column
+
+A `pages` cell is the Python repr of the OCR output of a whole paper:
+
+    [{'page_num': 1, 'width': ..., 'blocks': [{'type': ..., 'bbox': [...], 'text': '...',
+      'lines': [{'text': ..., 'bbox': [...], 'spans': [...]}]}]}, ...]
+
+Prediction only needs the block texts and their page numbers, but
+ast.literal_eval builds a syntax tree and then a dict or list for every line,
+span and bounding box first. This decoder scans the cell with one tokenizing
+regex instead, tracking only the nesting depth: keys at depth 2 belong to a
+page and `text` keys at depth 4 under `blocks` are block texts. Every other
+container value (bounding boxes, lines, spans) is matched whole by the regex
+and skipped without being decoded, so the Python loop sees a handful of
+tokens per block and no intermediate objects are built.
+
+Blocks are yielded page by page as the scan reaches the end of each page,
+and iter_csv_blocks covers every row of a CSV, not just the first.
+"""
+
+import ast
+import csv
+import re
+import sys
+
+
+# A quoted repr string; the unrolled loops keep the regex engine from backtracking per character
+STRING = r"'[^'\\]*(?:\\.[^'\\]*)*'|\"[^\"\\]*(?:\\.[^\"\\]*)*\""
+FILLER = r"[^'\"\[\]{}]"
+# Containers nested deeper than this are tokenized bracket by bracket instead of skipped whole
+SKIP_DEPTH = 8
+
+
+def _container_pattern(depth):
+    """A list or dict nested at most `depth` levels, matched in one go"""
+    level = rf"(?:{FILLER}++|{STRING})*+"
+    for _ in range(depth):
+        level = rf"(?:{FILLER}++|{STRING}|[\[{{]{level}[\]}}])*+"
+    return rf"[\[{{]{level}[\]}}]"
+
+
+# One match per token the decoder cares about: the opening of a `blocks` list,
+# a key with its scalar value or its whole (skipped) container value, a bare
+# string or a bracket. Numbers, commas and whitespace in between are consumed
+# by the leading filler run.
+TOKEN_PATTERN = re.compile(
+    rf"{FILLER}*+(?:"
+    rf"(?P<blocks>(?:'blocks'|\"blocks\")\s*:\s*\[)"
+    rf"|(?P<key>{STRING})\s*:\s*(?P<value>{STRING}|-?\d+|None|{_container_pattern(SKIP_DEPTH)})?"
+    rf"|{STRING}"
+    r"|(?P<bracket>[\[\]{}])"
+    ")",
+    re.DOTALL
+)
+
+PAGE_DEPTH = 2
+BLOCK_DEPTH = 4
+
+
+class MissingPagesColumn(ValueError):
+    """The CSV has no `pages` column"""
+
+
+def decode_string(token):
+    """Value of a quoted repr string"""
+    body = token[1:-1]
+    if '\\' not in body:
+        return body
+    return ast.literal_eval(token)
+
+
+def decode_scalar(token):
+    if token[0] in '\'"':
+        return decode_string(token)
+    if token == 'None':
+        return None
+    return int(token)
+
+
+def iter_page_blocks(cell):
+    """Yield (page_num, text) for every block of a `pages` cell, one page at a time"""
+    depth = 0
+    section = None
+    page_num = None
+    texts = []
+    for match in TOKEN_PATTERN.finditer(cell):
+        bracket = match.group('bracket')
+        if bracket is not None:
+            if bracket in '[{':
+                depth += 1
+                continue
+            depth -= 1
+            if depth == PAGE_DEPTH - 1:
+                # page_num may follow the blocks, so a page is emitted once it is closed
+                for text in texts:
+                    yield page_num, text
+                section, page_num, texts = None, None, []
+        elif match.group('blocks') is not None:
+            if depth == PAGE_DEPTH:
+                section = 'blocks'
+            depth += 1
+        else:
+            key = match.group('key')
+            if key is None:
+                continue
+            value = match.group('value')
+            scalar = value is not None and value[0] not in '[{'
+            if depth == PAGE_DEPTH:
+                section = decode_string(key)
+                if section == 'page_num' and scalar:
+                    page_num = decode_scalar(value)
+            elif depth == BLOCK_DEPTH and section == 'blocks' and scalar \
+                    and value[0] in '\'"' and decode_string(key) == 'text':
+                texts.append(decode_string(value))
+    if depth != 0:
+        raise ValueError("Unbalanced brackets in pages cell")
+
+
+def _raise_field_size_limit():
+    # A pages cell holds a whole paper, far beyond the csv module's 128 KiB default
+    limit = sys.maxsize
+    while True:
+        try:
+            csv.field_size_limit(limit)
+            return
+        except OverflowError:
+            limit //= 2
+
+
+def iter_csv_blocks(csv_file_path):
+    """Yield (row, page_num, text) for every OCR block of every row of a question paper CSV
+
+    Rows are read one at a time with the csv module; raises MissingPagesColumn
+    if the CSV has no `pages` column.
+    """
+    _raise_field_size_limit()
+    with open(csv_file_path, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        if 'pages' not in header:
+            raise MissingPagesColumn(f"{csv_file_path} has no 'pages' column")
+        column = header.index('pages')
+        for row, values in enumerate(reader):
+            if column < len(values) and values[column]:
+                for page_num, text in iter_page_blocks(values[column]):
+                    yield row, page_num, text
@@ -0,0 +1,295 @@
+"""
+QUESTION GENERATOR - practice questions from precompiled templates
+
+Templates are split once into the text before and after "{topic}", so a
+question is two string concatenations instead of a str.format call, and the
+topic -> question type mapping is computed once per syllabus from the
+syllabus's own question_types hints (see syllabus_registry.py). A
+QuestionGenerator is cached per syllabus version.
+
+generate_sample_questions uses sample(), which draws exactly like the
+original implementation did. Full practice sets come from practice_set():
+every topic of every probability bucket, at every difficulty, several
+templates each, deduplicated, from an RNG seeded per subject so a seed always
+reproduces the same set. The CLI writes the sets of many subjects as NDJSON,
+one question per line, generating subjects in parallel:
+
+    python question_generator.py [SUBJECT ...] --per-topic 2 --seed 7 --output practice.ndjson
+"""
+
+import random
+import re
+
+
+# Templates of the original sample questions, in their original order
+TEMPLATES = {
+    'definition': (
+        "Define {topic}.",
+        "What do you understand by {topic}?",
+        "Explain the concept of {topic}.",
+    ),
+    'difference': (
+        "Distinguish between X and Y in context of {topic}.",
+        "Compare the approaches of X and Y for {topic}.",
+    ),
+    'calculation': (
+        "Calculate the {topic} for the given dataset.",
+        "Compute {topic} with appropriate formulas.",
+    ),
+    'algorithm': (
+        "Describe the {topic} algorithm with example.",
+        "Explain step-by-step procedure for {topic}.",
+    ),
+}
+
+# Practice set templates by difficulty and question type
+PRACTICE_TEMPLATES = {
+    'Easy': {
+        'definition': (
+            "Define {topic}.",
+            "What do you understand by {topic}?",
+            "What is meant by {topic}?",
+            "Write a short note on {topic}.",
+        ),
+        'calculation': (
+            "State the formula used to compute {topic}.",
+            "What is {topic}? Write its formula.",
+        ),
+        'algorithm': (
+            "What is the purpose of the {topic} algorithm?",
+            "List the main steps of {topic}.",
+        ),
+    },
+    'Medium': {
+        'definition': (
+            "Explain the concept of {topic}.",
+            "Explain {topic} with a suitable example.",
+            "Discuss the advantages and limitations of {topic}.",
+        ),
+        'calculation': (
+            "Calculate the {topic} for the given dataset.",
+            "Compute {topic} with appropriate formulas.",
+            "Explain with an example how {topic} is calculated.",
+        ),
+        'algorithm': (
+            "Describe the {topic} algorithm with example.",
+            "Explain step-by-step procedure for {topic}.",
+            "Write the pseudocode of {topic} and explain it.",
+        ),
+    },
+    'Hard': {
+        'definition': (
+            "Critically analyse the role of {topic} in a real-world application.",
+            "Compare {topic} with a related approach and justify when each should be used.",
+            "Design a solution to a practical problem using {topic}.",
+        ),
+        'calculation': (
+            "Derive the expression for {topic} and apply it to a numerical example.",
+            "Solve a numerical problem on {topic}, showing every step.",
+        ),
+        'algorithm': (
+            "Analyse the time and space complexity of {topic}.",
+            "Trace {topic} on a sample input and discuss its complexity.",
+        ),
+    },
+}
+
+DIFFICULTIES = tuple(PRACTICE_TEMPLATES)
+# Marks of the MAKAUT groups: A (very short), B (short), C (long)
+PRACTICE_POINTS = {'Easy': 2, 'Medium': 5, 'Hard': 15}
+BUCKETS = (('high', 'high_probability'), ('medium', 'medium_probability'), ('low', 'low_probability'))
+
+WHITESPACE = re.compile(r'\s+')
+
+
+def compile_template(template):
+    """(text before, text after) the single {topic} placeholder"""
+    before, marker, after = template.partition('{topic}')
+    if not marker or '{topic}' in after:
+        raise ValueError(f"Template needs exactly one {{topic}}: {template!r}")
+    # Templates are plain text apart from the placeholder; keep str.format's escapes working
+    return before.replace('{{', '{').replace('}}', '}'), after.replace('{{', '{').replace('}}', '}')
+
+
+def compile_templates(templates):
+    return {q_type: tuple(compile_template(t) for t in group) for q_type, group in templates.items()}
+
+
+COMPILED_TEMPLATES = compile_templates(TEMPLATES)
+COMPILED_PRACTICE_TEMPLATES = {difficulty: compile_templates(templates)
+                               for difficulty, templates in PRACTICE_TEMPLATES.items()}
+
+
+def classify_topic(topic, hints):
+    """Question type of a topic given a syllabus's question_hints: 'algorithm', 'calculation' or 'definition'"""
+    lowered = topic.lower()
+    if any(hint in lowered for hint in hints.get('algorithm', ())):
+        return 'algorithm'
+    if any(hint in lowered for hint in hints.get('calculation', ())):
+        return 'calculation'
+    return 'definition'
+
+
+class QuestionGenerator:
+    """Template engine for the topics of one syllabus"""
+
+    def __init__(self, definition):
+        self.subject = definition.key
+        self.hints = definition.question_hints
+        self.types = {topic: classify_topic(topic, self.hints) for topic in definition.all_topics}
+
+    def question_type(self, topic):
+        q_type = self.types.get(topic)
+        if q_type is None:
+            q_type = self.types[topic] = classify_topic(topic, self.hints)
+        return q_type
+
+    def sample(self, topics, difficulty='Mixed', rng=None):
+        """One question per topic entry, numbered from 1 (generate_sample_questions)"""
+        rng = rng or random
+        points = 3 if difficulty == 'Short' else 5
+        questions = []
+        for i, topic_data in enumerate(topics, 1):
+            topic = topic_data['topic']
+            before, after = rng.choice(COMPILED_TEMPLATES[self.question_type(topic)])
+            questions.append({
+                'question_number': i,
+                'topic': topic,
+                'difficulty': difficulty,
+                'question': before + topic + after,
+                'points': points,
+            })
+        return questions
+
+    def practice_set(self, predictions, per_topic=2, difficulties=DIFFICULTIES, rng=None):
+        """Yield practice questions for every topic of every probability bucket
+
+        Each topic gets up to `per_topic` different templates per difficulty;
+        questions that read the same (ignoring case and spacing) are emitted once.
+        """
+        rng = rng or random
+        seen = set()
+        number = 0
+        for bucket, key in BUCKETS:
+            for topic_data in predictions.get(key, ()):
+                topic = topic_data['topic']
+                q_type = self.question_type(topic)
+                for difficulty in difficulties:
+                    group = COMPILED_PRACTICE_TEMPLATES[difficulty][q_type]
+                    for before, after in rng.sample(group, min(per_topic, len(group))):
+                        question = before + topic + after
+                        identity = WHITESPACE.sub(' ', question.lower())
+                        if identity in seen:
+                            continue
+                        seen.add(identity)
+                        number += 1
+                        yield {
+                            'subject': self.subject,
+                            'question_number': number,
+                            'topic': topic,
+                            'probability': bucket,
+                            'difficulty': difficulty,
+                            'type': q_type,
+                            'question': question,
+                            'points': PRACTICE_POINTS[difficulty],
+                        }
+
+
+_generators = {}
+
+
+def get_generator(definition):
+    """Shared QuestionGenerator of a syllabus, rebuilt when the syllabus version changes"""
+    generator = _generators.get((definition.key, definition.version))
+    if generator is None:
+        generator = _generators[(definition.key, definition.version)] = QuestionGenerator(definition)
+    return generator
+
+
+def subject_practice_set(subject_key, csv_file_path, per_topic=2, seed=None):
+    """Practice questions of one subject as a list; runs in a pool process"""
+    # Imported here: the predictor itself imports this module
+    from Exam_Question_Predictor import QuestionPredictor, load_question_text
+
+    full_text = load_question_text(csv_file_path)
+    if full_text is None:
+        return []
+    predictor = QuestionPredictor(subject_key)
+    predictions = predictor.analyze_topics(full_text, full_text)
+    # Seeded per subject, so a set does not depend on which process generated it
+    rng = random.Random(f"{seed}:{subject_key}") if seed is not None else None
+    return list(get_generator(predictor.syllabus.definition).practice_set(predictions, per_topic, rng=rng))
+
+
+def generate_practice_sets(subjects, per_topic=2, seed=None, max_workers=None):
+    """Yield the practice questions of many subjects in subject order, generated across processes"""
+    import multiprocessing
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+
+    from Exam_Question_Predictor import warm_syllabi
+
+    jobs = [(subject.key, subject.csv_path, per_topic, seed) for subject in subjects]
+    max_workers = min(max_workers or os.cpu_count() or 1, max(len(jobs), 1))
+    if max_workers == 1:
+        for job in jobs:
+            yield from subject_practice_set(*job)
+        return
+
+    # Same pool setup as run_batch: syllabi are compiled once and inherited by forked workers
+    keys = [job[0] for job in jobs]
+    warm_syllabi(keys)
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+    else:
+        context = multiprocessing.get_context()
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                             initializer=warm_syllabi, initargs=(keys,)) as executor:
+        for questions in executor.map(subject_practice_set, *zip(*jobs)):
+            yield from questions
+
+
+# ==================== CLI ====================
+if __name__ == "__main__":
+    import argparse
+    import json
+    import sys
+    import time
+
+    from subject_index import get_subject_index
+
+    parser = argparse.ArgumentParser(description="Generate practice question sets as NDJSON")
+    parser.add_argument('subjects', nargs='*', help="Subject names or aliases (default: all subjects)")
+    parser.add_argument('--per-topic', type=int, default=2,
+                        help="Questions per topic and difficulty")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for reproducible sets")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument('--output', default=None, metavar='PATH',
+                        help="Write to this file instead of stdout")
+    args = parser.parse_args()
+
+    index = get_subject_index()
+    subjects = list(index.subjects.values())
+    if args.subjects:
+        subjects = []
+        for query in args.subjects:
+            subject, _ = index.route(query)
+            if subject is None:
+                sys.stderr.write(f"[WARN] No subject matches '{query}', skipping\n")
+            elif subject not in subjects:
+                subjects.append(subject)
+
+    began = time.perf_counter()
+    count = 0
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for record in generate_practice_sets(subjects, args.per_topic, args.seed, args.workers):
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            count += 1
+    finally:
+        if args.output:
+            out.close()
+    elapsed = time.perf_counter() - began
+    sys.stderr.write(f"[OK] {count} questions for {len(subjects)} subject(s) "
+                     f"in {elapsed:.2f}s ({count / max(elapsed, 1e-9):.0f} questions/sec)\n")
@@ -0,0 +1,117 @@
+"""
+RESULT CACHE - memoized prediction results
+
+Predictions are a pure function of the subject corpus, the syllabus and the
+request options (sample questions included, once their RNG is seeded), so
+identical requests are answered from a bounded LRU cache with a TTL. The
+cache can optionally be persisted to a JSON file so it survives restarts and
+can be shared by one-shot CLI runs.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+
+
+# Bump whenever the layout of prediction results changes
+CACHE_VERSION = 3
+
+
+def make_key(corpus_hash, syllabus_version, options=None):
+    """Stable cache key for one prediction request"""
+    payload = json.dumps([CACHE_VERSION, corpus_hash, syllabus_version, options or {}], sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def text_hash(text):
+    """Content hash of a corpus text"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """LRU + TTL cache of JSON-serializable prediction results"""
+
+    def __init__(self, maxsize=128, ttl=3600, path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        # key -> (expires_at, value), least recently used first
+        self._entries = OrderedDict()
+        if path:
+            self._load()
+
+    def get(self, key):
+        """Return the cached value for `key`, or None"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] < time.time():
+            del self._entries[key]
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, value):
+        """Store `value`, evicting the least recently used entries if full"""
+        self._entries[key] = (time.time() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        if self.path:
+            self._save()
+
+    def clear(self):
+        self._entries.clear()
+        if self.path:
+            self._save()
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            sys.stderr.write(f"[WARN] Ignoring unreadable result cache {self.path}: {e}\n")
+            return
+        now = time.time()
+        for key, expires_at, value in entries:
+            if expires_at >= now:
+                self._entries[key] = (expires_at, value)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _save(self):
+        entries = [[key, expires_at, value]
+                   for key, (expires_at, value) in self._entries.items()]
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            sys.stderr.write(f"[WARN] Could not persist result cache {self.path}: {e}\n")
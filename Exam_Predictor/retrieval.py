@@ -0,0 +1,364 @@
+"""
+RETRIEVAL - "past questions like this one" over a sparse TF-IDF index
+
+Every segmented question of every subject is a row of a CSR term-count
+matrix. The index is saved as an artifact (see artifact.py):
+
+    counts / indices / indptr   raw term counts, CSR            (kept for refreshes)
+    weights                     l2-normalized TF-IDF values of the same CSR
+    idf / df                    per-term inverse and raw document frequency
+    terms                       vocabulary, column order
+    subject_ids / years / live  per-row subject, paper year (-1 = unknown), not deleted
+    text_blob / text_offsets    question texts, utf-8
+
+Loading memory-maps the arrays, so the TF-IDF matrix is usable immediately.
+Queries are tokenized like the index rows (see duplicates.content_words),
+stacked into one sparse matrix and scored against every row with a single
+sparse product; cosine similarity is a plain dot product because both sides
+are normalized.
+
+Papers are keyed by the sha256 of their CSV. refresh() only stats the
+indexed files; a new or changed file is segmented and appended, the rows of
+its previous version are marked deleted and document frequencies are
+updated from the affected rows alone. Deleted rows are compacted away when
+they outnumber the live ones.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+from artifact import ArtifactError, artifact_lock, is_artifact, load_artifact, save_artifact
+from corpus import file_sha256, load_blocks
+from duplicates import content_words
+from segmentation import Segmenter
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_INDEX_PATH = os.environ.get('EXAM_PREDICTOR_RETRIEVAL_INDEX',
+                                    os.path.join(SCRIPT_DIR, 'retrieval_index'))
+RETRIEVAL_INDEX_KIND = 'question-retrieval-index'
+UNKNOWN_YEAR = -1
+
+
+class RetrievalIndex:
+    """Incrementally refreshed TF-IDF index of segmented questions"""
+
+    def __init__(self):
+        self.terms = []
+        self.vocabulary = {}
+        self.subjects = []
+        self.papers = {}
+        self.df = np.zeros(0, dtype=np.int64)
+        self.counts = np.zeros(0, dtype=np.int32)
+        self.indices = np.zeros(0, dtype=np.int32)
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.subject_ids = np.zeros(0, dtype=np.int16)
+        self.years = np.zeros(0, dtype=np.int16)
+        self.live = np.zeros(0, dtype=bool)
+        self.texts = []
+        self.weights = None
+        self.idf = None
+        self._matrix = None
+
+    def __len__(self):
+        return int(self.live.sum())
+
+    # ---------- building ----------
+    def _term_id(self, term):
+        term_id = self.vocabulary.get(term)
+        if term_id is None:
+            term_id = self.vocabulary[term] = len(self.terms)
+            self.terms.append(term)
+        return term_id
+
+    def _subject_id(self, subject):
+        if subject not in self.subjects:
+            self.subjects.append(subject)
+        return self.subjects.index(subject)
+
+    def add_rows(self, texts, subject, years):
+        """Append questions as rows; returns the (start, stop) row range"""
+        start = len(self.texts)
+        counts, indices, row_lengths = [], [], []
+        for text in texts:
+            row = {}
+            for term in content_words(text):
+                term_id = self._term_id(term)
+                row[term_id] = row.get(term_id, 0) + 1
+            indices.extend(sorted(row))
+            counts.extend(row[term_id] for term_id in sorted(row))
+            row_lengths.append(len(row))
+
+        new_indices = np.array(indices, dtype=np.int32)
+        self.df = np.concatenate([self.df, np.zeros(len(self.terms) - len(self.df), dtype=np.int64)])
+        self.df += np.bincount(new_indices, minlength=len(self.terms))
+        self.counts = np.concatenate([self.counts, np.array(counts, dtype=np.int32)])
+        self.indices = np.concatenate([self.indices, new_indices])
+        self.indptr = np.concatenate([self.indptr, self.indptr[-1] + np.cumsum(row_lengths, dtype=np.int64)])
+        self.subject_ids = np.concatenate([self.subject_ids,
+                                           np.full(len(row_lengths), self._subject_id(subject), dtype=np.int16)])
+        self.years = np.concatenate([self.years, np.array(
+            [UNKNOWN_YEAR if year is None else year for year in years], dtype=np.int16)])
+        self.live = np.concatenate([self.live, np.ones(len(row_lengths), dtype=bool)])
+        self.texts.extend(texts)
+        self.weights = None
+        return start, len(self.texts)
+
+    def remove_rows(self, start, stop):
+        """Mark rows deleted and take their terms out of the document frequencies"""
+        rows = np.arange(start, stop)[self.live[start:stop]]
+        for row in rows:
+            self.df[self.indices[self.indptr[row]:self.indptr[row + 1]]] -= 1
+        self.live[rows] = False
+        self.weights = None
+
+    def add_paper(self, csv_file_path, subject, stat=None):
+        """Index one question paper CSV, replacing an earlier version of the same file"""
+        stat = stat or os.stat(csv_file_path)
+        source = os.path.abspath(csv_file_path)
+        paper_id = file_sha256(csv_file_path)
+        for other_id, paper in list(self.papers.items()):
+            if paper['source'] == source and other_id != paper_id:
+                self.remove_rows(paper['start'], paper['stop'])
+                del self.papers[other_id]
+
+        if paper_id in self.papers:
+            # Same content (e.g. touched or copied): only remember the new stat
+            self.papers[paper_id].update(size=stat.st_size, mtime_ns=stat.st_mtime_ns, source=source)
+            return False
+
+        segmenter = Segmenter(subject)
+        for _, text in load_blocks(csv_file_path):
+            segmenter.feed(text)
+        start, stop = self.add_rows(segmenter.columns['text'], subject, segmenter.columns['year'])
+        self.papers[paper_id] = {'source': source, 'subject': subject, 'start': start, 'stop': stop,
+                                 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        return True
+
+    def refresh(self, subjects):
+        """Bring the index up to date with {subject: csv path}; returns the number of papers re-indexed
+
+        Unchanged files cost one stat each. Indexed files that no longer exist
+        are removed.
+        """
+        by_source = {paper['source']: paper for paper in self.papers.values()}
+        changed = 0
+        for subject, csv_file_path in subjects.items():
+            stat = os.stat(csv_file_path)
+            paper = by_source.get(os.path.abspath(csv_file_path))
+            if paper and (paper['size'], paper['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+                continue
+            changed += self.add_paper(csv_file_path, subject, stat)
+
+        for paper_id, paper in list(self.papers.items()):
+            if not os.path.exists(paper['source']):
+                self.remove_rows(paper['start'], paper['stop'])
+                del self.papers[paper_id]
+                changed += 1
+        return changed
+
+    def compact(self):
+        """Drop deleted rows once they outnumber the live ones"""
+        if self.live.all() or (~self.live).sum() <= self.live.sum():
+            return
+        keep = np.flatnonzero(self.live)
+        new_row = np.full(len(self.live), -1, dtype=np.int64)
+        new_row[keep] = np.arange(len(keep))
+        lengths = np.diff(self.indptr)[keep]
+        nnz = np.concatenate([np.arange(self.indptr[row], self.indptr[row + 1]) for row in keep]) \
+            if len(keep) else np.zeros(0, dtype=np.int64)
+
+        self.counts = self.counts[nnz]
+        self.indices = self.indices[nnz]
+        self.indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self.subject_ids = self.subject_ids[keep]
+        self.years = self.years[keep]
+        self.texts = [self.texts[row] for row in keep]
+        self.live = np.ones(len(keep), dtype=bool)
+        for paper in self.papers.values():
+            rows = new_row[paper['start']:paper['stop']]
+            rows = rows[rows >= 0]
+            paper['start'], paper['stop'] = (int(rows[0]), int(rows[-1]) + 1) if len(rows) else (0, 0)
+        self.weights = None
+
+    # ---------- scoring ----------
+    def _prepare(self):
+        """l2-normalized TF-IDF weights of every row, in the CSR layout of the counts"""
+        if self.weights is None:
+            n_live = int(self.live.sum())
+            self.idf = np.log((1 + n_live) / (1 + self.df)) + 1
+            weights = self.counts * self.idf[self.indices]
+            rows = np.repeat(np.arange(len(self.texts)), np.diff(self.indptr))
+            norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=len(self.texts)))
+            norms[norms == 0] = 1.0
+            self.weights = (weights / norms[rows]).astype(np.float32)
+            self._matrix = None
+        if self._matrix is None:
+            import scipy.sparse as sp
+
+            self._matrix = sp.csr_matrix((self.weights, self.indices, self.indptr),
+                                         shape=(len(self.texts), len(self.terms)))
+        return self._matrix
+
+    def query_matrix(self, queries):
+        """Normalized TF-IDF rows of the query texts; unknown terms are ignored"""
+        import scipy.sparse as sp
+
+        self._prepare()
+        data, indices, indptr = [], [], [0]
+        for query in queries:
+            row = {}
+            for term in content_words(query):
+                term_id = self.vocabulary.get(term)
+                if term_id is not None:
+                    row[term_id] = row.get(term_id, 0) + 1
+            values = np.array([row[term_id] * self.idf[term_id] for term_id in row])
+            norm = np.sqrt(np.dot(values, values)) if len(values) else 1.0
+            data.extend(values / norm)
+            indices.extend(row)
+            indptr.append(len(indices))
+        return sp.csr_matrix((np.array(data, dtype=np.float32), np.array(indices, dtype=np.int32),
+                              np.array(indptr, dtype=np.int64)), shape=(len(queries), len(self.terms)))
+
+    def search(self, queries, k=10, subject=None):
+        """Top-k most similar indexed questions for each query text
+
+        Returns one list per query of {'question', 'subject', 'year', 'score'}
+        dicts, best first. `subject` restricts the results to one subject key.
+        """
+        single = isinstance(queries, str)
+        queries = [queries] if single else list(queries)
+        matrix = self._prepare()
+        if not len(self.texts):
+            return [] if single else [[] for _ in queries]
+
+        # One sparse product for the whole batch: (rows x terms) . (terms x queries)
+        scores = (matrix @ self.query_matrix(queries).T).toarray()
+        allowed = self.live.copy()
+        if subject is not None:
+            allowed &= self.subject_ids == (self.subjects.index(subject) if subject in self.subjects else -1)
+        scores[~allowed] = 0.0
+
+        results = []
+        for column in scores.T:
+            candidates = np.flatnonzero(column > 0)
+            if len(candidates) > k:
+                candidates = candidates[np.argpartition(-column[candidates], k - 1)[:k]]
+            ranked = candidates[np.argsort(-column[candidates], kind='stable')]
+            results.append([{
+                'question': self.texts[row],
+                'subject': self.subjects[self.subject_ids[row]],
+                'year': None if self.years[row] == UNKNOWN_YEAR else int(self.years[row]),
+                'score': round(float(column[row]), 4),
+            } for row in ranked])
+        return results[0] if single else results
+
+    # ---------- persistence ----------
+    def save(self, path=DEFAULT_INDEX_PATH):
+        self.compact()
+        self._prepare()
+        encoded = [text.encode('utf-8') for text in self.texts]
+        offsets = np.concatenate([[0], np.cumsum([len(b) for b in encoded], dtype=np.int64)]).astype(np.int64)
+        save_artifact(path, RETRIEVAL_INDEX_KIND, {
+            'subjects': self.subjects,
+            'papers': self.papers,
+        }, {
+            'counts': self.counts,
+            'indices': self.indices,
+            'indptr': self.indptr,
+            'weights': self.weights,
+            'idf': self.idf,
+            'df': self.df,
+            'terms': np.array(self.terms, dtype=str) if self.terms else np.zeros(0, dtype='<U1'),
+            'subject_ids': self.subject_ids,
+            'years': self.years,
+            'live': self.live,
+            'text_blob': np.frombuffer(b''.join(encoded), dtype=np.uint8),
+            'text_offsets': offsets,
+        })
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_PATH):
+        meta, arrays = load_artifact(path, RETRIEVAL_INDEX_KIND)
+        index = cls()
+        index.subjects = meta['subjects']
+        index.papers = meta['papers']
+        index.terms = arrays['terms'].tolist()
+        index.vocabulary = {term: i for i, term in enumerate(index.terms)}
+        # Read-only maps; refreshing replaces them with in-memory copies
+        index.counts = arrays['counts']
+        index.indices = arrays['indices']
+        index.indptr = arrays['indptr']
+        index.weights = arrays['weights']
+        index.idf = arrays['idf']
+        index.df = np.array(arrays['df'])
+        index.subject_ids = arrays['subject_ids']
+        index.years = arrays['years']
+        index.live = np.array(arrays['live'])
+        blob, offsets = arrays['text_blob'], arrays['text_offsets']
+        index.texts = [bytes(blob[offsets[i]:offsets[i + 1]]).decode('utf-8')
+                       for i in range(len(offsets) - 1)]
+        return index
+
+
+def save_index(index, path=DEFAULT_INDEX_PATH):
+    """Save the index unless another process is already saving it; returns True if saved
+
+    Every pool worker may refresh the index, but only the holder of the
+    artifact lock writes it. A failed save is reported and otherwise ignored:
+    the refreshed index stays usable in memory.
+    """
+    with artifact_lock(path) as locked:
+        if not locked:
+            return False
+        try:
+            index.save(path)
+        except (OSError, ArtifactError) as e:
+            sys.stderr.write(f"[WARN] Could not save retrieval index {path}: {e}\n")
+            return False
+    return True
+
+
+def open_index(subjects, path=DEFAULT_INDEX_PATH):
+    """Load the saved index (or start a new one), refresh it against {subject: csv path} and save changes"""
+    index = None
+    if is_artifact(path):
+        try:
+            index = RetrievalIndex.load(path)
+        except ArtifactError as e:
+            sys.stderr.write(f"[WARN] Rebuilding retrieval index: {e}\n")
+    index = index or RetrievalIndex()
+    changed = index.refresh(subjects)
+    if changed or not is_artifact(path):
+        save_index(index, path)
+        sys.stderr.write(f"[OK] Retrieval index: {changed} paper(s) re-indexed, {len(index)} questions\n")
+    return index
+
+
+# ==================== CLI ====================
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from subject_index import get_subject_index
+
+    parser = argparse.ArgumentParser(description="Find past questions similar to the given ones")
+    parser.add_argument('questions', nargs='+', help="Question texts to search for")
+    parser.add_argument('--subject', default=None, help="Only return questions of this subject")
+    parser.add_argument('--top', type=int, default=5, help="Results per question")
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH, help="Index artifact directory")
+    args = parser.parse_args()
+
+    subject_index = get_subject_index()
+    subject_key = None
+    if args.subject:
+        subject, _ = subject_index.route(args.subject)
+        if subject is None:
+            sys.stderr.write(f"[ERROR] No subject matches '{args.subject}'\n")
+            sys.exit(1)
+        subject_key = subject.key
+
+    index = open_index({s.key: s.csv_path for s in subject_index.subjects.values()}, args.index)
+    json.dump(index.search(args.questions, args.top, subject_key), sys.stdout, indent=2, ensure_ascii=False)
@@ -0,0 +1,169 @@
+"""
+SEGMENTATION - split OCR question papers into individual questions
+
+A paper's OCR text is one long paragraph per page, e.g.
+
+    ... 2022-2023 ... Group-A (Very Short Answer Type Question) 1. Answer any
+    ten of the following : [1x10= 10] (i) What is IPv4? ... Group-B ...
+    [5x3=15] 2. Write the differences between TCP/IP and OSI model. [5] ...
+
+Every page is tokenized by one compiled pattern that finds, left to right:
+- the academic session ("2022-2023"), which starts a new paper and sets its year
+- "Group-A/B/C" headers, which set the group
+- marking schemes ("[5x3=15]"), which set the default marks of the group
+- question numbers ("7."), which set the number of the following questions
+- question ends: a "?" or an explicit marks bracket ("[5]", "(15)")
+
+OCR often garbles question numbers ("ZL" for "2."), so numbers are also
+inferred: questions are numbered on from one group to the next, and in
+Groups B and C a marks bracket worth the whole question (at least the
+group's marks) closes it, so the next question gets the next number. Parts
+of a long question ("[6]" in a 15-mark group) and "?" ends keep the number.
+
+The text between consecutive boundaries becomes one question row. Rows are
+collected column by column and returned as a single DataFrame with columns
+subject, year, group, number, text, marks.
+"""
+
+import re
+
+from corpus import load_blocks
+
+
+COLUMNS = ('subject', 'year', 'group', 'number', 'text', 'marks')
+
+SEGMENT_PATTERN = re.compile(
+    r"(?P<session>\b20\d\d\s*-\s*(?P<year>20\d\d)\b)"
+    r"|(?P<group_header>\b[Gg]roup\s*[-–—]?\s*(?P<group>[ABC])\b[^)}\]]*[)}\]]?)"
+    r"|(?P<scheme>[\[({]\s*(?P<each>\d{1,2})\s*[x×X%]\s*\d{1,2}\s*=\s*\d{1,3}\s*[\])}]?)"
+    r"|(?P<number>(?<!\S)(?P<question_number>\d{1,2})\s*[.,]\s+)"
+    r"|(?P<end>\?|[\[({]\s*(?P<marks>\d{1,2})\s*[\])}])"
+)
+# "Answer any ten of the following :" often runs straight into the first question
+INSTRUCTION_PATTERN = re.compile(r"\banswer\s+any\b.{0,40}?\bfollowing\b\s*[:;,.]?", re.IGNORECASE)
+# OCR renders "(iv)"-style sub-question labels as short junk like `x"` or `(mt`
+LEADING_NOISE = re.compile(r"^(?:\S{0,4}[^\w\s]\S{0,4}\s+|[ivxIVX]{1,4}\s+)*")
+# ... or as one or two short tokens right before the question word ("ZY What is")
+LABEL_BEFORE_QUESTION = re.compile(
+    r"^\S{1,3}(?:\s+\S{1,3})?\s+(?=(?:What|Whatis|Which|Why|How|When|Where|Who|Write|Define|"
+    r"Explain|Describe|Discuss|Give|Name|State|List|Draw|Find|Prove|Show|Compare|"
+    r"Differentiate|Distinguish|Construct|Consider|Is|Are|Does|Do|Can)\b)"
+)
+
+MIN_QUESTION_CHARS = 12
+# MAKAUT papers have about a dozen questions; larger "35," tokens are numbers in the text
+MAX_QUESTION_NUMBER = 15
+
+
+def clean_question(text):
+    """Strip OCR junk around a question"""
+    text = LEADING_NOISE.sub('', INSTRUCTION_PATTERN.sub('', text).strip())
+    text = LABEL_BEFORE_QUESTION.sub('', text)
+    return text.strip(' .,;:-_~|')
+
+
+class Segmenter:
+    """Stateful segmentation of the pages of one subject, in reading order"""
+
+    def __init__(self, subject=None):
+        self.subject = subject
+        self.year = None
+        self.group = None
+        self.number = None
+        # The current question is complete; the next one emitted takes number + 1
+        self.advance = False
+        self.group_marks = None
+        self.columns = {column: [] for column in COLUMNS}
+
+    def _emit(self, text, marks=None):
+        text = clean_question(text)
+        if self.group is None or len(text) < MIN_QUESTION_CHARS:
+            return
+        if self.advance:
+            self.number += 1
+            self.advance = False
+        self.columns['subject'].append(self.subject)
+        self.columns['year'].append(self.year)
+        self.columns['group'].append(self.group)
+        self.columns['number'].append(self.number)
+        self.columns['text'].append(text)
+        self.columns['marks'].append(marks if marks is not None else self.group_marks)
+
+    def feed(self, text):
+        """Segment one page; state carries over to the next page"""
+        start = 0
+        for match in SEGMENT_PATTERN.finditer(text):
+            kind = match.lastgroup
+            if kind == 'end':
+                marks = match.group('marks')
+                # The "?" belongs to the question, a marks bracket does not
+                piece = text[start:match.end()] if marks is None else text[start:match.start()]
+                marks = int(marks) if marks is not None else None
+                self._emit(piece, marks)
+                if self.group != 'A' and marks is not None and self.group_marks is not None \
+                        and marks >= self.group_marks and self.number is not None:
+                    self.advance = True
+            else:
+                self._emit(text[start:match.start()])
+                if kind == 'session':
+                    self.year = int(match.group('year'))
+                    self.group = self.number = self.group_marks = None
+                    self.advance = False
+                elif kind == 'group_header':
+                    # A new group starts with the question after the last one
+                    if match.group('group') != self.group:
+                        self.advance = self.number is not None
+                    self.group = match.group('group')
+                    self.group_marks = None
+                elif kind == 'scheme':
+                    self.group_marks = int(match.group('each'))
+                elif kind == 'number':
+                    number = int(match.group('question_number'))
+                    if 1 <= number <= MAX_QUESTION_NUMBER:
+                        self.number = number
+                        self.advance = False
+            start = match.end()
+        self._emit(text[start:])
+
+    def to_frame(self):
+        import pandas as pd
+
+        return pd.DataFrame({
+            'subject': pd.Series(self.columns['subject'], dtype='object'),
+            'year': pd.array(self.columns['year'], dtype='Int16'),
+            'group': pd.Series(self.columns['group'], dtype='object'),
+            'number': pd.array(self.columns['number'], dtype='Int16'),
+            'text': pd.Series(self.columns['text'], dtype='object'),
+            'marks': pd.array(self.columns['marks'], dtype='Int16'),
+        }, columns=list(COLUMNS))
+
+
+def segment_questions(texts):
+    """Question texts of a sequence of page texts, without building a DataFrame"""
+    segmenter = Segmenter()
+    for text in texts:
+        segmenter.feed(text)
+    return segmenter.columns['text']
+
+
+def segment_texts(texts, subject=None):
+    """Questions of a sequence of page texts as a DataFrame"""
+    segmenter = Segmenter(subject)
+    for text in texts:
+        segmenter.feed(text)
+    return segmenter.to_frame()
+
+
+def segment_csv(csv_file_path, subject=None):
+    """Questions of one subject question paper CSV"""
+    return segment_texts((text for _, text in load_blocks(csv_file_path)), subject)
+
+
+def segment_corpus(csv_files):
+    """Questions of many subjects, {subject: csv path}, as one DataFrame"""
+    import pandas as pd
+
+    frames = [segment_csv(csv_file_path, subject) for subject, csv_file_path in csv_files.items()]
+    if not frames:
+        return segment_texts([])
+    return pd.concat(frames, ignore_index=True)
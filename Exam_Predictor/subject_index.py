@@ -0,0 +1,166 @@
+"""
+SUBJECT INDEX - routes free-text queries to subject question papers
+
+The index is built once per process over ML_model/Question_CSV_files. Every
+`Question <Subject>.csv` becomes a subject whose normalized title and aliases
+are indexed two ways:
+1. Exact phrases - an alias or title appearing word-for-word in the query
+   ("BCA 3rd Sem DBMS" -> dbms) wins outright. Two-letter aliases ("se",
+   "os") are ordinary words too often, so they only count as the whole query
+2. Character trigrams - IDF-weighted containment of a name's trigrams in the
+   query, which tolerates typos and word order ("artifical inteligence")
+"""
+
+import math
+import os
+import re
+from collections import defaultdict
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPUS_DIR = os.environ.get(
+    'EXAM_PREDICTOR_CORPUS_DIR',
+    os.path.join(SCRIPT_DIR, '..', 'ML_model', 'Question_CSV_files')
+)
+
+# Common names for each subject, keyed by the normalized file title
+SUBJECT_ALIASES = {
+    'artificial inteligence': ['ai', 'artificial intelligence'],
+    'basic data science': ['bds', 'data science'],
+    'data structure with python': ['dsa', 'data structure', 'data structures'],
+    'design and analysis algorithm': ['daa', 'design and analysis of algorithms', 'algorithm design'],
+    'discrete mathematics': ['discrete math', 'discrete maths'],
+    'machine learning': ['ml'],
+    'networking': ['cn', 'computer networks', 'computer networking', 'networks'],
+    'object oriented programming with java': ['oop', 'oops', 'java'],
+    'operating system': ['os', 'operating systems'],
+    'programmiing concept with python': ['python', 'programming concept with python',
+                                         'programming with python'],
+    'relational database managemment system': ['dbms', 'rdbms', 'database', 'sql',
+                                               'relational database management system'],
+    'software engineering using uml': ['se', 'uml', 'software engineering'],
+}
+
+MIN_TRIGRAM_SCORE = 0.6
+# Shorter aliases only match a query consisting of just the alias
+MIN_PHRASE_CHARS = 3
+
+
+def normalize(text):
+    """Lower-case, turn separators into spaces and collapse whitespace"""
+    return ' '.join(re.findall(r'[a-z0-9]+', text.lower().replace('_', ' ')))
+
+
+def trigrams(text):
+    """Word-padded character trigrams of a normalized string"""
+    grams = set()
+    for word in text.split():
+        padded = f' {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class Subject:
+    """A subject served by the predictor"""
+
+    def __init__(self, key, title, csv_path, aliases=()):
+        self.key = key
+        self.title = title
+        self.csv_path = csv_path
+        self.aliases = tuple(aliases)
+
+    def __repr__(self):
+        return f"Subject({self.title!r})"
+
+
+class SubjectIndex:
+    """Maps subject names and aliases to their question paper CSVs"""
+
+    def __init__(self, subjects):
+        self.subjects = {subject.key: subject for subject in subjects}
+
+        # Every indexed name: (normalized name, subject key)
+        self._names = []
+        for subject in self.subjects.values():
+            for name in dict.fromkeys([subject.key, *map(normalize, subject.aliases)]):
+                if name:
+                    self._names.append((name, subject.key))
+
+        self._whole_queries = {name: key for name, key in self._names}
+        self._phrases = {name: key for name, key in self._names if len(name) >= MIN_PHRASE_CHARS}
+        self._max_phrase_words = max((len(name.split()) for name, _ in self._names), default=0)
+
+        # Trigram inverted index with IDF over names; very short aliases
+        # ("os", "ai") are only ever matched as exact words
+        name_grams = [trigrams(name) if len(name) > 3 else set() for name, _ in self._names]
+        document_frequency = defaultdict(int)
+        for grams in name_grams:
+            for gram in grams:
+                document_frequency[gram] += 1
+        self._idf = {gram: math.log(1 + len(self._names) / df)
+                     for gram, df in document_frequency.items()}
+        self._postings = defaultdict(list)
+        self._name_weight = []
+        for name_id, grams in enumerate(name_grams):
+            for gram in grams:
+                self._postings[gram].append(name_id)
+            self._name_weight.append(sum(self._idf[g] for g in grams))
+
+    @classmethod
+    def build(cls, corpus_dir=DEFAULT_CORPUS_DIR):
+        """Scan `corpus_dir` once for `Question *.csv` subject files"""
+        subjects = []
+        if not os.path.isdir(corpus_dir):
+            return cls(subjects)
+        for file_name in sorted(os.listdir(corpus_dir)):
+            if not (file_name.startswith('Question') and file_name.endswith('.csv')):
+                continue
+            title = file_name[len('Question'):-len('.csv')].replace('_', ' ').strip()
+            key = normalize(title)
+            subjects.append(Subject(key, title, os.path.join(corpus_dir, file_name),
+                                    SUBJECT_ALIASES.get(key, ())))
+        return cls(subjects)
+
+    def route(self, query):
+        """Return (subject, score) for the best match, or (None, 0.0)"""
+        text = normalize(query)
+        if not text:
+            return None, 0.0
+
+        key = self._whole_queries.get(text)
+        if key:
+            return self.subjects[key], 1.0
+
+        # Longest alias or title found word-for-word in the query
+        words = text.split()
+        for size in range(min(self._max_phrase_words, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                key = self._phrases.get(' '.join(words[start:start + size]))
+                if key:
+                    return self.subjects[key], 1.0
+
+        # Fuzzy: share of each name's trigram weight that the query contains
+        overlap = defaultdict(float)
+        for gram in trigrams(text):
+            for name_id in self._postings.get(gram, ()):
+                overlap[name_id] += self._idf[gram]
+        if not overlap:
+            return None, 0.0
+
+        name_id, weight = max(overlap.items(),
+                              key=lambda item: item[1] / self._name_weight[item[0]])
+        score = weight / self._name_weight[name_id]
+        if score < MIN_TRIGRAM_SCORE:
+            return None, score
+        return self.subjects[self._names[name_id][1]], score
+
+
+_shared_index = None
+
+
+def get_subject_index():
+    """Process-wide subject index, built on first use"""
+    global _shared_index
+    if _shared_index is None:
+        _shared_index = SubjectIndex.build()
+    return _shared_index
@@ -0,0 +1,113 @@
+"""
+SYLLABUS REGISTRY - per-subject topic/keyword definitions
+
+Each subject's syllabus lives in syllabi/<subject_key>.json, where the file
+name is the subject key used by the subject index with spaces replaced by
+underscores:
+
+    {
+        "subject": "Basic Data Science",
+        "version": 1,
+        "topics": {"Clustering": ["clustering", "k-means", ...], ...},
+        "question_types": {"algorithm": ["k-means", "knn", ...], "calculation": ["mean", ...]}
+    }
+
+`question_types` is optional: a keyword containing one of the listed hints
+gets algorithm (checked first) or calculation question templates, any other
+keyword definition templates. Syllabi without it use DEFAULT_QUESTION_HINTS.
+
+A syllabus is loaded once per process. Its flattened keyword list, the
+keyword -> category map and the compiled KeywordMatcher are built at load time
+and shared read-only by every predictor of that subject.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from types import MappingProxyType
+
+from keyword_matcher import FEATURE_INDICATORS, KeywordMatcher
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SYLLABUS_DIR = os.environ.get('EXAM_PREDICTOR_SYLLABUS_DIR',
+                              os.path.join(SCRIPT_DIR, 'syllabi'))
+DEFAULT_SUBJECT = 'basic data science'
+# Subject-neutral hints for syllabi that do not declare question_types
+DEFAULT_QUESTION_HINTS = {
+    'algorithm': ('algorithm',),
+    'calculation': ('calculate', 'compute'),
+}
+
+
+class SyllabusDefinition:
+    """Immutable, precompiled syllabus of one subject"""
+
+    def __init__(self, key, title, version, topics, question_hints=None):
+        self.key = key
+        self.title = title
+        self.version = version
+        self.topics = MappingProxyType({category: tuple(keywords)
+                                        for category, keywords in topics.items()})
+        self.all_topics = tuple(keyword for keywords in self.topics.values()
+                                for keyword in keywords)
+
+        categories = {}
+        for category, keywords in self.topics.items():
+            for keyword in keywords:
+                categories.setdefault(keyword, category)
+        self.keyword_categories = MappingProxyType(categories)
+
+        hints = DEFAULT_QUESTION_HINTS if question_hints is None else question_hints
+        self.question_hints = MappingProxyType({q_type: tuple(hint.lower() for hint in hints.get(q_type, ()))
+                                                for q_type in DEFAULT_QUESTION_HINTS})
+
+        self.matcher = KeywordMatcher(self.all_topics, FEATURE_INDICATORS)
+
+    def __repr__(self):
+        return f"SyllabusDefinition({self.title!r}, version={self.version!r})"
+
+
+def syllabus_path(subject_key):
+    """Path of the JSON definition for a subject key"""
+    return os.path.join(SYLLABUS_DIR, subject_key.replace(' ', '_') + '.json')
+
+
+def load_definition(path, subject_key):
+    """Read and compile one syllabus file"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    data = json.loads(raw.decode('utf-8'))
+    # Declared version plus content hash, so edits without a bump still count
+    version = f"{data.get('version', 0)}-{hashlib.sha1(raw).hexdigest()[:12]}"
+    return SyllabusDefinition(subject_key, data.get('subject', subject_key.title()),
+                              version, data['topics'], data.get('question_types'))
+
+
+_registry = {}
+
+
+def get_syllabus(subject_key=None):
+    """Shared syllabus for a subject, falling back to the default subject"""
+    subject_key = subject_key or DEFAULT_SUBJECT
+    definition = _registry.get(subject_key)
+    if definition is not None:
+        return definition
+
+    path = syllabus_path(subject_key)
+    if os.path.exists(path) or subject_key == DEFAULT_SUBJECT:
+        definition = load_definition(path, subject_key)
+    else:
+        sys.stderr.write(f"[WARN] No syllabus for '{subject_key}', using '{DEFAULT_SUBJECT}'\n")
+        definition = get_syllabus(DEFAULT_SUBJECT)
+    _registry[subject_key] = definition
+    return definition
+
+
+def available_subjects():
+    """Subject keys that have a syllabus file"""
+    if not os.path.isdir(SYLLABUS_DIR):
+        return []
+    return sorted(name[:-len('.json')].replace('_', ' ')
+                  for name in os.listdir(SYLLABUS_DIR) if name.endswith('.json'))
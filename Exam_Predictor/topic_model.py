@@ -0,0 +1,236 @@
+"""
+TOPIC MODEL - year-aware, time-decayed topic importance
+
+estimate_topic_importance rescans the whole corpus on every call and weighs a
+question from ten years ago the same as one from last semester. This model
+keeps a table of syllabus keyword counts per paper year instead:
+
+    years   [2023, 2024, 2025, -1]            -1 = questions without a known year
+    counts  int64 (n_years, n_topics)         topics in all_topics order
+
+Years come from the session headers found by segmentation ("2022-2023" ->
+2023). Importance is computed from the table at query time, so changing the
+decay never needs a rescan:
+
+    weight(year) = 0.5 ** ((reference_year - year) / half_life)
+
+with the newest year in the table as the reference. Undated questions get the
+weight of the oldest dated year, and half_life=None turns decay off, which
+gives exactly the scores of estimate_topic_importance.
+
+Adding a paper only scans the new text. Papers are identified by the sha256 of
+their CSV, so absorbing the same file twice is a no-op. Models are saved as
+artifacts (see artifact.py) under importance_models/<subject_key>/.
+"""
+
+import copy
+import os
+import sys
+
+import numpy as np
+
+from artifact import (ArtifactError, artifact_lock, artifact_version, is_artifact, load_artifact,
+                      save_artifact)
+from corpus import file_sha256, load_blocks
+from segmentation import Segmenter
+from syllabus_registry import get_syllabus
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODEL_DIR = os.environ.get('EXAM_PREDICTOR_IMPORTANCE_DIR',
+                                   os.path.join(SCRIPT_DIR, 'importance_models'))
+TOPIC_MODEL_KIND = 'topic-importance-model'
+
+# Years after which a paper counts half as much as the newest one
+DEFAULT_HALF_LIFE = 2.0
+UNDATED = -1
+
+
+class TopicImportanceModel:
+    """Per-year syllabus keyword counts of one subject"""
+
+    def __init__(self, definition, half_life=DEFAULT_HALF_LIFE):
+        self.definition = definition
+        self.half_life = half_life
+        self.counts = {}
+        # sha256 of every absorbed paper -> {'source': path, 'questions': n}
+        self.papers = {}
+
+    def add_questions(self, questions, years, paper_id=None, source=None):
+        """Count question texts into their years; returns False if the paper was already added"""
+        if paper_id is not None and paper_id in self.papers:
+            return False
+
+        by_year = {}
+        for text, year in zip(questions, years):
+            by_year.setdefault(UNDATED if year is None else int(year), []).append(text)
+        if by_year:
+            # One scan for the whole paper; every year is a row of the matrix
+            year_keys = list(by_year)
+            rows, _ = self.definition.matcher.count_rows('\n'.join(texts) for texts in by_year.values())
+            for year, row in zip(year_keys, rows):
+                if year not in self.counts:
+                    self.counts[year] = np.zeros(len(self.definition.all_topics), dtype=np.int64)
+                self.counts[year] += row
+
+        if paper_id is not None:
+            self.papers[paper_id] = {'source': source, 'questions': len(questions)}
+        return True
+
+    def add_csv(self, csv_file_path):
+        """Segment a question paper CSV and add its questions"""
+        paper_id = file_sha256(csv_file_path)
+        if paper_id in self.papers:
+            return False
+        segmenter = Segmenter(self.definition.key)
+        for _, text in load_blocks(csv_file_path):
+            segmenter.feed(text)
+        return self.add_questions(segmenter.columns['text'], segmenter.columns['year'],
+                                  paper_id, os.path.abspath(csv_file_path))
+
+    def year_weights(self, reference_year=None):
+        """Decay weight of every year in the table"""
+        dated = [year for year in self.counts if year != UNDATED]
+        if reference_year is None:
+            reference_year = max(dated, default=None)
+
+        def weight(year):
+            if self.half_life is None or reference_year is None:
+                return 1.0
+            return 0.5 ** (max(reference_year - year, 0) / self.half_life)
+
+        weights = {year: weight(year) for year in dated}
+        if UNDATED in self.counts:
+            weights[UNDATED] = weight(min(dated)) if dated else 1.0
+        return weights
+
+    def importance(self, reference_year=None):
+        """Decayed topic importance, normalized like estimate_topic_importance"""
+        total = np.zeros(len(self.definition.all_topics), dtype=np.float64)
+        for year, weight in self.year_weights(reference_year).items():
+            total += weight * self.counts[year]
+
+        importance = {}
+        for topic, score in zip(self.definition.all_topics, total.tolist()):
+            if score > 0:
+                importance[topic] = score
+        if importance:
+            max_score = max(importance.values())
+            importance = {t: (s / max_score) for t, s in importance.items()}
+        return importance
+
+    def with_half_life(self, half_life):
+        """Shallow copy scoring with another half-life; counts and papers are shared"""
+        model = copy.copy(self)
+        model.half_life = half_life
+        return model
+
+    def signature(self):
+        """Identifies the counts and decay, e.g. for result cache keys"""
+        return [self.half_life, sorted(self.papers)]
+
+    def save(self, path):
+        years = sorted(self.counts)
+        counts = np.array([self.counts[year] for year in years], dtype=np.int64)
+        save_artifact(path, TOPIC_MODEL_KIND, {
+            'subject': self.definition.key,
+            'syllabus_version': self.definition.version,
+            'topics': list(self.definition.all_topics),
+            'half_life': self.half_life,
+            'papers': self.papers,
+        }, {
+            'years': np.array(years, dtype=np.int32),
+            'counts': counts.reshape(len(years), len(self.definition.all_topics)),
+        })
+
+    @classmethod
+    def load(cls, path, definition=None):
+        """Load a saved model; raises ArtifactError if its syllabus has changed since"""
+        meta, arrays = load_artifact(path, TOPIC_MODEL_KIND, mmap=False)
+        definition = definition or get_syllabus(meta['subject'])
+        if meta.get('syllabus_version') != definition.version or \
+                meta.get('topics') != list(definition.all_topics):
+            raise ArtifactError(f"{path} was built for another version of the "
+                                f"'{definition.key}' syllabus")
+        model = cls(definition, meta.get('half_life', DEFAULT_HALF_LIFE))
+        model.counts = {int(year): row.copy() for year, row in zip(arrays['years'], arrays['counts'])}
+        model.papers = meta.get('papers', {})
+        return model
+
+
+def model_path(subject_key, model_dir=DEFAULT_MODEL_DIR):
+    """Artifact directory of a subject's model"""
+    return os.path.join(model_dir, subject_key.replace(' ', '_'))
+
+
+def saved_version(subject_key, model_dir=DEFAULT_MODEL_DIR):
+    """Version of a subject's saved model, or None; changes whenever it is saved (e.g. by --add)"""
+    return artifact_version(model_path(get_syllabus(subject_key).key, model_dir))
+
+
+def load_or_build(subject_key, csv_file_path, half_life=DEFAULT_HALF_LIFE, model_dir=DEFAULT_MODEL_DIR):
+    """The saved model of a subject, rebuilt only when its question paper CSV or syllabus changed
+
+    Papers added on top of the subject CSV are added again on a rebuild if
+    their files still exist. Concurrent callers (e.g. pool workers) may all
+    rebuild, but only the holder of the artifact lock saves; a failed save
+    still returns the rebuilt model.
+    """
+    definition = get_syllabus(subject_key)
+    path = model_path(definition.key, model_dir)
+    model = None
+    if is_artifact(path):
+        try:
+            model = TopicImportanceModel.load(path, definition)
+        except (ArtifactError, OSError) as e:
+            sys.stderr.write(f"[WARN] Rebuilding topic model: {e}\n")
+
+    if model is None or file_sha256(csv_file_path) not in model.papers:
+        base = os.path.abspath(csv_file_path)
+        extra_sources = [info.get('source') for info in model.papers.values()] if model else []
+        model = TopicImportanceModel(definition)
+        model.add_csv(csv_file_path)
+        for source in extra_sources:
+            if source and source != base and os.path.exists(source):
+                model.add_csv(source)
+        with artifact_lock(path) as locked:
+            if locked:
+                try:
+                    model.save(path)
+                except (ArtifactError, OSError) as e:
+                    sys.stderr.write(f"[WARN] Could not save topic model {path}: {e}\n")
+
+    # Decay is applied when scoring, so a different half-life needs no rebuild
+    model.half_life = half_life
+    return model
+
+
+# ==================== CLI ====================
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from subject_index import get_subject_index
+
+    parser = argparse.ArgumentParser(description="Build or update the topic importance model of a subject")
+    parser.add_argument('subject', help="Subject name or alias, e.g. 'dbms'")
+    parser.add_argument('--add', nargs='*', default=[], metavar='CSV',
+                        help="Question paper CSVs to add to the model")
+    parser.add_argument('--half-life', type=float, default=DEFAULT_HALF_LIFE,
+                        help="Years after which a paper counts half (0 disables decay)")
+    parser.add_argument('--model-dir', default=DEFAULT_MODEL_DIR,
+                        help="Directory of saved topic models")
+    args = parser.parse_args()
+
+    subject, _ = get_subject_index().route(args.subject)
+    if subject is None:
+        sys.stderr.write(f"[ERROR] No subject matches '{args.subject}'\n")
+        sys.exit(1)
+
+    model = load_or_build(subject.key, subject.csv_path, args.half_life or None, args.model_dir)
+    added = [csv_file_path for csv_file_path in args.add if model.add_csv(csv_file_path)]
+    if added:
+        model.save(model_path(subject.key, args.model_dir))
+    sys.stderr.write(f"[OK] {subject.title}: {len(model.papers)} paper(s), "
+                     f"years {sorted(model.counts)}, {len(added)} added\n")
+    json.dump(model.importance(), sys.stdout, indent=2)
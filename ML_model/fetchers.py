@@ -0,0 +1,123 @@
+# =============================
+# Source fetchers: where the pipeline gets its PDFs from
+# =============================
+#
+# Every fetcher fills `output_dir` with PDFs and returns the local paths it
+# holds. Files already present in `output_dir` are never fetched again, so
+# a populated cache lets the pipeline run without network access.
+
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+def local_pdfs(output_dir):
+    """PDFs already present in the local cache directory"""
+    if not os.path.isdir(output_dir):
+        return []
+    return sorted(os.path.join(output_dir, name)
+                  for name in os.listdir(output_dir) if name.endswith(".pdf"))
+
+
+class SourceFetcher:
+    """Base class: make the source PDFs available in `output_dir`"""
+
+    name = "base"
+
+    def fetch(self, output_dir):
+        raise NotImplementedError
+
+
+class LocalDirectoryFetcher(SourceFetcher):
+    """Use PDFs from a local directory, copying in only the missing ones"""
+
+    name = "local"
+
+    def __init__(self, source_dir=None):
+        self.source_dir = source_dir
+
+    def fetch(self, output_dir):
+        os.makedirs(output_dir, exist_ok=True)
+        if self.source_dir and os.path.abspath(self.source_dir) != os.path.abspath(output_dir):
+            copied = 0
+            for source in local_pdfs(self.source_dir):
+                target = os.path.join(output_dir, os.path.basename(source))
+                if not os.path.exists(target):
+                    shutil.copy2(source, target)
+                    copied += 1
+            print(f"📂 Copied {copied} missing PDF(s) from {self.source_dir}")
+
+        pdf_files = local_pdfs(output_dir)
+        print(f"📂 Using {len(pdf_files)} PDF(s) from {output_dir}")
+        return pdf_files
+
+
+class DriveFolderFetcher(SourceFetcher):
+    """Download the missing PDFs of a Google Drive folder, several at a time.
+
+    The folder is listed first and only files absent from `output_dir` are
+    downloaded. If Drive cannot be reached the local cache is used as-is.
+    """
+
+    name = "drive"
+
+    def __init__(self, folder_id, max_workers=4, timeout=30):
+        self.folder_id = folder_id
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+    def fetch(self, output_dir):
+        os.makedirs(output_dir, exist_ok=True)
+        try:
+            # Imported here so offline runs with the local fetcher don't need gdown
+            import gdown
+            print("📥 Listing PDFs in Google Drive folder...")
+            remote_files = gdown.download_folder(
+                id=self.folder_id, output=output_dir, quiet=True,
+                use_cookies=False, skip_download=True, timeout=self.timeout,
+            ) or []
+        except Exception as e:
+            print(f"⚠️  Could not reach Google Drive ({e}), using local PDFs only")
+            return LocalDirectoryFetcher().fetch(output_dir)
+
+        missing = [f for f in remote_files
+                   if f.local_path.endswith(".pdf") and not os.path.exists(f.local_path)]
+        print(f"📥 {len(remote_files) - len(missing)} PDF(s) already cached, "
+              f"downloading {len(missing)}")
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {executor.submit(self._download, gdown, f): f for f in missing}
+                for future in as_completed(futures):
+                    remote_file = futures[future]
+                    try:
+                        future.result()
+                        print(f"✅ Downloaded {remote_file.path}")
+                    except Exception as e:
+                        print(f"❌ Error downloading {remote_file.path}: {e}")
+
+        return local_pdfs(output_dir)
+
+    def _download(self, gdown, remote_file):
+        os.makedirs(os.path.dirname(remote_file.local_path) or ".", exist_ok=True)
+        # Download next to the target and rename, so an interrupted
+        # download is never mistaken for a cached file
+        tmp_path = remote_file.local_path + ".part"
+        gdown.download(id=remote_file.id, output=tmp_path, quiet=True,
+                       use_cookies=False, timeout=self.timeout)
+        os.replace(tmp_path, remote_file.local_path)
+
+
+FETCHERS = {
+    LocalDirectoryFetcher.name: LocalDirectoryFetcher,
+    DriveFolderFetcher.name: DriveFolderFetcher,
+}
+
+
+def get_fetcher(name, folder_id=None, source_dir=None, max_workers=4):
+    """Build the fetcher registered under `name`"""
+    if name == LocalDirectoryFetcher.name:
+        return LocalDirectoryFetcher(source_dir)
+    if name == DriveFolderFetcher.name:
+        return DriveFolderFetcher(folder_id, max_workers=max_workers)
+    raise ValueError(f"Unknown PDF source '{name}', expected one of: {', '.join(FETCHERS)}")
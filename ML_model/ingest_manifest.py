@@ -0,0 +1,118 @@
+# =============================
+# Ingest manifest: only reprocess new or changed source files
+# =============================
+#
+# Records, for every ingested file, its size, mtime and sha256 together with
+# the extracted text and a few features. A file whose size and mtime are
+# unchanged is trusted as-is; otherwise it is re-hashed, so a touched or
+# re-downloaded file with identical content is still skipped.
+
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 1
+DEFAULT_MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ingest_manifest.json")
+
+
+def file_sha256(path):
+    """Content hash of a file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def text_features(text):
+    """Cheap per-file features kept next to the extracted text"""
+    return {"chars": len(text), "words": len(text.split())}
+
+
+class IngestManifest:
+    """Persistent map of source file -> fingerprint, extracted text and features"""
+
+    def __init__(self, path=DEFAULT_MANIFEST):
+        self.path = path
+        self.base_dir = os.path.dirname(os.path.abspath(path))
+        self.entries = {}
+        self.skipped = 0
+        self.processed = 0
+        self.changed = False
+        self._load()
+
+    def _key(self, file_path):
+        return os.path.relpath(os.path.abspath(file_path), self.base_dir).replace(os.sep, "/")
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self.entries = data.get("files", {})
+
+    def lookup(self, file_path):
+        """Return the cached entry of an unchanged file, else None"""
+        entry = self.entries.get(self._key(file_path))
+        if entry is None:
+            return None
+
+        stat = os.stat(file_path)
+        if entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry
+        if entry["size"] == stat.st_size and entry["sha256"] == file_sha256(file_path):
+            # Same content, new mtime (e.g. re-downloaded): refresh the fingerprint
+            entry["mtime_ns"] = stat.st_mtime_ns
+            self.changed = True
+            return entry
+        return None
+
+    def split(self, file_paths):
+        """Partition files into ({path: cached entry}, [paths needing processing])"""
+        cached, pending = {}, []
+        for file_path in file_paths:
+            entry = self.lookup(file_path)
+            if entry is None:
+                pending.append(file_path)
+            else:
+                cached[file_path] = entry
+        self.skipped += len(cached)
+        return cached, pending
+
+    def record(self, file_path, text, features=None):
+        """Store the extraction result of a (re)processed file"""
+        stat = os.stat(file_path)
+        self.entries[self._key(file_path)] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_sha256(file_path),
+            "text": text,
+            "features": features if features is not None else text_features(text),
+        }
+        self.processed += 1
+        self.changed = True
+
+    def prune(self, file_paths, directory):
+        """Forget entries under `directory` whose files no longer exist"""
+        prefix = self._key(directory) + "/"
+        keep = {self._key(file_path) for file_path in file_paths}
+        removed = [k for k in self.entries if k.startswith(prefix) and k not in keep]
+        for key in removed:
+            del self.entries[key]
+            self.changed = True
+        return len(removed)
+
+    def save(self):
+        if not self.changed:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "files": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.changed = False
+
+    def report(self, label):
+        print(f"♻️  {label}: {self.skipped} unchanged file(s) skipped, "
+              f"{self.processed} new or modified file(s) processed")
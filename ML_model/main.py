@@ -1,22 +1,44 @@
 import pandas as pd
 import os
+import sys
 
-from multipart import file_path
-from numpy.core.defchararray import startswith
+from ingest_manifest import IngestManifest
 
-questions_folder = "Question_CSV_files"
+# Pages decoding is shared with the exam predictor
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Exam_Predictor"))
+from pages_decoder import MissingPagesColumn, iter_csv_blocks  # noqa: E402
 
-question_files = [f for f in os.listdir(questions_folder) if f.endswith(".csv") and f.startswith("Question")]
+questions_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Question_CSV_files")
 
-#read and combine them
-question_dataframes = []
-for file in question_files:
-    file_path = os.path.join(questions_folder, file)
-    df = pd.read_csv(file_path)
-    df["source_file"] = file
-    question_dataframes.append(df)
 
-all_questions = pd.concat(question_dataframes, ignore_index=True)
+def extract_csv_text(csv_path):
+    """Join the OCR block texts of every row of a question CSV"""
+    try:
+        return "\n".join(text for _, _, text in iter_csv_blocks(csv_path))
+    except MissingPagesColumn:
+        return pd.read_csv(csv_path).to_string()
 
-print("Load all question CSVs")
-print(all_questions.head())
\ No newline at end of file
+
+def load_all_questions(manifest):
+    """One row per question CSV, re-reading only new or modified files"""
+    question_files = [f for f in os.listdir(questions_folder) if f.endswith(".csv") and f.startswith("Question")]
+    paths = [os.path.join(questions_folder, file) for file in question_files]
+
+    cached, pending = manifest.split(paths)
+    for path in pending:
+        manifest.record(path, extract_csv_text(path))
+    manifest.prune(paths, questions_folder)
+    manifest.save()
+    manifest.report("Question CSVs")
+
+    #read and combine them
+    rows = [{"source_file": os.path.basename(path), "text": manifest.lookup(path)["text"]}
+            for path in paths]
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    all_questions = load_all_questions(IngestManifest())
+
+    print("Load all question CSVs")
+    print(all_questions.head())
@@ -0,0 +1,206 @@
+# =============================
+# Question model artifact: numpy-only linear text classifier
+# =============================
+#
+# Saves a trained (vectorizer, model) pair as a memory-mappable artifact
+# (see Exam_Predictor/artifact.py) instead of a joblib pickle:
+#   terms / idf / stop_words   vocabulary tables of the vectorizer
+#   coef / intercept / classes linear model
+# Loading needs only NumPy. The returned pair keeps the old calling convention,
+# model.predict(vectorizer.transform(texts)), so scripts that used the pickle
+# work unchanged.
+
+import os
+import re
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Exam_Predictor"))
+from artifact import ArtifactError, is_artifact, load_artifact, save_artifact  # noqa: E402
+
+TEXT_MODEL_KIND = "linear-text-model"
+DEFAULT_MODEL_PATH = "question_model"
+
+
+# -----------------------------
+# Hashing (same as sklearn's HashingVectorizer)
+# -----------------------------
+def murmurhash3_32(data, seed=0):
+    """Signed 32-bit MurmurHash3 (x86) of bytes"""
+    c1, c2 = 0xCC9E2D51, 0x1B873593
+    h = seed & 0xFFFFFFFF
+    length = len(data)
+    tail_start = length - length % 4
+    for i in range(0, tail_start, 4):
+        k = int.from_bytes(data[i:i + 4], "little")
+        k = (k * c1) & 0xFFFFFFFF
+        k = ((k << 15) | (k >> 17)) & 0xFFFFFFFF
+        k = (k * c2) & 0xFFFFFFFF
+        h ^= k
+        h = ((h << 13) | (h >> 19)) & 0xFFFFFFFF
+        h = (h * 5 + 0xE6546B64) & 0xFFFFFFFF
+
+    k = 0
+    tail = data[tail_start:]
+    for shift, byte in zip((0, 8, 16), tail):
+        k |= byte << shift
+    if tail:
+        k = (k * c1) & 0xFFFFFFFF
+        k = ((k << 15) | (k >> 17)) & 0xFFFFFFFF
+        k = (k * c2) & 0xFFFFFFFF
+        h ^= k
+
+    h ^= length
+    h ^= h >> 16
+    h = (h * 0x85EBCA6B) & 0xFFFFFFFF
+    h ^= h >> 13
+    h = (h * 0xC2B2AE35) & 0xFFFFFFFF
+    h ^= h >> 16
+    return h - (1 << 32) if h & 0x80000000 else h
+
+
+# -----------------------------
+# Numpy-only vectorizer and classifier
+# -----------------------------
+class TextFeatures:
+    """Tokenize, count, optionally idf-weight and normalize texts.
+
+    transform() returns one (indices, values) pair per text instead of a
+    sparse matrix, which is all LinearClassifier needs.
+    """
+
+    def __init__(self, meta, arrays):
+        self.mode = meta["mode"]
+        self.lowercase = meta["lowercase"]
+        self.token_pattern = re.compile(meta["token_pattern"])
+        self.norm = meta["norm"]
+        self.sublinear_tf = meta["sublinear_tf"]
+        self.n_features = meta["n_features"]
+        self.alternate_sign = meta.get("alternate_sign", False)
+        self.stop_words = frozenset(arrays["stop_words"].tolist()) if "stop_words" in arrays else frozenset()
+        self.idf = arrays.get("idf")
+        if self.mode == "vocabulary":
+            self.vocabulary = {term: i for i, term in enumerate(arrays["terms"].tolist())}
+
+    def _counts(self, text):
+        if self.lowercase:
+            text = text.lower()
+        counts = {}
+        for token in self.token_pattern.findall(text):
+            if token in self.stop_words:
+                continue
+            if self.mode == "vocabulary":
+                index, sign = self.vocabulary.get(token), 1.0
+                if index is None:
+                    continue
+            else:
+                h = murmurhash3_32(token.encode("utf-8"))
+                index = (2 ** 31 if h == -2 ** 31 else abs(h)) % self.n_features
+                sign = -1.0 if self.alternate_sign and h < 0 else 1.0
+            counts[index] = counts.get(index, 0.0) + sign
+        return counts
+
+    def transform(self, texts):
+        rows = []
+        for text in texts:
+            counts = self._counts(text)
+            indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+            values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+            if self.sublinear_tf:
+                values = np.sign(values) * (1 + np.log(np.abs(values)))
+            if self.idf is not None:
+                values = values * self.idf[indices]
+            if self.norm == "l2" and values.size:
+                values = values / (np.sqrt(np.dot(values, values)) or 1.0)
+            elif self.norm == "l1" and values.size:
+                values = values / (np.abs(values).sum() or 1.0)
+            rows.append((indices, values))
+        return rows
+
+
+class LinearClassifier:
+    """argmax(coef . x + intercept) over rows from TextFeatures.transform"""
+
+    def __init__(self, arrays):
+        self.coef_ = arrays["coef"]
+        self.intercept_ = arrays["intercept"]
+        self.classes_ = arrays["classes"]
+
+    def decision_function(self, rows):
+        """Scores shaped like sklearn's: (n_rows,) for binary models, (n_rows, n_classes) otherwise"""
+        scores = np.empty((len(rows), self.coef_.shape[0]))
+        for i, (indices, values) in enumerate(rows):
+            scores[i] = self.coef_[:, indices] @ values + self.intercept_
+        if self.coef_.shape[0] == 1:
+            # Binary models keep one row of weights for the positive class
+            return scores.ravel()
+        return scores
+
+    def predict(self, rows):
+        scores = self.decision_function(rows)
+        if scores.ndim == 1:
+            return self.classes_[(scores > 0).astype(int)]
+        return self.classes_[scores.argmax(axis=1)]
+
+
+# -----------------------------
+# Save / load
+# -----------------------------
+def _vectorizer_tables(vectorizer):
+    """Header fields and arrays describing a fitted sklearn text vectorizer"""
+    hasher, idf = vectorizer, None
+    steps = getattr(vectorizer, "steps", None)
+    if steps:
+        # make_pipeline(HashingVectorizer, TfidfTransformer) from streaming training
+        hasher, transformer = steps[0][1], steps[-1][1]
+        idf = transformer.idf_
+        norm, sublinear_tf = transformer.norm, transformer.sublinear_tf
+    else:
+        norm, sublinear_tf = vectorizer.norm, getattr(vectorizer, "sublinear_tf", False)
+
+    if getattr(hasher, "analyzer", "word") != "word" or getattr(hasher, "ngram_range", (1, 1)) != (1, 1) \
+            or hasher.tokenizer is not None or hasher.preprocessor is not None or hasher.strip_accents:
+        raise ArtifactError("Only unigram word vectorizers with the default tokenizer can be exported")
+
+    meta = {
+        "lowercase": hasher.lowercase,
+        "token_pattern": hasher.token_pattern,
+        "norm": norm,
+        "sublinear_tf": sublinear_tf,
+    }
+    arrays = {}
+    stop_words = hasher.get_stop_words()
+    if stop_words:
+        arrays["stop_words"] = np.array(sorted(stop_words))
+
+    if hasattr(hasher, "vocabulary_"):
+        terms = sorted(hasher.vocabulary_, key=hasher.vocabulary_.get)
+        meta.update(mode="vocabulary", n_features=len(terms))
+        arrays["terms"] = np.array(terms)
+        if getattr(hasher, "use_idf", False):
+            idf = hasher.idf_
+    else:
+        meta.update(mode="hashing", n_features=hasher.n_features, alternate_sign=hasher.alternate_sign)
+    if idf is not None:
+        arrays["idf"] = np.asarray(idf, dtype=np.float64)
+    return meta, arrays
+
+
+def save_text_model(vectorizer, model, path=DEFAULT_MODEL_PATH):
+    """Save a fitted (vectorizer, linear model) pair as an artifact directory"""
+    meta, arrays = _vectorizer_tables(vectorizer)
+    arrays["coef"] = np.asarray(model.coef_, dtype=np.float64)
+    arrays["intercept"] = np.asarray(model.intercept_, dtype=np.float64)
+    arrays["classes"] = np.asarray(model.classes_)
+    save_artifact(path, TEXT_MODEL_KIND, meta, arrays)
+
+
+def load_text_model(path=DEFAULT_MODEL_PATH):
+    """Return (vectorizer, model) from an artifact, or from a legacy joblib .pkl"""
+    if not is_artifact(path) and path.endswith(".pkl"):
+        print(f"⚠️  Loading legacy pickle {path}; retrain to write an artifact")
+        import joblib
+        return joblib.load(path)
+    meta, arrays = load_artifact(path, TEXT_MODEL_KIND)
+    return TextFeatures(meta, arrays), LinearClassifier(arrays)
@@ -5,8 +5,11 @@
 # Make sure you have installed these:
 # pip install gdown PyPDF2 scikit-learn pandas joblib
 
+import argparse
 import os
-import gdown
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import pandas as pd
 import PyPDF2
 from sklearn.model_selection import train_test_split
@@ -15,87 +18,228 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score
 import joblib
 
-# -----------------------------
-# Step 1: Download all PDFs from Google Drive folder
-# -----------------------------
+from fetchers import FETCHERS, get_fetcher
+from ingest_manifest import IngestManifest
+from model_artifact import DEFAULT_MODEL_PATH, is_artifact, load_text_model, save_text_model
+from streaming_train import CHUNK_SIZE, train_streaming
+
 folder_id = "1CDfKo2J1xCn1rpiOlAnhMvWK-Oc_JcEu"  # 🔹 Replace with your Google Drive folder ID
 output_dir = "downloaded_pdfs"
-os.makedirs(output_dir, exist_ok=True)
 
-print("📥 Downloading PDFs from Google Drive folder...")
-gdown.download_folder(id=folder_id, output=output_dir, quiet=False, use_cookies=False)
+# "drive" fetches missing PDFs from the folder above, "local" never touches the network
+PDF_SOURCE = os.environ.get("SMART_STUDY_PDF_SOURCE", "drive")
+
+# PDFs longer than this are split into page ranges handled by separate workers
+PAGES_PER_TASK = 16
+
+
+# -----------------------------
+# Step 1: Fetch the PDFs that are not cached locally yet
+# -----------------------------
+def download_pdfs(source=PDF_SOURCE, source_dir=None, max_workers=4):
+    fetcher = get_fetcher(source, folder_id=folder_id, source_dir=source_dir,
+                          max_workers=max_workers)
+    return fetcher.fetch(output_dir)
+
 
 # -----------------------------
 # Step 2: Extract text from PDFs
 # -----------------------------
-def pdf_to_text(pdf_file):
-    """Extract text from a PDF file"""
-    text = ""
+def extract_page_range(pdf_file, start, stop):
+    """Extract pages [start, stop) of a PDF, each page exactly once.
+
+    Returns (page texts, seconds spent, error message or None). Pages read
+    before an error are kept, like the original serial extractor did.
+    """
+    began = time.perf_counter()
+    texts = []
+    error = None
     try:
         with open(pdf_file, "rb") as f:
             reader = PyPDF2.PdfReader(f)
-            for page in reader.pages:
-                if page.extract_text():
-                    text += page.extract_text() + " "
+            for page in reader.pages[start:stop]:
+                page_text = page.extract_text()
+                if page_text:
+                    texts.append(page_text)
     except Exception as e:
-        print(f"❌ Error reading {pdf_file}: {e}")
-    return text.strip()
-
-pdf_texts = []
-for pdf_file in os.listdir(output_dir):
-    if pdf_file.endswith(".pdf"):
-        path = os.path.join(output_dir, pdf_file)
-        text = pdf_to_text(path)
+        error = str(e)
+    return texts, time.perf_counter() - began, error
+
+
+def count_pages(pdf_file):
+    """Number of pages in a PDF"""
+    with open(pdf_file, "rb") as f:
+        return len(PyPDF2.PdfReader(f).pages)
+
+
+def pdf_to_text(pdf_file):
+    """Extract text from a PDF file"""
+    texts, _, error = extract_page_range(pdf_file, 0, None)
+    if error:
+        print(f"❌ Error reading {pdf_file}: {error}")
+    return " ".join(texts).strip()
+
+
+def extract_pdfs_parallel(pdf_files, max_workers=None, pages_per_task=PAGES_PER_TASK):
+    """Extract text from many PDFs across a process pool.
+
+    Each PDF is one task, or several page-range tasks when it is longer than
+    `pages_per_task`. Returns {pdf_file: text} in input order; unreadable PDFs
+    are logged and skipped.
+    """
+    tasks = []
+    for pdf_file in pdf_files:
+        try:
+            page_count = count_pages(pdf_file)
+        except Exception as e:
+            print(f"❌ Error reading {pdf_file}: {e}")
+            continue
+        for start in range(0, max(page_count, 1), pages_per_task):
+            tasks.append((pdf_file, start, start + pages_per_task))
+
+    chunks = {}
+    timings = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(extract_page_range, *task): task for task in tasks}
+        for future in as_completed(futures):
+            pdf_file, start, _ = futures[future]
+            texts, elapsed, error = future.result()
+            if error:
+                print(f"❌ Error reading {pdf_file} (pages from {start + 1}): {error}")
+            chunks[(pdf_file, start)] = texts
+            timings[pdf_file] = timings.get(pdf_file, 0.0) + elapsed
+
+    results = {}
+    for pdf_file in pdf_files:
+        if pdf_file not in timings:
+            continue
+        starts = sorted(start for path, start in chunks if path == pdf_file)
+        page_texts = [text for start in starts for text in chunks[(pdf_file, start)]]
+        text = " ".join(page_texts).strip()
+        print(f"⏱️  {os.path.basename(pdf_file)}: {len(page_texts)} pages "
+              f"in {timings[pdf_file]:.2f}s ({len(starts)} task(s))")
+        if text:
+            results[pdf_file] = text
+    return results
+
+
+def extract_all_pdfs(manifest):
+    """Texts of all downloaded PDFs, extracting only files the manifest has not seen"""
+    pdf_files = [os.path.join(output_dir, pdf_file)
+                 for pdf_file in os.listdir(output_dir) if pdf_file.endswith(".pdf")]
+
+    began = time.perf_counter()
+    cached, pending = manifest.split(pdf_files)
+    extracted = extract_pdfs_parallel(pending) if pending else {}
+    for pdf_file in pending:
+        # Unreadable PDFs are recorded too, so they are not retried until they change
+        manifest.record(pdf_file, extracted.get(pdf_file, ""))
+    removed = manifest.prune(pdf_files, output_dir + "/")
+    manifest.save()
+    manifest.report("PDF ingestion")
+
+    pdf_texts = []
+    for pdf_file in pdf_files:
+        text = cached[pdf_file]["text"] if pdf_file in cached else extracted.get(pdf_file, "")
         if text:
             pdf_texts.append(text)
+    print(f"✅ Extracted text from {len(pdf_texts)} PDFs in {time.perf_counter() - began:.2f}s")
+    return pdf_texts, bool(pending or removed)
 
-print(f"✅ Extracted text from {len(pdf_texts)} PDFs")
 
 # -----------------------------
 # Step 3: Create dataset
 # -----------------------------
-if len(pdf_texts) == 0:
-    raise ValueError("No text extracted from PDFs. Please check your folder link or files.")
+def create_dataset(pdf_texts):
+    if len(pdf_texts) == 0:
+        raise ValueError("No text extracted from PDFs. Please check your folder link or files.")
 
-data = pd.DataFrame({"text": pdf_texts})
-# Dummy labels (replace with real labels if available)
-data["label"] = [i % 2 for i in range(len(data))]
-data.to_csv("questions_dataset.csv", index=False)
-print("✅ Dataset created: questions_dataset.csv")
+    data = pd.DataFrame({"text": pdf_texts})
+    # Dummy labels (replace with real labels if available). Downloaded PDFs carry
+    # no subject, so only --streaming trains on segmented, subject-labelled questions
+    data["label"] = [i % 2 for i in range(len(data))]
+    data.to_csv("questions_dataset.csv", index=False)
+    print("✅ Dataset created: questions_dataset.csv")
+    return data
 
-# -----------------------------
-# Step 4: Train/Test Split
-# -----------------------------
-X_train, X_test, y_train, y_test = train_test_split(
-    data["text"], data["label"], test_size=0.2, random_state=42
-)
 
 # -----------------------------
-# Step 5: Feature Extraction
+# Step 4-6: Split, extract features and train
 # -----------------------------
-vectorizer = TfidfVectorizer(stop_words="english")
-X_train_tfidf = vectorizer.fit_transform(X_train)
-X_test_tfidf = vectorizer.transform(X_test)
+def train_model(data):
+    X_train, X_test, y_train, y_test = train_test_split(
+        data["text"], data["label"], test_size=0.2, random_state=42
+    )
 
-# -----------------------------
-# Step 6: Train Model
-# -----------------------------
-model = LogisticRegression(max_iter=1000)
-model.fit(X_train_tfidf, y_train)
+    vectorizer = TfidfVectorizer(stop_words="english")
+    X_train_tfidf = vectorizer.fit_transform(X_train)
+    X_test_tfidf = vectorizer.transform(X_test)
 
-y_pred = model.predict(X_test_tfidf)
-print("✅ Model trained with accuracy:", accuracy_score(y_test, y_pred))
+    model = LogisticRegression(max_iter=1000)
+    model.fit(X_train_tfidf, y_train)
 
-# -----------------------------
-# Step 7: Save Model
-# -----------------------------
-joblib.dump((vectorizer, model), "question_model.pkl")
-print("✅ Model & pipeline saved as question_model.pkl")
+    y_pred = model.predict(X_test_tfidf)
+    print("✅ Model trained with accuracy:", accuracy_score(y_test, y_pred))
+    return vectorizer, model
 
-# -----------------------------
-# Step 8: Use Model
-# -----------------------------
-vectorizer, model = joblib.load("question_model.pkl")
-sample_text = ["Explain machine learning in simple terms"]
-sample_vec = vectorizer.transform(sample_text)
-print("Prediction:", model.predict(sample_vec)[0])
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the question model from PDFs")
+    parser.add_argument("--force", action="store_true",
+                        help="Ignore the ingest manifest and reprocess every PDF")
+    parser.add_argument("--source", choices=sorted(FETCHERS), default=PDF_SOURCE,
+                        help="Where to fetch missing PDFs from (default: %(default)s)")
+    parser.add_argument("--source-dir",
+                        help="Directory to copy PDFs from with --source local")
+    parser.add_argument("--download-workers", type=int, default=4,
+                        help="Concurrent Drive downloads")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Train out-of-core on per-question rows of the subject CSVs")
+    parser.add_argument("--tfidf", action="store_true",
+                        help="With --streaming, re-weight hashed features by TF-IDF (one extra pass)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help="With --streaming, questions per partial_fit call")
+    parser.add_argument("--epochs", type=int, default=1,
+                        help="With --streaming, passes over the corpus")
+    parser.add_argument("--legacy-pickle", action="store_true",
+                        help="Also write question_model.pkl for older loaders")
+    args = parser.parse_args()
+
+    if args.streaming:
+        vectorizer, model = train_streaming(chunk_size=args.chunk_size,
+                                            use_tfidf=args.tfidf, epochs=args.epochs)
+    else:
+        download_pdfs(args.source, args.source_dir, args.download_workers)
+        manifest = IngestManifest()
+        if args.force:
+            manifest.entries.clear()
+        pdf_texts, corpus_changed = extract_all_pdfs(manifest)
+
+        if not corpus_changed and is_artifact(DEFAULT_MODEL_PATH):
+            print(f"✅ No new or modified PDFs, keeping existing {DEFAULT_MODEL_PATH}/")
+            return
+
+        data = create_dataset(pdf_texts)
+        vectorizer, model = train_model(data)
+
+    # -----------------------------
+    # Step 7: Save Model
+    # -----------------------------
+    save_text_model(vectorizer, model, DEFAULT_MODEL_PATH)
+    print(f"✅ Model & pipeline saved as {DEFAULT_MODEL_PATH}/")
+    if args.legacy_pickle:
+        joblib.dump((vectorizer, model), "question_model.pkl")
+        print("✅ Legacy pickle saved as question_model.pkl")
+
+    # -----------------------------
+    # Step 8: Use Model
+    # -----------------------------
+    vectorizer, model = load_text_model(DEFAULT_MODEL_PATH)
+    sample_text = ["Explain machine learning in simple terms"]
+    sample_vec = vectorizer.transform(sample_text)
+    print("Prediction:", model.predict(sample_vec)[0])
+
+
+# Worker processes re-import this module, so nothing may run at import time
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# =============================
+# Out-of-core training for the question classifier
+# =============================
+#
+# Question rows are streamed from the subject CSVs in fixed-size chunks, turned
+# into sparse features by a stateless HashingVectorizer (optionally re-weighted
+# by TF-IDF) and fed to SGDClassifier.partial_fit. Each CSV holds a single
+# subject, so the CSVs are read side by side and rows pass through a bounded
+# shuffle buffer: partial_fit then sees every subject throughout the stream
+# instead of one subject block after another. Memory stays bounded by one row
+# per CSV, the shuffle buffer and one chunk, whatever the size of the corpus.
+
+import csv
+import os
+import random
+import sys
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import make_pipeline
+
+# Pages decoding and question segmentation are shared with the exam predictor
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Exam_Predictor"))
+from pages_decoder import iter_page_blocks  # noqa: E402
+from segmentation import segment_questions  # noqa: E402
+
+questions_folder = "Question_CSV_files"
+
+CHUNK_SIZE = 1000
+N_FEATURES = 2 ** 18
+# Every HOLDOUT_EVERY-th question of each CSV is kept out of training to measure accuracy
+HOLDOUT_EVERY = 5
+# Rows held back to shuffle the training stream
+SHUFFLE_BUFFER = 5000
+SEED = 42
+
+csv.field_size_limit(sys.maxsize)
+
+
+def subject_label(csv_path):
+    """Subject name of a `Question <Subject>.csv` file"""
+    name = os.path.basename(csv_path)
+    return name[len("Question"):-len(".csv")].replace("_", " ").strip()
+
+
+def question_csv_files(folder=questions_folder):
+    """Subject question CSVs, in a stable order"""
+    return sorted(os.path.join(folder, f) for f in os.listdir(folder)
+                  if f.startswith("Question") and f.endswith(".csv"))
+
+
+def iter_csv_questions(csv_path):
+    """Yield the segmented questions of one subject CSV, one row at a time"""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            pages = row.get("pages")
+            if not pages:
+                continue
+            texts = [text for _, text in iter_page_blocks(pages)]
+            yield from segment_questions(texts)
+
+
+def iter_question_rows(csv_files):
+    """Yield (question text, subject) one CSV row at a time"""
+    for csv_path in csv_files:
+        label = subject_label(csv_path)
+        for question in iter_csv_questions(csv_path):
+            yield question, label
+
+
+def iter_split_rows(csv_files, holdout=False):
+    """Yield the training (or holdout) (question text, subject) rows, round-robin across the CSVs
+
+    A question is held out by its position in its own CSV, so the split is the
+    same on every pass and every subject is represented in the holdout.
+    """
+    streams = [(subject_label(path), iter_csv_questions(path)) for path in csv_files]
+    counts = [0] * len(streams)
+    while streams:
+        active = []
+        for (label, questions), count in zip(streams, counts):
+            question = next(questions, None)
+            if question is None:
+                continue
+            if (count % HOLDOUT_EVERY == 0) == holdout:
+                yield question, label
+            active.append(((label, questions), count + 1))
+        streams = [stream for stream, _ in active]
+        counts = [count for _, count in active]
+
+
+def shuffle_rows(rows, buffer_size=SHUFFLE_BUFFER, rng=None):
+    """Yield rows in random order, holding at most `buffer_size` rows at a time"""
+    rng = rng or random.Random(SEED)
+    buffer = []
+    for row in rows:
+        if len(buffer) < buffer_size:
+            buffer.append(row)
+            continue
+        i = rng.randrange(buffer_size)
+        yield buffer[i]
+        buffer[i] = row
+    rng.shuffle(buffer)
+    yield from buffer
+
+
+def iter_chunks(rows, chunk_size=CHUNK_SIZE):
+    """Group (text, label) rows into (texts, labels) lists of `chunk_size`"""
+    texts, labels = [], []
+    for text, label in rows:
+        texts.append(text)
+        labels.append(label)
+        if len(texts) == chunk_size:
+            yield texts, labels
+            texts, labels = [], []
+    if texts:
+        yield texts, labels
+
+
+def fit_idf(hasher, csv_files, chunk_size=CHUNK_SIZE):
+    """First pass: document frequencies of hashed features -> fitted TfidfTransformer"""
+    document_frequency = np.zeros(hasher.n_features, dtype=np.int64)
+    n_documents = 0
+    for texts, _ in iter_chunks(iter_question_rows(csv_files), chunk_size):
+        X = hasher.transform(texts)
+        document_frequency += np.bincount(X.indices, minlength=hasher.n_features)
+        n_documents += X.shape[0]
+
+    # Same smoothed idf as TfidfTransformer(smooth_idf=True).fit
+    transformer = TfidfTransformer()
+    transformer.idf_ = np.log((1 + n_documents) / (1 + document_frequency)) + 1
+    transformer.n_features_in_ = hasher.n_features
+    print(f"✅ IDF computed over {n_documents} questions")
+    return transformer
+
+
+def holdout_accuracy(vectorizer, model, csv_files, chunk_size=CHUNK_SIZE):
+    """Accuracy of the final model on the held-out questions, streamed in chunks"""
+    correct = tested = 0
+    for texts, labels in iter_chunks(iter_split_rows(csv_files, holdout=True), chunk_size):
+        predictions = model.predict(vectorizer.transform(texts))
+        correct += int(np.sum(predictions == np.array(labels)))
+        tested += len(texts)
+    return correct / tested if tested else None
+
+
+def train_streaming(csv_files=None, chunk_size=CHUNK_SIZE, use_tfidf=False, epochs=1,
+                    shuffle_buffer=SHUFFLE_BUFFER, seed=SEED):
+    """Train (vectorizer, model) without ever loading the whole corpus"""
+    csv_files = csv_files or question_csv_files()
+    if not csv_files:
+        raise ValueError(f"No question CSVs found in {questions_folder}.")
+    classes = np.array(sorted({subject_label(path) for path in csv_files}))
+
+    hasher = HashingVectorizer(n_features=N_FEATURES, stop_words="english",
+                               alternate_sign=False, norm=None if use_tfidf else "l2")
+    vectorizer = make_pipeline(hasher, fit_idf(hasher, csv_files, chunk_size)) if use_tfidf else hasher
+    model = SGDClassifier(loss="log_loss", random_state=seed)
+
+    for epoch in range(epochs):
+        seen = 0
+        # A different, reproducible order on every pass
+        rows = shuffle_rows(iter_split_rows(csv_files), shuffle_buffer, random.Random(seed + epoch))
+        for texts, labels in iter_chunks(rows, chunk_size):
+            model.partial_fit(vectorizer.transform(texts), labels, classes=classes)
+            seen += len(texts)
+        print(f"✅ Epoch {epoch + 1}/{epochs}: trained on {seen} questions")
+
+    accuracy = holdout_accuracy(vectorizer, model, csv_files, chunk_size)
+    if accuracy is not None:
+        print("✅ Model trained with holdout accuracy:", accuracy)
+    return vectorizer, model
@@ -50,4 +50,8 @@ app.use('/api/predict', require('./src/routes/predictRoutes'));
 
 
 const PORT = process.env.PORT || 5000;
-app.listen(PORT, () => console.log(`Server running on port ${PORT}`));
+app.listen(PORT, () => {
+    console.log(`Server running on port ${PORT}`);
+    // Start the Python prediction workers up front so the first request is served warm
+    require('./src/utils/predictorPool').getPredictorPool();
+});
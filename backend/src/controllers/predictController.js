@@ -1,61 +1,152 @@
-const { spawn } = require('child_process');
-const path = require('path');
-const fs = require('fs');
+const { getPredictorPool } = require('../utils/predictorPool');
+const { getPredictionJobs } = require('../utils/predictionJobs');
+const { getPrecomputedPredictions } = require('../utils/precomputedPredictions');
 
-exports.getPrediction = (req, res) => {
+exports.getPrediction = async (req, res) => {
     const { query } = req.body;
 
     if (!query) {
         return res.status(400).json({ message: 'Query is required' });
     }
 
-    // Resolve path to script
-    // We are in backend/src/controllers
-    // We want ../../../Exam_Predictor/Exam_Question_Predictor.py
-    const scriptPath = path.resolve(__dirname, '../../../Exam_Predictor/Exam_Question_Predictor.py');
+    // Subjects precomputed by the batch run are served straight from disk
+    const precomputed = getPrecomputedPredictions().lookup(query);
+    if (precomputed) {
+        return res.json({ questions: precomputed });
+    }
 
-    // Resolve path to python executable in external folder
-    const venvPython = 'E:\\Exam_Predictor\\.venv\\Scripts\\python.exe';
+    console.log(`Queueing prediction for query: ${query}`);
 
-    // Use venv python if it exists, otherwise system python
-    const pythonCommand = fs.existsSync(venvPython) ? venvPython : 'python';
+    try {
+        // Served by a warm Python worker instead of a fresh interpreter per request
+        const results = await getPredictorPool().predict(query);
+        res.json({ questions: results });
+    } catch (error) {
+        if (error.code === 'QUEUE_FULL') {
+            res.set('Retry-After', '5');
+            return res.status(503).json({ message: 'Prediction service is busy, please retry shortly' });
+        }
+        if (error.code === 'UNAVAILABLE') {
+            return res.status(503).json({ message: 'Prediction service is unavailable' });
+        }
 
-    console.log(`Running prediction script: ${scriptPath} with query: ${query}`);
-    console.log(`Using Python interpreter: ${pythonCommand}`);
+        console.error('Prediction error:', error.message);
+        res.status(500).json({
+            message: 'Error processing prediction',
+            error: error.message || 'Unknown error occurred in Python script'
+        });
+    }
+};
 
-    const pythonProcess = spawn(pythonCommand, [scriptPath, query]);
+exports.getSimilarQuestions = async (req, res) => {
+    const { question, subject } = req.body;
+    const k = parseInt(req.body.k, 10) || 10;
 
-    let dataString = '';
-    let errorString = '';
+    if (!question) {
+        return res.status(400).json({ message: 'Question is required' });
+    }
 
-    pythonProcess.stdout.on('data', (data) => {
-        dataString += data.toString();
-    });
+    try {
+        const results = await getPredictorPool().similar(question, { k: Math.min(k, 50), subject });
+        res.json({ results });
+    } catch (error) {
+        if (error.code === 'QUEUE_FULL') {
+            res.set('Retry-After', '5');
+            return res.status(503).json({ message: 'Prediction service is busy, please retry shortly' });
+        }
+        if (error.code === 'UNAVAILABLE') {
+            return res.status(503).json({ message: 'Prediction service is unavailable' });
+        }
 
-    pythonProcess.stderr.on('data', (data) => {
-        errorString += data.toString();
-    });
+        console.error('Similar question search error:', error.message);
+        res.status(500).json({ message: 'Error searching similar questions', error: error.message });
+    }
+};
 
-    pythonProcess.on('close', (code) => {
-        if (code !== 0) {
-            console.error('Python script error output:', errorString);
-            // It might be that the script printed the error to stdout as valid JSON (handled in script), 
-            // but if code != 0, it's a crash.
-            return res.status(500).json({
-                message: 'Error processing prediction',
-                error: errorString || 'Unknown error occurred in Python script'
-            });
-        }
+// ==================== ASYNC PREDICTION JOBS ====================
+
+const jobLinks = (job) => ({
+    self: `/api/predict/jobs/${job.id}`,
+    stream: `/api/predict/jobs/${job.id}/stream`,
+});
+
+exports.createPredictionJob = (req, res) => {
+    const { query, seed } = req.body;
+
+    if (!query) {
+        return res.status(400).json({ message: 'Query is required' });
+    }
 
-        try {
-            // script prints JSON
-            const results = JSON.parse(dataString);
-            res.json({ questions: results });
-        } catch (e) {
-            console.error('JSON parsing error:', e);
-            console.log('Raw output:', dataString);
-            // Return raw output if JSON parse fails
-            res.json({ questions: ["Error parsing model output."], raw: dataString });
+    try {
+        const job = getPredictionJobs().submit(query, { seed: Number.isInteger(seed) ? seed : undefined });
+        console.log(`Queued prediction job ${job.id} for query: ${query}`);
+        res.status(202).location(jobLinks(job).self).json({ ...job.toJSON(), links: jobLinks(job) });
+    } catch (error) {
+        if (error.code === 'QUEUE_FULL') {
+            res.set('Retry-After', '5');
+            return res.status(503).json({ message: 'Prediction service is busy, please retry shortly' });
         }
+        res.status(500).json({ message: 'Error creating prediction job', error: error.message });
+    }
+};
+
+exports.getPredictionJob = (req, res) => {
+    const job = getPredictionJobs().get(req.params.id);
+    if (!job) {
+        return res.status(404).json({ message: 'Prediction job not found' });
+    }
+    res.json({ ...job.toJSON(), links: jobLinks(job) });
+};
+
+// Server-Sent Events: every stage already produced is replayed, then new ones are
+// pushed as the worker emits them; the stream ends with an 'end' event.
+exports.streamPredictionJob = (req, res) => {
+    const job = getPredictionJobs().get(req.params.id);
+    if (!job) {
+        return res.status(404).json({ message: 'Prediction job not found' });
+    }
+
+    res.set({
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache',
+        Connection: 'keep-alive',
+        'X-Accel-Buffering': 'no',
     });
+    res.flushHeaders();
+
+    const send = (event, data) => res.write(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`);
+    const onStatus = (status) => send('status', { status });
+    const onStage = (stage, data) => send('stage', { stage, data });
+    const onEnd = () => {
+        send('end', { status: job.status, error: job.error });
+        cleanup();
+        res.end();
+    };
+    const heartbeat = setInterval(() => res.write(': keep-alive\n\n'), 15000);
+    const cleanup = () => {
+        clearInterval(heartbeat);
+        job.off('status', onStatus);
+        job.off('stage', onStage);
+        job.off('end', onEnd);
+    };
+
+    send('status', { status: job.status });
+    job.stages.forEach(({ stage, data }) => onStage(stage, data));
+    if (job.done) {
+        return onEnd();
+    }
+
+    job.on('status', onStatus);
+    job.on('stage', onStage);
+    job.on('end', onEnd);
+    req.on('close', cleanup);
+};
+
+exports.cancelPredictionJob = (req, res) => {
+    const job = getPredictionJobs().cancel(req.params.id);
+    if (!job) {
+        return res.status(404).json({ message: 'Prediction job not found' });
+    }
+    // A running job finishes asynchronously once its worker has been stopped
+    res.status(job.done ? 200 : 202).json({ ...job.toJSON(), links: jobLinks(job) });
 };
@@ -3,5 +3,12 @@ const router = express.Router();
 const predictController = require('../controllers/predictController');
 
 router.post('/', predictController.getPrediction);
+router.post('/similar', predictController.getSimilarQuestions);
+
+// Asynchronous jobs: submit, poll, stream partial results (SSE) and cancel
+router.post('/jobs', predictController.createPredictionJob);
+router.get('/jobs/:id', predictController.getPredictionJob);
+router.get('/jobs/:id/stream', predictController.streamPredictionJob);
+router.delete('/jobs/:id', predictController.cancelPredictionJob);
 
 module.exports = router;
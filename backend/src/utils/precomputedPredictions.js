@@ -0,0 +1,99 @@
+const fs = require('fs');
+const path = require('path');
+
+// Written by `python Exam_Question_Predictor.py --batch`
+const defaultPath = path.resolve(__dirname, '../../../Exam_Predictor/precomputed_predictions.json');
+
+// Same normalization as the Python subject index: lower-case words of [a-z0-9]
+const normalize = (text) => (String(text).toLowerCase().replace(/_/g, ' ').match(/[a-z0-9]+/g) || []).join(' ');
+
+const parseRecords = (filePath, content) => {
+    if (/\.(jsonl|ndjson)$/.test(filePath)) {
+        return content.split('\n').filter((line) => line.trim()).map((line) => JSON.parse(line));
+    }
+    return JSON.parse(content).subjects || [];
+};
+
+// Serves batch predictions from disk so known subjects need no Python process.
+// The file is re-read whenever its modification time changes; queries are
+// matched the way the subject index matches them exactly (the longest title or
+// alias found word-for-word), anything else is left to the worker pool.
+class PrecomputedPredictions {
+    constructor(filePath) {
+        this.filePath = filePath || defaultPath;
+        this.mtimeMs = null;
+        this.phrases = new Map();
+        this.maxPhraseWords = 0;
+    }
+
+    refresh() {
+        let stat;
+        try {
+            stat = fs.statSync(this.filePath);
+        } catch (err) {
+            this.mtimeMs = null;
+            this.phrases = new Map();
+            return false;
+        }
+        if (stat.mtimeMs === this.mtimeMs) {
+            return true;
+        }
+
+        const phrases = new Map();
+        let maxPhraseWords = 0;
+        try {
+            for (const record of parseRecords(this.filePath, fs.readFileSync(this.filePath, 'utf8'))) {
+                if (!record.prediction) {
+                    continue;
+                }
+                for (const name of [record.subject, record.title, ...(record.aliases || [])]) {
+                    const phrase = normalize(name || '');
+                    if (phrase && !phrases.has(phrase)) {
+                        phrases.set(phrase, record.prediction);
+                        maxPhraseWords = Math.max(maxPhraseWords, phrase.split(' ').length);
+                    }
+                }
+            }
+        } catch (err) {
+            console.error(`Ignoring precomputed predictions in ${this.filePath}: ${err.message}`);
+            this.phrases = new Map();
+            this.mtimeMs = stat.mtimeMs;
+            return false;
+        }
+
+        this.phrases = phrases;
+        this.maxPhraseWords = maxPhraseWords;
+        this.mtimeMs = stat.mtimeMs;
+        console.log(`Loaded precomputed predictions for ${phrases.size} subject names from ${this.filePath}`);
+        return true;
+    }
+
+    lookup(query) {
+        if (!this.refresh()) {
+            return null;
+        }
+
+        const words = normalize(query).split(' ').filter(Boolean);
+        for (let size = Math.min(this.maxPhraseWords, words.length); size > 0; size--) {
+            for (let start = 0; start + size <= words.length; start++) {
+                const prediction = this.phrases.get(words.slice(start, start + size).join(' '));
+                if (prediction) {
+                    // Same shape as a live prediction, which echoes the query as its subject
+                    return { ...prediction, subject: query };
+                }
+            }
+        }
+        return null;
+    }
+}
+
+let sharedPredictions = null;
+
+const getPrecomputedPredictions = () => {
+    if (!sharedPredictions) {
+        sharedPredictions = new PrecomputedPredictions(process.env.PRECOMPUTED_PREDICTIONS_PATH || undefined);
+    }
+    return sharedPredictions;
+};
+
+module.exports = { PrecomputedPredictions, getPrecomputedPredictions };
@@ -0,0 +1,178 @@
+const crypto = require('crypto');
+const { EventEmitter } = require('events');
+const { getPredictorPool } = require('./predictorPool');
+
+const TERMINAL_STATUSES = new Set(['succeeded', 'failed', 'cancelled', 'timed_out']);
+
+class JobQueueFullError extends Error {
+    constructor(limit) {
+        super(`Prediction job queue is full (${limit} queued jobs)`);
+        this.code = 'QUEUE_FULL';
+    }
+}
+
+// One asynchronous prediction. Emits 'stage' (stage, data) for every partial
+// result, 'status' when it starts running and 'end' once it reaches a terminal status.
+class PredictionJob extends EventEmitter {
+    constructor(query, { seed } = {}) {
+        super();
+        this.id = crypto.randomUUID();
+        this.query = query;
+        this.seed = seed;
+        this.status = 'queued';
+        this.stages = [];
+        this.partial = {};
+        this.result = null;
+        this.error = null;
+        this.createdAt = new Date();
+        this.startedAt = null;
+        this.finishedAt = null;
+        this.controller = new AbortController();
+    }
+
+    get done() {
+        return TERMINAL_STATUSES.has(this.status);
+    }
+
+    addStage(stage, data) {
+        this.stages.push({ stage, data });
+        Object.assign(this.partial, data);
+        this.emit('stage', stage, data);
+    }
+
+    toJSON() {
+        return {
+            id: this.id,
+            query: this.query,
+            status: this.status,
+            stages: this.stages.map(({ stage }) => stage),
+            partial: this.done ? undefined : this.partial,
+            result: this.result,
+            error: this.error,
+            createdAt: this.createdAt,
+            startedAt: this.startedAt,
+            finishedAt: this.finishedAt,
+        };
+    }
+}
+
+// Runs prediction jobs on the worker pool with bounded concurrency, a bounded
+// queue, per-job timeouts and cancellation. Finished jobs are kept for
+// retentionMs so clients can still poll their result.
+class PredictionJobManager {
+    constructor({ pool, concurrency, maxQueued, timeoutMs, retentionMs } = {}) {
+        this.pool = pool || getPredictorPool();
+        this.concurrency = concurrency || this.pool.size;
+        this.maxQueued = maxQueued || 100;
+        this.timeoutMs = timeoutMs || 60000;
+        this.retentionMs = retentionMs || 10 * 60 * 1000;
+        this.jobs = new Map();
+        this.queue = [];
+        this.running = 0;
+    }
+
+    submit(query, options) {
+        if (this.queue.length >= this.maxQueued) {
+            throw new JobQueueFullError(this.maxQueued);
+        }
+
+        const job = new PredictionJob(query, options);
+        this.jobs.set(job.id, job);
+        this.queue.push(job);
+        this.pump();
+        return job;
+    }
+
+    get(id) {
+        return this.jobs.get(id) || null;
+    }
+
+    cancel(id) {
+        const job = this.get(id);
+        if (!job || job.done) {
+            return job;
+        }
+
+        const queued = this.queue.indexOf(job);
+        if (queued !== -1) {
+            this.queue.splice(queued, 1);
+            this.finish(job, 'cancelled', { error: 'Cancelled before it started' });
+        } else {
+            // The pool rejects the running request, which finishes the job
+            job.controller.abort();
+        }
+        return job;
+    }
+
+    pump() {
+        while (this.running < this.concurrency && this.queue.length > 0) {
+            this.start(this.queue.shift());
+        }
+    }
+
+    start(job) {
+        this.running++;
+        job.status = 'running';
+        job.startedAt = new Date();
+        job.emit('status', job.status);
+
+        // Covers time spent waiting in the pool queue; once a worker runs the job the
+        // pool enforces the same deadline, so its own (shorter) default never applies
+        job.timer = setTimeout(() => {
+            job.timedOut = true;
+            job.controller.abort();
+        }, this.timeoutMs);
+
+        this.pool.predict(job.query, {
+            seed: job.seed,
+            signal: job.controller.signal,
+            timeoutMs: this.timeoutMs,
+            onEvent: (stage, data) => job.addStage(stage, data),
+        }).then((result) => {
+            this.finish(job, 'succeeded', { result });
+        }).catch((err) => {
+            if (job.timedOut || err.code === 'TIMEOUT') {
+                this.finish(job, 'timed_out', { error: `Prediction timed out after ${this.timeoutMs} ms` });
+            } else if (err.code === 'CANCELLED') {
+                this.finish(job, 'cancelled', { error: err.message });
+            } else {
+                this.finish(job, 'failed', { error: err.message });
+            }
+        });
+    }
+
+    finish(job, status, { result = null, error = null } = {}) {
+        if (job.done) {
+            return;
+        }
+        if (job.startedAt) {
+            this.running--;
+            clearTimeout(job.timer);
+        }
+
+        job.status = status;
+        job.result = result;
+        job.error = error;
+        job.finishedAt = new Date();
+        job.emit('end', job);
+
+        setTimeout(() => this.jobs.delete(job.id), this.retentionMs).unref();
+        this.pump();
+    }
+}
+
+let sharedManager = null;
+
+const getPredictionJobs = () => {
+    if (!sharedManager) {
+        sharedManager = new PredictionJobManager({
+            concurrency: parseInt(process.env.PREDICTOR_JOB_CONCURRENCY, 10) || undefined,
+            maxQueued: parseInt(process.env.PREDICTOR_JOB_MAX_QUEUED, 10) || undefined,
+            timeoutMs: parseInt(process.env.PREDICTOR_JOB_TIMEOUT_MS, 10) || undefined,
+            retentionMs: parseInt(process.env.PREDICTOR_JOB_RETENTION_MS, 10) || undefined,
+        });
+    }
+    return sharedManager;
+};
+
+module.exports = { PredictionJob, PredictionJobManager, JobQueueFullError, getPredictionJobs };
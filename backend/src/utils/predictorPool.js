@@ -0,0 +1,335 @@
+const { spawn } = require('child_process');
+const readline = require('readline');
+const path = require('path');
+const fs = require('fs');
+const os = require('os');
+
+// Resolve path to script
+// We are in backend/src/utils
+// We want ../../../Exam_Predictor/Exam_Question_Predictor.py
+const scriptPath = path.resolve(__dirname, '../../../Exam_Predictor/Exam_Question_Predictor.py');
+
+// Resolve path to python executable in external folder
+const venvPython = 'E:\\Exam_Predictor\\.venv\\Scripts\\python.exe';
+
+const resolvePythonCommand = () => (fs.existsSync(venvPython) ? venvPython : 'python');
+
+class QueueFullError extends Error {
+    constructor(limit) {
+        super(`Prediction queue is full (${limit} pending requests)`);
+        this.code = 'QUEUE_FULL';
+    }
+}
+
+class PredictionCancelledError extends Error {
+    constructor() {
+        super('Prediction was cancelled');
+        this.code = 'CANCELLED';
+    }
+}
+
+class PredictorUnavailableError extends Error {
+    constructor() {
+        super('Prediction workers failed to start');
+        this.code = 'UNAVAILABLE';
+    }
+}
+
+class PredictionTimeoutError extends Error {
+    constructor(timeoutMs) {
+        super(`Prediction timed out after ${timeoutMs} ms`);
+        this.code = 'TIMEOUT';
+    }
+}
+
+// A single long-lived Python process serving line-delimited JSON requests.
+class PredictorWorker {
+    constructor(pool, index) {
+        this.pool = pool;
+        this.index = index;
+        this.ready = false;
+        this.current = null;
+        // Consecutive exits before the worker became ready
+        this.failures = 0;
+        this.unavailable = false;
+        this.start();
+    }
+
+    start() {
+        const pythonCommand = resolvePythonCommand();
+        console.log(`Starting prediction worker #${this.index}: ${pythonCommand} ${scriptPath} --worker`);
+
+        const args = ['-u', scriptPath, '--worker'];
+        if (process.env.PREDICTOR_CACHE_SIZE) {
+            args.push('--cache-size', process.env.PREDICTOR_CACHE_SIZE);
+        }
+        if (process.env.PREDICTOR_CACHE_TTL) {
+            args.push('--cache-ttl', process.env.PREDICTOR_CACHE_TTL);
+        }
+
+        this.ready = false;
+        this.process = spawn(pythonCommand, args);
+
+        readline.createInterface({ input: this.process.stdout }).on('line', (line) => this.onLine(line));
+
+        // Drain stderr so the child never blocks on a full pipe
+        this.process.stderr.on('data', (data) => {
+            if (process.env.PREDICTOR_DEBUG) {
+                console.error(`[predictor #${this.index}] ${data.toString().trimEnd()}`);
+            }
+        });
+
+        this.process.stdin.on('error', (err) => {
+            console.error(`Prediction worker #${this.index} stdin error:`, err.message);
+        });
+
+        this.process.on('error', (err) => {
+            console.error(`Prediction worker #${this.index} failed to start:`, err.message);
+        });
+
+        this.process.on('close', (code) => this.onExit(code));
+    }
+
+    onLine(line) {
+        let message;
+        try {
+            message = JSON.parse(line);
+        } catch (e) {
+            console.error(`Prediction worker #${this.index} wrote invalid JSON:`, line);
+            return;
+        }
+
+        if (message.event === 'ready') {
+            this.ready = true;
+            this.failures = 0;
+            this.pool.dispatch();
+            return;
+        }
+
+        const job = this.current;
+        if (!job || message.id !== job.id) {
+            return;
+        }
+
+        if (message.event === 'partial') {
+            if (job.onEvent) {
+                job.onEvent(message.stage, message.data);
+            }
+            return;
+        }
+
+        this.current = null;
+        clearTimeout(job.timer);
+        if (message.ok) {
+            job.resolve(message.result);
+        } else {
+            job.reject(new Error(message.error || 'Prediction failed'));
+        }
+        this.pool.dispatch();
+    }
+
+    onExit(code) {
+        const started = this.ready;
+        this.ready = false;
+        const job = this.current;
+        this.current = null;
+
+        if (job) {
+            clearTimeout(job.timer);
+            if (job.timedOut) {
+                job.reject(new PredictionTimeoutError(job.timeoutMs));
+            } else if (job.cancelled) {
+                job.reject(new PredictionCancelledError());
+            } else {
+                job.reject(new Error(`Prediction worker exited with code ${code}`));
+            }
+        }
+
+        if (this.pool.closed) {
+            return;
+        }
+
+        // A worker that dies before it is ready (missing python, broken install) is
+        // retried with exponential backoff and given up on after maxRestarts attempts
+        this.failures = started ? 0 : this.failures + 1;
+        if (this.failures > this.pool.maxRestarts) {
+            console.error(`Prediction worker #${this.index} failed to start ${this.failures} times, giving up`);
+            this.unavailable = true;
+            this.pool.onWorkerUnavailable();
+            return;
+        }
+
+        const delay = Math.min(this.pool.restartDelayMs * 2 ** Math.max(this.failures - 1, 0),
+            this.pool.maxRestartDelayMs);
+        console.error(`Prediction worker #${this.index} exited with code ${code}, restarting in ${delay} ms`);
+        setTimeout(() => {
+            if (!this.pool.closed) {
+                this.start();
+            }
+        }, delay);
+    }
+
+    run(job) {
+        this.current = job;
+        job.timeoutMs = job.timeoutMs || this.pool.requestTimeoutMs;
+        job.timer = setTimeout(() => {
+            // A stuck worker is killed; onExit rejects the job and respawns it
+            console.error(`Prediction request ${job.id} timed out on worker #${this.index}`);
+            job.timedOut = true;
+            this.process.kill();
+        }, job.timeoutMs);
+
+        // Undefined fields (e.g. no seed) are dropped by JSON.stringify
+        const request = { id: job.id, ...job.payload };
+        if (job.onEvent) {
+            request.stream = true;
+        }
+        this.process.stdin.write(JSON.stringify(request) + '\n');
+    }
+
+    cancel(job) {
+        if (this.current !== job) {
+            return;
+        }
+        // The worker answers one request at a time, so the only way to stop it is to
+        // kill it; onExit rejects the job and a fresh worker is started
+        job.cancelled = true;
+        clearTimeout(job.timer);
+        this.process.kill();
+    }
+
+    stop() {
+        this.process.stdin.end();
+    }
+}
+
+// Fixed-size pool of prediction workers with a bounded FIFO request queue.
+class PredictorPool {
+    constructor({ size, maxQueue, requestTimeoutMs, restartDelayMs, maxRestartDelayMs, maxRestarts } = {}) {
+        this.size = size || Math.max(1, Math.min(2, os.cpus().length));
+        this.maxQueue = maxQueue || 50;
+        this.requestTimeoutMs = requestTimeoutMs || 30000;
+        this.restartDelayMs = restartDelayMs || 1000;
+        this.maxRestartDelayMs = maxRestartDelayMs || 30000;
+        this.maxRestarts = maxRestarts !== undefined ? maxRestarts : 5;
+        this.queue = [];
+        this.nextId = 1;
+        this.closed = false;
+        this.workers = [];
+
+        for (let i = 0; i < this.size; i++) {
+            this.workers.push(new PredictorWorker(this, i));
+        }
+    }
+
+    // options.onEvent(stage, data) receives partial results as the worker streams them;
+    // aborting options.signal drops a queued request or kills the worker running it.
+    // options.timeoutMs overrides requestTimeoutMs for this request.
+    predict(query, { onEvent, signal, seed, timeoutMs } = {}) {
+        return this.submit({ query, seed }, { onEvent, signal, timeoutMs });
+    }
+
+    // Past questions most similar to `query`, optionally from one subject only.
+    similar(query, { k, subject, signal } = {}) {
+        return this.submit({ op: 'similar', query, k, subject }, { signal });
+    }
+
+    submit(payload, { onEvent, signal, timeoutMs } = {}) {
+        if (signal && signal.aborted) {
+            return Promise.reject(new PredictionCancelledError());
+        }
+        if (!this.available) {
+            return Promise.reject(new PredictorUnavailableError());
+        }
+        if (this.queue.length >= this.maxQueue) {
+            return Promise.reject(new QueueFullError(this.maxQueue));
+        }
+
+        return new Promise((resolve, reject) => {
+            const job = { id: this.nextId++, payload, onEvent, timeoutMs, resolve, reject };
+
+            if (signal) {
+                const onAbort = () => this.cancel(job);
+                signal.addEventListener('abort', onAbort, { once: true });
+                job.resolve = (value) => {
+                    signal.removeEventListener('abort', onAbort);
+                    resolve(value);
+                };
+                job.reject = (err) => {
+                    signal.removeEventListener('abort', onAbort);
+                    reject(err);
+                };
+            }
+
+            this.queue.push(job);
+            this.dispatch();
+        });
+    }
+
+    cancel(job) {
+        const queued = this.queue.indexOf(job);
+        if (queued !== -1) {
+            this.queue.splice(queued, 1);
+            job.reject(new PredictionCancelledError());
+            return;
+        }
+        this.workers.forEach((worker) => worker.cancel(job));
+    }
+
+    // False once every worker has given up restarting
+    get available() {
+        return this.workers.some((worker) => !worker.unavailable);
+    }
+
+    onWorkerUnavailable() {
+        if (this.available) {
+            return;
+        }
+        // Nothing will ever serve the queued requests, so fail them now
+        this.queue.forEach((job) => job.reject(new PredictorUnavailableError()));
+        this.queue = [];
+    }
+
+    dispatch() {
+        for (const worker of this.workers) {
+            if (this.queue.length === 0) {
+                return;
+            }
+            if (worker.ready && !worker.current) {
+                worker.run(this.queue.shift());
+            }
+        }
+    }
+
+    close() {
+        this.closed = true;
+        this.workers.forEach((worker) => worker.stop());
+        this.queue.forEach((job) => job.reject(new Error('Prediction pool closed')));
+        this.queue = [];
+    }
+}
+
+let sharedPool = null;
+
+const getPredictorPool = () => {
+    if (!sharedPool) {
+        sharedPool = new PredictorPool({
+            size: parseInt(process.env.PREDICTOR_WORKERS, 10) || undefined,
+            maxQueue: parseInt(process.env.PREDICTOR_MAX_QUEUE, 10) || undefined,
+            requestTimeoutMs: parseInt(process.env.PREDICTOR_TIMEOUT_MS, 10) || undefined,
+            maxRestarts: parseInt(process.env.PREDICTOR_MAX_RESTARTS, 10) || undefined,
+        });
+    }
+    return sharedPool;
+};
+
+module.exports = {
+    PredictorPool,
+    QueueFullError,
+    PredictionCancelledError,
+    PredictionTimeoutError,
+    PredictorUnavailableError,
+    getPredictorPool,
+    resolvePythonCommand,
+    scriptPath,
+};